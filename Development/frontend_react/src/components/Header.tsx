@@ -5,6 +5,7 @@ import { Badge } from "./ui/badge";
 import { useNavigate } from "react-router-dom";
 import { useState, KeyboardEvent } from "react";
 import { useTranslation } from 'react-i18next';
+import { useProductSuggestions } from "../hooks/useProducts";
 
 interface HeaderProps {
   cartItemsCount: number;
@@ -19,6 +20,7 @@ interface HeaderProps {
 export function Header({ cartItemsCount, onCartClick, onLoginClick, isLoggedIn, userEmail, onLogout, onSearch }: HeaderProps) {
   const navigate = useNavigate();
   const [searchQuery, setSearchQuery] = useState("");
+  const suggestions = useProductSuggestions(searchQuery);
   const { t, i18n } = useTranslation();
   
   // Language toggle function
@@ -85,7 +87,13 @@ export function Header({ cartItemsCount, onCartClick, onLoginClick, isLoggedIn,
                   value={searchQuery}
                   onChange={(e) => setSearchQuery(e.target.value)}
                   onKeyPress={handleKeyPress}
+                  list="search-suggestions"
                 />
+                <datalist id="search-suggestions">
+                  {suggestions.map((suggestion) => (
+                    <option key={`${suggestion.type}:${suggestion.text}`} value={suggestion.text} />
+                  ))}
+                </datalist>
               </div>
               <Button onClick={handleSearch} size="sm">
                 {t('common.search')}
@@ -171,6 +179,7 @@ export function Header({ cartItemsCount, onCartClick, onLoginClick, isLoggedIn,
                 value={searchQuery}
                 onChange={(e) => setSearchQuery(e.target.value)}
                 onKeyPress={handleKeyPress}
+                list="search-suggestions"
               />
             </div>
             <Button onClick={handleSearch} size="sm">
@@ -4,6 +4,7 @@ import { Label } from "./ui/label";
 import { Checkbox } from "./ui/checkbox";
 import { Slider } from "./ui/slider";
 import { useState } from "react";
+import type { FacetValue, ProductFacets } from "../hooks/useProducts";
 import {
   Sheet,
   SheetContent,
@@ -48,6 +49,8 @@ const genders = [
 ];
 
 interface ProductFiltersProps {
+  // Conteos de /products/facets; sin ellos se muestran las listas fijas sin conteo
+  facets?: ProductFacets | null;
   onApplyFilters?: (filters: {
     categories: string[];
     brands: string[];
@@ -57,7 +60,22 @@ interface ProductFiltersProps {
   }) => void;
 }
 
-export function ProductFilters({ onApplyFilters }: ProductFiltersProps) {
+// Valores de la faceta con su conteo (los seleccionados se mantienen aunque no tengan resultados)
+function facetOptions(fallback: string[], facet: FacetValue[] | undefined, selected: string[]) {
+  if (!facet) return fallback.map((value) => ({ value, count: undefined as number | undefined }));
+  const options: { value: string; count: number | undefined }[] = facet.map((item) => ({ ...item }));
+  selected
+    .filter((value) => !facet.some((item) => item.value === value))
+    .forEach((value) => options.push({ value, count: 0 }));
+  return options;
+}
+
+function CountBadge({ count }: { count?: number }) {
+  if (count === undefined) return null;
+  return <span className="ml-1 text-xs text-gray-500">({count})</span>;
+}
+
+export function ProductFilters({ onApplyFilters, facets }: ProductFiltersProps) {
   const [selectedCategories, setSelectedCategories] = useState<string[]>([]);
   const [selectedBrands, setSelectedBrands] = useState<string[]>([]);
   const [selectedSports, setSelectedSports] = useState<string[]>([]);
@@ -103,6 +121,11 @@ export function ProductFilters({ onApplyFilters }: ProductFiltersProps) {
     }
   };
 
+  const categoryOptions = facetOptions(categories, facets?.category, selectedCategories);
+  const sportOptions = facetOptions(sports, facets?.sport, selectedSports);
+  const brandOptions = facetOptions(brands, facets?.brand, selectedBrands);
+  const genderCounts = new Map((facets?.gender ?? []).map((item) => [item.value, item.count]));
+
   const activeFiltersCount = 
     selectedCategories.length + 
     selectedBrands.length + 
@@ -132,7 +155,7 @@ export function ProductFilters({ onApplyFilters }: ProductFiltersProps) {
           <div>
             <h3 className="text-sm font-semibold mb-4">Categorías</h3>
             <div className="space-y-3">
-              {categories.map((category) => (
+              {categoryOptions.map(({ value: category, count }) => (
                 <div key={category} className="flex items-center space-x-2">
                   <Checkbox 
                     id={`cat-${category}`}
@@ -141,6 +164,7 @@ export function ProductFilters({ onApplyFilters }: ProductFiltersProps) {
                   />
                   <Label htmlFor={`cat-${category}`} className="text-sm cursor-pointer">
                     {category}
+                    <CountBadge count={count} />
                   </Label>
                 </div>
               ))}
@@ -151,7 +175,7 @@ export function ProductFilters({ onApplyFilters }: ProductFiltersProps) {
           <div>
             <h3 className="text-sm font-semibold mb-4">Deportes</h3>
             <div className="space-y-3">
-              {sports.map((sport) => (
+              {sportOptions.map(({ value: sport, count }) => (
                 <div key={sport} className="flex items-center space-x-2">
                   <Checkbox 
                     id={`sport-${sport}`}
@@ -160,6 +184,7 @@ export function ProductFilters({ onApplyFilters }: ProductFiltersProps) {
                   />
                   <Label htmlFor={`sport-${sport}`} className="text-sm cursor-pointer">
                     {sport}
+                    <CountBadge count={count} />
                   </Label>
                 </div>
               ))}
@@ -187,7 +212,7 @@ export function ProductFilters({ onApplyFilters }: ProductFiltersProps) {
           <div>
             <h3 className="text-sm font-semibold mb-4">Marcas</h3>
             <div className="space-y-3">
-              {brands.map((brand) => (
+              {brandOptions.map(({ value: brand, count }) => (
                 <div key={brand} className="flex items-center space-x-2">
                   <Checkbox 
                     id={`brand-${brand}`}
@@ -196,6 +221,7 @@ export function ProductFilters({ onApplyFilters }: ProductFiltersProps) {
                   />
                   <Label htmlFor={`brand-${brand}`} className="text-sm cursor-pointer">
                     {brand}
+                    <CountBadge count={count} />
                   </Label>
                 </div>
               ))}
@@ -215,6 +241,7 @@ export function ProductFilters({ onApplyFilters }: ProductFiltersProps) {
                   />
                   <Label htmlFor={`gender-${gender.value}`} className="text-sm cursor-pointer">
                     {gender.label}
+                    <CountBadge count={facets ? genderCounts.get(gender.value) ?? 0 : undefined} />
                   </Label>
                 </div>
               ))}
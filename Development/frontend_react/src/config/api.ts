@@ -24,6 +24,8 @@ export const API_ENDPOINTS = {
   },
   PRODUCTS: {
     LIST: `${BUSINESS_API_BASE_URL}/api/v1/products`,
+    FACETS: `${BUSINESS_API_BASE_URL}/api/v1/products/facets`,
+    SUGGEST: `${BUSINESS_API_BASE_URL}/api/v1/products/suggest`,
     GET: (id: number) => `${BUSINESS_API_BASE_URL}/api/v1/products/${id}`,
   },
   ORDERS: {
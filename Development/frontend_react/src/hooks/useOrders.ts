@@ -1,5 +1,13 @@
 import { useState } from 'react';
 import { API_ENDPOINTS } from '../config/api';
+import type { Shipment } from './useShipments';
+
+export interface OrderItem {
+  id: number;
+  product_id: number;
+  quantity: number;
+  unit_price: number;
+}
 
 export interface Order {
   id: number;
@@ -9,12 +17,22 @@ export interface Order {
   shipping_address?: string;
   created_at: string;
   updated_at: string;
+  // Solo presentes si se piden con ?include=
+  items?: OrderItem[];
+  shipment?: Shipment | null;
+}
+
+export interface OrderItemCreate {
+  product_id: number;
+  quantity: number;
 }
 
 export interface OrderCreate {
   user_id: string;
-  total: number;
+  // Con items el backend calcula el total con los precios actuales
+  total?: number;
   shipping_address?: string;
+  items?: OrderItemCreate[];
 }
 
 export interface OrderUpdate {
@@ -28,14 +46,17 @@ export function useOrders() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
-  const fetchOrders = async (userId?: string) => {
+  // include: relaciones cargadas en la misma petición (p. ej. 'shipment' o 'items,product')
+  const fetchOrders = async (userId?: string, include?: string) => {
     try {
       setLoading(true);
       setError(null);
 
-      const url = userId 
-        ? `${API_ENDPOINTS.ORDERS.LIST}?user_id=${userId}`
-        : API_ENDPOINTS.ORDERS.LIST;
+      const params = new URLSearchParams();
+      if (userId) params.set('user_id', userId);
+      if (include) params.set('include', include);
+      const query = params.toString();
+      const url = query ? `${API_ENDPOINTS.ORDERS.LIST}?${query}` : API_ENDPOINTS.ORDERS.LIST;
 
       const response = await fetch(url);
       
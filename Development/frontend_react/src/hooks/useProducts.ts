@@ -35,6 +35,49 @@ export interface ProductFilters {
   inStockOnly?: boolean;
 }
 
+export interface FacetValue {
+  value: string;
+  count: number;
+}
+
+export interface PriceBucket {
+  min: number;
+  max: number | null;
+  count: number;
+}
+
+// Conteos de /products/facets: cada faceta ignora su propio filtro
+export interface ProductFacets {
+  total: number;
+  category: FacetValue[];
+  brand: FacetValue[];
+  sport: FacetValue[];
+  gender: FacetValue[];
+  price: PriceBucket[];
+}
+
+// Autocompletado de /products/suggest
+export interface ProductSuggestion {
+  text: string;
+  type: 'name' | 'brand' | 'category';
+}
+
+// Parámetros de /products/search y /products/facets
+function searchParams(searchFilters: ProductFilters): URLSearchParams {
+  const params = new URLSearchParams();
+
+  if (searchFilters.searchQuery) params.append('q', searchFilters.searchQuery);
+  if (searchFilters.category) params.append('category', searchFilters.category);
+  if (searchFilters.brand) params.append('brand', searchFilters.brand);
+  if (searchFilters.sport) params.append('sport', searchFilters.sport);
+  if (searchFilters.gender) params.append('gender', searchFilters.gender);
+  if (searchFilters.minPrice !== undefined) params.append('min_price', searchFilters.minPrice.toString());
+  if (searchFilters.maxPrice !== undefined) params.append('max_price', searchFilters.maxPrice.toString());
+  if (searchFilters.inStockOnly) params.append('in_stock', 'true');
+
+  return params;
+}
+
 // Mapa de imágenes por categoría
 const categoryImages: Record<string, string> = {
   'Football': 'https://images.unsplash.com/photo-1587103365297-77661edc549d?crop=entropy&cs=tinysrgb&fit=max&fm=jpg&ixid=M3w3Nzg4Nzd8MHwxfHNlYXJjaHwxfHxzb2NjZXIlMjBmb290YmFsbCUyMGJhbGx8ZW58MXx8fHwxNzYwNDA1NzY0fDA&ixlib=rb-4.1.0&q=80&w=1080',
@@ -45,7 +88,10 @@ const categoryImages: Record<string, string> = {
   'default': 'https://images.unsplash.com/photo-1587350866945-5aa311427deb?crop=entropy&cs=tinysrgb&fit=max&fm=jpg&ixid=M3w3Nzg4Nzd8MHwxfHNlYXJjaHwxfHxjeWNsaW5nJTIwYmljeWNsZXxlbnwxfHx8fDE3NjA0MDU3NjV8MA&ixlib=rb-4.1.0&q=80&w=1080',
 };
 
-export function useProducts(filters?: ProductFilters) {
+// Columnas que usa la grilla del catálogo (ProductCard): ?fields= evita descargar el resto
+export const PRODUCT_GRID_FIELDS = ['id', 'name', 'price', 'category', 'image_url', 'in_stock'];
+
+export function useProducts(filters?: ProductFilters, fields?: string[]) {
   const [products, setProducts] = useState<ProductDisplay[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
@@ -61,22 +107,15 @@ export function useProducts(filters?: ProductFilters) {
 
       // Construir URL con parámetros de búsqueda
       let url = API_ENDPOINTS.PRODUCTS.LIST;
+      let params = new URLSearchParams();
       
       if (searchFilters && Object.keys(searchFilters).length > 0) {
         // Usar endpoint de búsqueda si hay filtros
-        const params = new URLSearchParams();
-        
-        if (searchFilters.searchQuery) params.append('q', searchFilters.searchQuery);
-        if (searchFilters.category) params.append('category', searchFilters.category);
-        if (searchFilters.brand) params.append('brand', searchFilters.brand);
-        if (searchFilters.sport) params.append('sport', searchFilters.sport);
-        if (searchFilters.gender) params.append('gender', searchFilters.gender);
-        if (searchFilters.minPrice !== undefined) params.append('min_price', searchFilters.minPrice.toString());
-        if (searchFilters.maxPrice !== undefined) params.append('max_price', searchFilters.maxPrice.toString());
-        if (searchFilters.inStockOnly) params.append('in_stock', 'true');
-        
-        url = `${API_ENDPOINTS.PRODUCTS.LIST}/search?${params.toString()}`;
+        url = `${API_ENDPOINTS.PRODUCTS.LIST}/search`;
+        params = searchParams(searchFilters);
       }
+      if (fields && fields.length > 0) params.append('fields', fields.join(','));
+      if (params.toString()) url = `${url}?${params.toString()}`;
 
       const response = await fetch(url);
       
@@ -210,3 +249,67 @@ export function useProducts(filters?: ProductFilters) {
     deleteProduct,
   };
 }
+
+// Conteos para la barra de filtros calculados en el servidor (sin descargar el catálogo)
+export function useProductFacets(filters?: ProductFilters) {
+  const [facets, setFacets] = useState<ProductFacets | null>(null);
+  const [loading, setLoading] = useState(true);
+
+  useEffect(() => {
+    let cancelled = false;
+    const fetchFacets = async () => {
+      try {
+        setLoading(true);
+        const params = searchParams(filters || {}).toString();
+        const response = await fetch(params ? `${API_ENDPOINTS.PRODUCTS.FACETS}?${params}` : API_ENDPOINTS.PRODUCTS.FACETS);
+        if (!response.ok) {
+          throw new Error('Error al cargar los filtros');
+        }
+        const data: ProductFacets = await response.json();
+        if (!cancelled) setFacets(data);
+      } catch (err) {
+        console.error('Error fetching facets:', err);
+      } finally {
+        if (!cancelled) setLoading(false);
+      }
+    };
+    fetchFacets();
+    return () => {
+      cancelled = true;
+    };
+  }, [filters?.searchQuery, filters?.category, filters?.brand, filters?.sport, filters?.gender, filters?.minPrice, filters?.maxPrice, filters?.inStockOnly]);
+
+  return { facets, loading };
+}
+
+// Sugerencias mientras se escribe en el buscador (respuesta de pocos bytes, sin filas completas)
+export function useProductSuggestions(query: string, limit = 8) {
+  const [suggestions, setSuggestions] = useState<ProductSuggestion[]>([]);
+
+  useEffect(() => {
+    const q = query.trim();
+    if (!q) {
+      setSuggestions([]);
+      return;
+    }
+    const controller = new AbortController();
+    // Espera corta para no disparar una petición por cada tecla al escribir rápido
+    const timer = setTimeout(async () => {
+      try {
+        const params = new URLSearchParams({ q, limit: limit.toString() });
+        const response = await fetch(`${API_ENDPOINTS.PRODUCTS.SUGGEST}?${params}`, { signal: controller.signal });
+        if (!response.ok) return;
+        const data: { suggestions: ProductSuggestion[] } = await response.json();
+        setSuggestions(data.suggestions);
+      } catch (err) {
+        if (!controller.signal.aborted) console.error('Error fetching suggestions:', err);
+      }
+    }, 120);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [query, limit]);
+
+  return suggestions;
+}
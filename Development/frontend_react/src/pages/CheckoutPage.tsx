@@ -78,11 +78,11 @@ export default function CheckoutPage({ cartItems, onClearCart }: CheckoutPagePro
 
       console.log('Using userId:', userId);
 
-      // 1. Crear la orden
+      // 1. Crear la orden con sus productos (el total lo calcula el backend)
       const order = await createOrder({
         user_id: userId,
-        total: total,
         shipping_address: shippingAddress,
+        items: cartItems.map(item => ({ product_id: item.id, quantity: item.quantity })),
       }, token);
 
       if (!order) {
@@ -94,7 +94,7 @@ export default function CheckoutPage({ cartItems, onClearCart }: CheckoutPagePro
       // 2. Procesar el pago
       const payment = await createPayment({
         order_id: order.id,
-        amount: total,
+        amount: order.total,
         method: paymentMethod,
       });
 
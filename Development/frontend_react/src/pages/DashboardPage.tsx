@@ -13,7 +13,7 @@ import {
   SelectTrigger,
   SelectValue,
 } from "../components/ui/select";
-import { useProducts, ProductFilters as ProductFiltersType } from "../hooks/useProducts";
+import { useProducts, useProductFacets, PRODUCT_GRID_FIELDS, ProductFilters as ProductFiltersType } from "../hooks/useProducts";
 import { Alert, AlertDescription } from "../components/ui/alert";
 
 interface DashboardPageProps {
@@ -26,7 +26,8 @@ interface DashboardPageProps {
 export default function DashboardPage({ viewMode, setViewMode, onAddToCart, searchQuery }: DashboardPageProps) {
   const { t } = useTranslation();
   const [filters, setFilters] = useState<ProductFiltersType>({});
-  const { products, loading, error, refreshProducts, searchProducts } = useProducts(filters);
+  const { products, loading, error, refreshProducts, searchProducts } = useProducts(filters, PRODUCT_GRID_FIELDS);
+  const { facets } = useProductFacets(filters);
 
   // Actualizar filtros cuando llega una búsqueda desde el header
   const handleSearch = (query: string) => {
@@ -80,7 +81,7 @@ export default function DashboardPage({ viewMode, setViewMode, onAddToCart, sear
               </p>
             </div>
             <div className="flex items-center gap-2">
-              <ProductFilters onApplyFilters={handleApplyFilters} />
+              <ProductFilters onApplyFilters={handleApplyFilters} facets={facets} />
               <Select defaultValue="popular">
                 <SelectTrigger className="w-[180px]">
                   <SelectValue placeholder={t('products.sort')} />
@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useOrders, Order } from '../hooks/useOrders';
-import { useShipments } from '../hooks/useShipments';
+import { Shipment } from '../hooks/useShipments';
 import { Button } from '../components/ui/button';
 import { Card } from '../components/ui/card';
 import { Badge } from '../components/ui/badge';
@@ -12,40 +12,27 @@ import { Loader2, Package, Calendar, MapPin, DollarSign, ArrowLeft, User, Search
 export default function OrderManagementPage() {
   const navigate = useNavigate();
   const { orders, loading, error, fetchOrders } = useOrders();
-  const { getShipmentByOrder } = useShipments();
   
   const [searchQuery, setSearchQuery] = useState('');
   const [statusFilter, setStatusFilter] = useState('all');
-  const [shipmentData, setShipmentData] = useState<Record<number, any>>({});
 
-  // Fetch all orders on mount and poll every 15 seconds
+  // Fetch all orders (with their shipment, in one request) on mount and poll every 15 seconds
   useEffect(() => {
-    fetchOrders(''); // Empty string = all orders
+    fetchOrders('', 'shipment'); // Empty string = all orders
     
     const interval = setInterval(() => {
-      fetchOrders('');
+      fetchOrders('', 'shipment');
     }, 15000);
     
     return () => clearInterval(interval);
   }, []);
 
-  // Load shipment data for orders
-  useEffect(() => {
-    const loadShipments = async () => {
-      const shipments: Record<number, any> = {};
-      for (const order of orders) {
-        const shipment = await getShipmentByOrder(order.id);
-        if (shipment) {
-          shipments[order.id] = shipment;
-        }
-      }
-      setShipmentData(shipments);
-    };
-
-    if (orders.length > 0) {
-      loadShipments();
+  const shipmentData: Record<number, Shipment> = {};
+  for (const order of orders) {
+    if (order.shipment) {
+      shipmentData[order.id] = order.shipment;
     }
-  }, [orders]);
+  }
 
   const getStatusColor = (status: string) => {
     switch (status.toLowerCase()) {
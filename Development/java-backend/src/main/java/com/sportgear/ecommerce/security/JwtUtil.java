@@ -7,6 +7,7 @@ import io.jsonwebtoken.security.Keys;
 import javax.crypto.SecretKey;
 
 import java.util.Date;
+import java.util.UUID;
 
 @Component
 public class JwtUtil {
@@ -18,10 +19,19 @@ public class JwtUtil {
     private Long expiration;
 
     public String generateToken(String email) {
-        return Jwts.builder()
+        return generateToken(email, null);
+    }
+
+    // El claim userId permite a otros servicios (FastAPI) verificar el token localmente
+    public String generateToken(String email, UUID userId) {
+        JwtBuilder builder = Jwts.builder()
                 .setSubject(email)
                 .setIssuedAt(new Date())
-                .setExpiration(new Date(System.currentTimeMillis() + expiration))
+                .setExpiration(new Date(System.currentTimeMillis() + expiration));
+        if (userId != null) {
+            builder.claim("userId", userId.toString());
+        }
+        return builder
                 .signWith(SignatureAlgorithm.HS256, secret)
                 .compact();
     }
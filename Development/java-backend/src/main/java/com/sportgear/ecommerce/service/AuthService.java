@@ -37,7 +37,7 @@ public class AuthService {
         user.setRole(UserRole.CUSTOMER);
         userRepository.save(user);
 
-        return jwtUtil.generateToken(user.getEmail());
+        return jwtUtil.generateToken(user.getEmail(), user.getUserID());
     }
 
     // 🔹 Login de usuario
@@ -54,7 +54,7 @@ public class AuthService {
             throw new RuntimeException("Invalid password");
         }
 
-        String token = jwtUtil.generateToken(user.getEmail());
+        String token = jwtUtil.generateToken(user.getEmail(), user.getUserID());
         
         return Map.of(
             "token", token,
@@ -1,9 +1,13 @@
 package com.sportgear.ecommerce.security;
 
+import io.jsonwebtoken.Claims;
+import io.jsonwebtoken.Jwts;
 import org.junit.jupiter.api.BeforeEach;
 import org.junit.jupiter.api.Test;
 import org.springframework.test.util.ReflectionTestUtils;
 
+import java.util.UUID;
+
 import static org.junit.jupiter.api.Assertions.*;
 
 class JwtUtilTest {
@@ -79,4 +83,18 @@ class JwtUtilTest {
         assertEquals(TEST_EMAIL, extractedEmail);
         assertTrue(isValid);
     }
+
+    @Test
+    void testGenerateToken_IncludesUserIdClaim() {
+        // Arrange
+        UUID userId = UUID.randomUUID();
+        String token = jwtUtil.generateToken(TEST_EMAIL, userId);
+
+        // Act
+        Claims claims = Jwts.parser().setSigningKey(SECRET_KEY).parseClaimsJws(token).getBody();
+
+        // Assert
+        assertEquals(TEST_EMAIL, claims.getSubject());
+        assertEquals(userId.toString(), claims.get("userId", String.class));
+    }
 }
@@ -61,7 +61,7 @@ class AuthServiceTest {
         when(userRepository.findByEmail(anyString())).thenReturn(Optional.empty());
         when(passwordEncoder.encode(anyString())).thenReturn("$2a$10$encodedPassword");
         when(userRepository.save(any(User.class))).thenReturn(newUser);
-        when(jwtUtil.generateToken(anyString())).thenReturn("jwt.token.here");
+        when(jwtUtil.generateToken(anyString(), any())).thenReturn("jwt.token.here");
 
         // Act
         String token = authService.register(newUser);
@@ -91,7 +91,7 @@ class AuthServiceTest {
         // Arrange
         when(userRepository.findByEmail(anyString())).thenReturn(Optional.of(testUser));
         when(passwordEncoder.matches(anyString(), anyString())).thenReturn(true);
-        when(jwtUtil.generateToken(anyString())).thenReturn("jwt.token.here");
+        when(jwtUtil.generateToken(anyString(), any())).thenReturn("jwt.token.here");
 
         // Act
         Map<String, Object> result = authService.login("test@example.com", "password123");
@@ -10,6 +10,90 @@ class Settings:
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5432")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "sportgear_db")
     
-    DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    DATABASE_URL = os.getenv(
+        "DATABASE_URL",
+        f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    )
+    ASYNC_DATABASE_URL = os.getenv(
+        "ASYNC_DATABASE_URL",
+        f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    )
+
+    # Pool de conexiones (engines sync y async). Con rutas síncronas, pool_size +
+    # max_overflow debe cubrir los 40 hilos del threadpool de Starlette: si no, los
+    # hilos esperan conexiones que solo se liberan en ese mismo threadpool.
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+    # Búsqueda full-text: máximo de coincidencias que se puntúan por relevancia
+    SEARCH_CANDIDATE_LIMIT: int = int(os.getenv("SEARCH_CANDIDATE_LIMIT", "500"))
+
+    # Autocompletado: cada proceso reconstruye su índice de prefijos cada N segundos
+    SUGGEST_REFRESH_SECONDS: int = int(os.getenv("SUGGEST_REFRESH_SECONDS", "300"))
+
+    # Analítica: cada proceso recalcula los días marcados de las tablas de resumen cada N segundos (0 = nunca)
+    SALES_ROLLUP_REFRESH_SECONDS: float = float(os.getenv("SALES_ROLLUP_REFRESH_SECONDS", "60"))
+
+    # Facetas (/products/facets): límites superiores de los rangos de precio y vigencia
+    # de la tabla product_facets (catálogo sin filtros) antes de recalcularla
+    FACET_PRICE_BUCKETS: str = os.getenv("FACET_PRICE_BUCKETS", "50,100,200,500")
+    FACET_CACHE_TTL_SECONDS: float = float(os.getenv("FACET_CACHE_TTL_SECONDS", "300"))
+
+    # Caché de lecturas del catálogo (GET /products, /products/{id}, /products/search).
+    # CATALOG_CACHE_BACKEND: "" solo LRU en proceso; "local" o "redis" añaden un nivel
+    # compartido (redis requiere el paquete redis y CATALOG_CACHE_URL)
+    CATALOG_CACHE_ENABLED: bool = os.getenv("CATALOG_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    CATALOG_CACHE_BACKEND: str = os.getenv("CATALOG_CACHE_BACKEND", "")
+    CATALOG_CACHE_URL: str = os.getenv("CATALOG_CACHE_URL", "redis://localhost:6379/0")
+    CATALOG_CACHE_MAX_ENTRIES: int = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "2048"))
+    CATALOG_CACHE_TTL_SECONDS: float = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "60"))
+
+    # Cache-Control de las lecturas con ETag: "no-cache" obliga al navegador a revalidar
+    # (If-None-Match -> 304) en vez de reutilizar una copia que puede estar vieja
+    CATALOG_HTTP_CACHE_CONTROL: str = os.getenv("CATALOG_HTTP_CACHE_CONTROL", "public, no-cache")
+    TRACKING_HTTP_CACHE_CONTROL: str = os.getenv("TRACKING_HTTP_CACHE_CONTROL", "private, no-cache")
+
+    # Servicio de autenticación (Spring Boot): cliente HTTP compartido y caché de validaciones
+    AUTH_API_URL: str = os.getenv("AUTH_API_URL", "http://localhost:8080")
+    AUTH_HTTP_TIMEOUT_SECONDS: float = float(os.getenv("AUTH_HTTP_TIMEOUT_SECONDS", "5.0"))
+    AUTH_HTTP_MAX_CONNECTIONS: int = int(os.getenv("AUTH_HTTP_MAX_CONNECTIONS", "100"))
+    AUTH_HTTP_MAX_KEEPALIVE: int = int(os.getenv("AUTH_HTTP_MAX_KEEPALIVE", "20"))
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+    AUTH_NEGATIVE_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_NEGATIVE_CACHE_TTL_SECONDS", "30"))
+
+    # Validación de órdenes: "remote" consulta /api/auth/users/{id} en cada orden;
+    # "local" verifica la firma HS256 del JWT con el mismo secreto que JwtUtil (Spring)
+    AUTH_VALIDATION_MODE: str = os.getenv("AUTH_VALIDATION_MODE", "remote").lower()
+    # En modo local, consultar al servicio solo los tokens que no se pueden verificar localmente
+    AUTH_REMOTE_FALLBACK: bool = os.getenv("AUTH_REMOTE_FALLBACK", "false").lower() in ("1", "true", "yes")
+    JWT_SECRET: str = os.getenv("JWT_SECRET", "")
+    # jjwt (signWith(alg, String)) interpreta el secreto como Base64
+    JWT_SECRET_IS_BASE64: bool = os.getenv("JWT_SECRET_IS_BASE64", "true").lower() in ("1", "true", "yes")
+    JWT_LEEWAY_SECONDS: int = int(os.getenv("JWT_LEEWAY_SECONDS", "30"))
+
+    # GET /metrics (formato Prometheus): latencia por ruta, consultas SQL, pool y auth
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # Perfil SQL: huellas de sentencias en /api/v1/admin/sql-profile y log de consultas lentas
+    # (con su plan EXPLAIN). Todo es opcional: se activa para diagnosticar, no queda encendido.
+    # SQL_PROFILER_HEADER agrega Server-Timing: solo para depurar
+    SQL_PROFILER_ENABLED: bool = os.getenv("SQL_PROFILER_ENABLED", "false").lower() in ("1", "true", "yes")
+    SQL_SLOW_QUERY_MS: float = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+    SQL_EXPLAIN_SLOW: bool = os.getenv("SQL_EXPLAIN_SLOW", "false").lower() in ("1", "true", "yes")
+    SQL_PROFILER_HEADER: bool = os.getenv("SQL_PROFILER_HEADER", "false").lower() in ("1", "true", "yes")
+    SQL_PROFILER_MAX_FINGERPRINTS: int = int(os.getenv("SQL_PROFILER_MAX_FINGERPRINTS", "1000"))
+
+    # Logs JSON (una línea por registro) escritos por un hilo aparte desde una cola acotada.
+    # LOG_LEVELS: niveles por módulo ("app.services.sql_profiler=DEBUG,sqlalchemy.engine=WARNING")
+    # LOG_SAMPLING: fracción de DEBUG/INFO que se conserva por logger ("uvicorn.access=0.1")
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json").lower()
+    LOG_SAMPLING: str = os.getenv("LOG_SAMPLING", "")
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
 settings = Settings()
\ No newline at end of file
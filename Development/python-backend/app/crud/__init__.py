@@ -3,5 +3,11 @@ from . import order_crud
 from . import payment_crud
 from . import user_crud
 from . import shipment_crud
+from . import stock_crud
+from . import async_product_crud
+from . import async_order_crud
+from . import async_payment_crud
+from . import async_shipment_crud
 
-__all__ = ["product_crud", "order_crud", "payment_crud", "user_crud", "shipment_crud"]
+__all__ = ["product_crud", "order_crud", "payment_crud", "user_crud", "shipment_crud", "stock_crud",
+           "async_product_crud", "async_order_crud", "async_payment_crud", "async_shipment_crud"]
@@ -0,0 +1,79 @@
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable, Optional
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.schemas.order_schema import OrderCreate
+from app.crud import order_crud
+from app.crud.stock_crud import insufficient_stock, reserve_statement, shortfall, sold_out
+from app.services.catalog_cache import invalidate_products
+from app.services import sales_rollup
+
+async def get_orders(db: AsyncSession, skip: int = 0, limit: int = 100, include: Iterable[str] = ()):
+    result = await db.execute(
+        select(Order).options(*order_crud.order_load_options(include)).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
+
+async def get_orders_page(
+    db: AsyncSession, cursor: Optional[str] = None, limit: int = 100, include: Iterable[str] = ()
+):
+    """Keyset-paginated orders, newest first. Returns (orders, next_cursor)."""
+    return await db.run_sync(order_crud.get_orders_page, cursor=cursor, limit=limit, include=include)
+
+async def get_order(db: AsyncSession, order_id: int, include: Iterable[str] = ()):
+    return await db.get(Order, order_id, options=order_crud.order_load_options(include))
+
+async def get_orders_by_user(
+    db: AsyncSession, user_id: str, skip: int = 0, limit: int = 100, include: Iterable[str] = ()
+):
+    """Get all orders for a specific user"""
+    result = await db.execute(
+        select(Order).options(*order_crud.order_load_options(include))
+        .where(Order.user_id == user_id).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
+
+async def get_orders_by_user_page(
+    db: AsyncSession, user_id: str, cursor: Optional[str] = None, limit: int = 100, include: Iterable[str] = ()
+):
+    return await db.run_sync(
+        order_crud.get_orders_by_user_page, user_id=user_id, cursor=cursor, limit=limit, include=include
+    )
+
+async def create_order(db: AsyncSession, order: OrderCreate, token: str):
+    """
+    Create order (and its items) after validating the user; same statements
+    as order_crud.create_order without blocking the event loop.
+    """
+    await order_crud.validate_user_for_order(order.user_id, token)
+
+    data = order.dict(exclude={"items"})
+    quantities = order_crud.merge_cart(order.items)
+    rows = []
+    if quantities:
+        result = await db.execute(select(Product.id, Product.price).where(Product.id.in_(quantities)))
+        rows, data["total"] = order_crud.price_cart(quantities, dict(result.all()))
+
+    db_order = Order(**data)
+    emptied = []
+    try:
+        if quantities:
+            reserved = (await db.execute(reserve_statement(quantities))).all()
+            short = shortfall(quantities, [row.id for row in reserved])
+            if short:
+                raise insufficient_stock(short)
+            emptied = sold_out(reserved)
+        db.add(db_order)
+        await db.flush()
+        if rows:
+            await db.execute(insert(OrderItem).values([{**row, "order_id": db_order.id} for row in rows]))
+        await db.execute(sales_rollup.mark_statement(Order.id == db_order.id))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    invalidate_products(quantities, lists=bool(emptied))
+    await db.refresh(db_order, ["items"])
+    return db_order
@@ -0,0 +1,30 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.models.order import Order
+from app.models.payment import Payment
+from app.schemas.payment_schema import PaymentCreate
+from app.crud import payment_crud
+from app.services import sales_rollup
+
+async def get_payments(db: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await db.execute(select(Payment).offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def get_payments_page(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    return await db.run_sync(payment_crud.get_payments_page, cursor=cursor, limit=limit)
+
+async def get_payment(db: AsyncSession, payment_id: int):
+    return await db.get(Payment, payment_id)
+
+async def get_payments_by_order(db: AsyncSession, order_id: int):
+    result = await db.execute(select(Payment).where(Payment.order_id == order_id))
+    return result.scalars().all()
+
+async def create_payment(db: AsyncSession, payment: PaymentCreate):
+    db_payment = Payment(**payment.dict())
+    db.add(db_payment)
+    await db.execute(sales_rollup.mark_statement(Order.id == db_payment.order_id))
+    await db.commit()
+    await db.refresh(db_payment)
+    return db_payment
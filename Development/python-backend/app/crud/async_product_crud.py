@@ -0,0 +1,40 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.models.product import Product
+from app.schemas.product_schema import ProductCreate
+from app.crud import product_crud
+from app.services.catalog_cache import invalidate_products
+from app.services.facet_service import invalidate_facet_table
+from app.services.suggest_service import suggest_index
+
+async def get_products(db: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await db.execute(select(Product).offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def get_products_page(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    """Keyset-paginated product list. Returns (products, next_cursor)."""
+    return await db.run_sync(product_crud.get_products_page, cursor=cursor, limit=limit)
+
+async def search_products(db: AsyncSession, **filters):
+    """
+    Async search_products. The full-text query builder is dialect-aware and
+    written against Session, so it runs through run_sync on the same connection.
+    """
+    return await db.run_sync(product_crud.search_products, **filters)
+
+async def search_products_page(db: AsyncSession, **filters):
+    return await db.run_sync(product_crud.search_products_page, **filters)
+
+async def get_product(db: AsyncSession, product_id: int):
+    return await db.get(Product, product_id)
+
+async def create_product(db: AsyncSession, product: ProductCreate):
+    db_product = Product(**product.dict())
+    db.add(db_product)
+    await db.run_sync(invalidate_facet_table)
+    await db.commit()
+    await db.refresh(db_product)
+    invalidate_products([db_product.id])
+    suggest_index.upsert(db_product)
+    return db_product
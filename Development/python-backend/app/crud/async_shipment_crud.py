@@ -0,0 +1,29 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Tuple
+from app.models.shipment import Shipment
+from app.crud import shipment_crud
+
+async def get_shipment(db: AsyncSession, shipment_id: int) -> Optional[Shipment]:
+    """Get a shipment by ID"""
+    return await db.get(Shipment, shipment_id)
+
+async def get_shipment_by_order(db: AsyncSession, order_id: int) -> Optional[Shipment]:
+    """Get shipment information for a specific order"""
+    result = await db.execute(select(Shipment).where(Shipment.order_id == order_id))
+    return result.scalars().first()
+
+async def get_shipments(
+    db: AsyncSession, skip: int = 0, limit: int = 100, status: Optional[str] = None
+) -> List[Shipment]:
+    """Get all shipments with optional status filter"""
+    query = select(Shipment)
+    if status:
+        query = query.where(Shipment.status == status)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def get_shipments_page(
+    db: AsyncSession, cursor: Optional[str] = None, limit: int = 100, status: Optional[str] = None
+) -> Tuple[List[Shipment], Optional[str]]:
+    return await db.run_sync(shipment_crud.get_shipments_page, cursor=cursor, limit=limit, status=status)
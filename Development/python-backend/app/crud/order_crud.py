@@ -1,13 +1,72 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session, selectinload
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 from app.models.order import Order
-from app.schemas.order_schema import OrderCreate, OrderUpdate
-from app.services.user_service import UserService
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.schemas.order_schema import OrderCreate, OrderItemCreate, OrderUpdate
+from app.config import settings
+from app.services.user_service import UserService, TokenCheck
+from app.crud.pagination import keyset_page
+from app.crud.stock_crud import reserve_stock, release_stock
+from app.services.catalog_cache import invalidate_products
+from app.services import sales_rollup
+from app.crud.returning import update_returning, delete_returning
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+# Orden de la paginación por cursor: más recientes primero
+ORDER_PAGE_KEYS = [Order.created_at, Order.id]
+
+# Relaciones que se pueden pedir con ?include= ("product" implica "items")
+ORDER_INCLUDES = ("items", "product", "shipment", "payments")
+
+def parse_include(include: Optional[str]) -> Set[str]:
+    """Parse ``items,product,...``; raises ValueError on unknown names"""
+    names = {name.strip() for name in (include or "").split(",") if name.strip()}
+    unknown = sorted(names - set(ORDER_INCLUDES))
+    if unknown:
+        raise ValueError(f"Invalid include: {', '.join(unknown)}")
+    if "product" in names:
+        names.add("items")
+    return names
+
+def order_load_options(include: Iterable[str] = ()) -> list:
+    """
+    selectinload options for the included relations: one extra SELECT ... IN
+    per relation for the whole page, instead of one query per order/item.
+    """
+    include = set(include)
+    options = []
+    if "product" in include:
+        options.append(selectinload(Order.items).selectinload(OrderItem.product))
+    elif "items" in include:
+        options.append(selectinload(Order.items))
+    if "shipment" in include:
+        options.append(selectinload(Order.shipment))
+    if "payments" in include:
+        options.append(selectinload(Order.payments))
+    return options
 
 async def validate_user_for_order(user_id: str, token: str) -> bool:
-    """Validate that the user exists in MySQL before creating order"""
+    """
+    Validate that the user exists in MySQL before creating order.
+
+    With AUTH_VALIDATION_MODE=local the JWT is verified in-process and the
+    auth service is only called (AUTH_REMOTE_FALLBACK) for tokens that
+    cannot be verified locally.
+    """
     user_service = UserService()
-    is_valid = await user_service.validate_user_exists(user_id, token)
+    if settings.AUTH_VALIDATION_MODE == "local":
+        check = user_service.verify_token_for_user(user_id, token)
+        if check == TokenCheck.INVALID:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+        if check == TokenCheck.UNVERIFIABLE and settings.AUTH_REMOTE_FALLBACK:
+            is_valid = await user_service.validate_user_exists(user_id, token)
+        else:
+            is_valid = check == TokenCheck.VALID
+    else:
+        is_valid = await user_service.validate_user_exists(user_id, token)
     if not is_valid:
         raise HTTPException(
             status_code=400, 
@@ -15,57 +74,191 @@ async def validate_user_for_order(user_id: str, token: str) -> bool:
         )
     return True
 
-def get_orders(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Order).offset(skip).limit(limit).all()
+def _orders_query(db: Session, include: Iterable[str] = (), columns: Optional[Sequence] = None):
+    """Orders with the ``include`` relations, or Row tuples of ``columns`` (no relations)"""
+    if columns:
+        return db.query(*columns)
+    return db.query(Order).options(*order_load_options(include))
+
+def get_orders(
+    db: Session, skip: int = 0, limit: int = 100, include: Iterable[str] = (), columns: Optional[Sequence] = None
+):
+    return _orders_query(db, include, columns).offset(skip).limit(limit).all()
+
+def get_orders_page(
+    db: Session, cursor: Optional[str] = None, limit: int = 100, include: Iterable[str] = (),
+    columns: Optional[Sequence] = None
+):
+    """Keyset-paginated orders, newest first. Returns (orders, next_cursor)."""
+    query = _orders_query(db, include, columns)
+    return keyset_page(query, ORDER_PAGE_KEYS, cursor, limit, descending=True)
 
-def get_order(db: Session, order_id: int):
-    return db.query(Order).filter(Order.id == order_id).first()
+def get_order(db: Session, order_id: int, include: Iterable[str] = ()):
+    return db.query(Order).options(*order_load_options(include)).filter(Order.id == order_id).first()
 
-def get_orders_by_user(db: Session, user_id: str, skip: int = 0, limit: int = 100):
+def get_orders_by_user(
+    db: Session, user_id: str, skip: int = 0, limit: int = 100, include: Iterable[str] = (),
+    columns: Optional[Sequence] = None
+):
     """Get all orders for a specific user"""
-    return db.query(Order).filter(Order.user_id == user_id).offset(skip).limit(limit).all()
+    query = _orders_query(db, include, columns).filter(Order.user_id == user_id)
+    return query.offset(skip).limit(limit).all()
+
+def get_orders_by_user_page(
+    db: Session, user_id: str, cursor: Optional[str] = None, limit: int = 100, include: Iterable[str] = (),
+    columns: Optional[Sequence] = None
+):
+    """Keyset-paginated orders of a user, newest first. Returns (orders, next_cursor)."""
+    query = _orders_query(db, include, columns).filter(Order.user_id == user_id)
+    return keyset_page(query, ORDER_PAGE_KEYS, cursor, limit, descending=True)
+
+def merge_cart(items: List[OrderItemCreate]) -> Dict[int, int]:
+    """Quantity per product_id (a product repeated in the cart is one line)"""
+    quantities: Dict[int, int] = {}
+    for item in items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    return quantities
+
+def price_cart(quantities: Dict[int, int], prices: Dict[int, float]) -> Tuple[List[dict], float]:
+    """Build order_items rows from current prices. Returns (rows, total)."""
+    missing = sorted(set(quantities) - set(prices))
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Products not found: {missing}")
+    rows = [
+        {"product_id": product_id, "quantity": quantity, "unit_price": prices[product_id]}
+        for product_id, quantity in quantities.items()
+    ]
+    total = round(sum(row["quantity"] * row["unit_price"] for row in rows), 2)
+    return rows, total
 
 async def create_order(db: Session, order: OrderCreate, token: str):
     """Create order after validating user exists in MySQL"""
     # Validate user exists
     await validate_user_for_order(order.user_id, token)
     
-    # Create order
-    db_order = Order(**order.dict())
-    db.add(db_order)
-    db.commit()
+    # Create order: la sesión es síncrona, el commit se ejecuta fuera del event loop
+    return await run_in_threadpool(_insert_order, db, order)
+
+def _insert_order(db: Session, order: OrderCreate):
+    """
+    Insert the order and its items in one transaction: one SELECT ... IN for
+    prices, one conditional UPDATE reserving the stock of the whole cart,
+    the order INSERT and a single multi-row INSERT for all items. With items,
+    total is computed here; without enough stock nothing is written (409).
+    """
+    data = order.dict(exclude={"items"})
+    quantities = merge_cart(order.items)
+    rows = []
+    if quantities:
+        prices = dict(db.query(Product.id, Product.price).filter(Product.id.in_(quantities)).all())
+        rows, data["total"] = price_cart(quantities, prices)
+
+    db_order = Order(**data)
+    try:
+        sold_out = reserve_stock(db, quantities)
+        db.add(db_order)
+        db.flush()
+        if rows:
+            db.execute(insert(OrderItem).values([{**row, "order_id": db_order.id} for row in rows]))
+        sales_rollup.mark_orders(db, Order.id == db_order.id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    # Cambió el stock: las listas solo si algún producto se agotó (in_stock)
+    invalidate_products(quantities, lists=bool(sold_out))
     db.refresh(db_order)
+    db_order.items  # carga los items antes de salir del hilo
     return db_order
 
+def _update_status(db: Session, order_id: int, values: dict):
+    """
+    UPDATE ... RETURNING that refuses to move a cancelled order to another
+    status: its stock was already released, and cancelling it again would
+    release the same units twice. None if the order does not exist.
+    """
+    if not values:
+        return update_returning(db, Order, order_id, values)
+    where = (Order.status != "cancelled",) if "status" in values else ()
+    sales_rollup.mark_orders(db, Order.id == order_id)  # se confirma con el UPDATE
+    row = update_returning(db, Order, order_id, values, where=where)
+    if row is None and where and db.query(Order.id).filter(Order.id == order_id).first():
+        raise HTTPException(status_code=409, detail=f"Order {order_id} is cancelled and its stock was released")
+    return row
+
 def update_order(db: Session, order_id: int, order_update: OrderUpdate):
-    """Update order status or shipping address"""
-    db_order = db.query(Order).filter(Order.id == order_id).first()
-    if not db_order:
-        return None
-    
-    update_data = order_update.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_order, key, value)
-    
-    db.commit()
-    db.refresh(db_order)
-    return db_order
+    """
+    Update order status or shipping address (one UPDATE ... RETURNING).
+    Setting the status to "cancelled" goes through cancel_order_and_release_stock
+    so the reserved stock is given back; a cancelled order cannot change
+    status again (409).
+    """
+    values = order_update.dict(exclude_unset=True)
+    if values.get("status") == "cancelled":
+        del values["status"]
+        return cancel_order_and_release_stock(db, order_id, values)
+    return _update_status(db, order_id, values)
 
 def update_order_status(db: Session, order_id: int, new_status: str):
-    """Update only the order status"""
+    """Update only the order status (same rules as update_order)"""
+    if new_status == "cancelled":
+        return cancel_order_and_release_stock(db, order_id)
+    return _update_status(db, order_id, {"status": new_status})
+
+def cancel_order_and_release_stock(db: Session, order_id: int, values: Optional[dict] = None):
+    """
+    Cancel an order and give its items' stock back. The status change is a
+    conditional UPDATE, so cancelling twice (or concurrently) releases once.
+    ``values``: other columns to change in the same transaction (PUT with
+    status="cancelled").
+    """
     db_order = db.query(Order).filter(Order.id == order_id).first()
     if not db_order:
         return None
-    
-    db_order.status = new_status
-    db.commit()
+
+    values = values or {}
+    try:
+        cancelled = db.execute(
+            update(Order)
+            .where(Order.id == order_id, Order.status != "cancelled")
+            .values(status="cancelled", **values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not cancelled and values:
+            # Ya estaba cancelada: solo los demás campos
+            db.execute(
+                update(Order).where(Order.id == order_id).values(values)
+                .execution_options(synchronize_session=False)
+            )
+        released = merge_cart(db_order.items) if cancelled else {}
+        restocked = release_stock(db, released)
+        if cancelled or values:
+            sales_rollup.mark_orders(db, Order.id == order_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    invalidate_products(released, lists=bool(restocked))
     db.refresh(db_order)
     return db_order
 
 def delete_order(db: Session, order_id: int):
-    db_order = db.query(Order).filter(Order.id == order_id).first()
-    if db_order:
-        db.delete(db_order)
-        db.commit()
-        return True
-    return False
\ No newline at end of file
+    """Delete an order and its items; a non-cancelled order gives its reserved stock back first"""
+    reserved = merge_cart(
+        db.query(OrderItem)
+        .join(Order, Order.id == OrderItem.order_id)
+        .filter(OrderItem.order_id == order_id, Order.status != "cancelled")
+        .all()
+    )
+    try:
+        # Se confirma junto con el DELETE en delete_returning
+        restocked = release_stock(db, reserved)
+        sales_rollup.mark_orders(db, Order.id == order_id)  # antes del DELETE: después no queda su fecha
+    except Exception:
+        db.rollback()
+        raise
+    # Order.items tiene cascade="all, delete-orphan": el DELETE Core no lo aplica
+    deleted = delete_returning(db, Order, order_id, cascade=(OrderItem.order_id,))
+    if deleted:
+        invalidate_products(reserved, lists=bool(restocked))
+    return deleted
\ No newline at end of file
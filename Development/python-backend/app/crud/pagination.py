@@ -0,0 +1,93 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, bindparam, tuple_
+from sqlalchemy.orm import Query
+
+# Tope de ``limit`` en las rutas paginadas
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the key values of the last row of a page as an opaque cursor."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> List[Any]:
+    """
+    Decode a cursor produced by ``encode_cursor`` for the given key columns.
+    Raises ValueError if the cursor is malformed or was built for other keys.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("Invalid cursor")
+
+    decoded = []
+    for key, value in zip(keys, values):
+        if isinstance(key.type, DateTime):
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError) as exc:
+                raise ValueError("Invalid cursor") from exc
+        elif not _matches_type(key, value):
+            # Un cursor alterado ('abc' para un id) no debe llegar a la base como un error de tipos
+            raise ValueError("Invalid cursor")
+        decoded.append(value)
+    return decoded
+
+
+def _matches_type(key, value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    try:
+        expected = key.type.python_type
+    except NotImplementedError:
+        return isinstance(value, (int, float, str))
+    if expected is int:
+        return isinstance(value, int)
+    if issubclass(expected, (float, Decimal)):
+        return isinstance(value, (int, float))
+    return isinstance(value, expected)
+
+
+def keyset_page(
+    query: Query,
+    keys: Sequence,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """
+    Fetch one page of ``query`` ordered by ``keys`` (a unique column tuple such
+    as ``(id,)`` or ``(created_at, id)``) starting after ``cursor``.
+
+    Seeks with ``(keys) > (cursor)`` instead of OFFSET, so every page costs the
+    same regardless of depth. An empty or missing cursor starts at the first
+    page. Returns the rows and the cursor of the next page (None on the last).
+    ValueError for a malformed cursor or a ``limit`` below 1.
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        position = tuple_(*keys)
+        after = tuple_(*[bindparam(None, value, type_=key.type) for key, value in zip(keys, values)])
+        query = query.filter(position < after if descending else position > after)
+
+    ordering = [key.desc() if descending else key for key in keys]
+    rows = query.order_by(*ordering).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], key.key) for key in keys])
@@ -1,9 +1,19 @@
 from sqlalchemy.orm import Session
+from typing import Optional, Sequence
+from app.models.order import Order
 from app.models.payment import Payment
 from app.schemas.payment_schema import PaymentCreate, PaymentUpdate
+from app.crud.pagination import keyset_page
+from app.crud.returning import update_returning, delete_returning
+from app.services import sales_rollup
 
-def get_payments(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Payment).offset(skip).limit(limit).all()
+def get_payments(db: Session, skip: int = 0, limit: int = 100, columns: Optional[Sequence] = None):
+    """Payments, or Row tuples of ``columns`` (app/services/fast_json.py)"""
+    return db.query(*(columns or [Payment])).offset(skip).limit(limit).all()
+
+def get_payments_page(db: Session, cursor: Optional[str] = None, limit: int = 100, columns: Optional[Sequence] = None):
+    """Keyset-paginated payments ordered by id. Returns (payments, next_cursor)."""
+    return keyset_page(db.query(*(columns or [Payment])), [Payment.id], cursor, limit)
 
 def get_payment(db: Session, payment_id: int):
     return db.query(Payment).filter(Payment.id == payment_id).first()
@@ -14,25 +24,18 @@ def get_payments_by_order(db: Session, order_id: int):
 def create_payment(db: Session, payment: PaymentCreate):
     db_payment = Payment(**payment.dict())
     db.add(db_payment)
+    sales_rollup.mark_orders(db, Order.id == db_payment.order_id)
     db.commit()
     db.refresh(db_payment)
     return db_payment
 
 def update_payment(db: Session, payment_id: int, payment_update: PaymentUpdate):
-    db_payment = db.query(Payment).filter(Payment.id == payment_id).first()
-    if db_payment:
-        update_data = payment_update.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_payment, key, value)
-        db.commit()
-        db.refresh(db_payment)
-        return db_payment
-    return None
+    """UPDATE ... RETURNING in one round-trip; None if the payment does not exist"""
+    values = payment_update.dict(exclude_unset=True)
+    if values:
+        sales_rollup.mark_payment(db, payment_id)  # se confirma con el UPDATE
+    return update_returning(db, Payment, payment_id, values)
 
 def delete_payment(db: Session, payment_id: int):
-    db_payment = db.query(Payment).filter(Payment.id == payment_id).first()
-    if db_payment:
-        db.delete(db_payment)
-        db.commit()
-        return True
-    return False
\ No newline at end of file
+    sales_rollup.mark_payment(db, payment_id)
+    return delete_returning(db, Payment, payment_id)
\ No newline at end of file
@@ -1,51 +1,36 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from typing import Optional
+from typing import Optional, Sequence
+from app.models.order_item import OrderItem
 from app.models.product import Product
 from app.schemas.product_schema import ProductCreate, ProductUpdate
+from app.services.search_service import apply_text_search
+from app.crud.pagination import keyset_page
+from app.crud.returning import update_returning, delete_returning
+from app.services.catalog_cache import invalidate_products
+from app.services.facet_service import FACET_COLUMNS, invalidate_facet_table
+from app.services.suggest_service import suggest_index
 
-def get_products(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Product).offset(skip).limit(limit).all()
+def get_products(db: Session, skip: int = 0, limit: int = 100, columns: Optional[Sequence] = None):
+    """Products, or Row tuples of ``columns`` (app/services/fast_json.py)"""
+    return db.query(*(columns or [Product])).offset(skip).limit(limit).all()
 
-def search_products(
+def get_products_page(db: Session, cursor: Optional[str] = None, limit: int = 100, columns: Optional[Sequence] = None):
+    """Keyset-paginated product list ordered by id. Returns (products, next_cursor)."""
+    return keyset_page(db.query(*(columns or [Product])), [Product.id], cursor, limit)
+
+def _filtered_products(
     db: Session,
-    search_query: Optional[str] = None,
     category: Optional[str] = None,
     brand: Optional[str] = None,
     sport: Optional[str] = None,
     gender: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
-    in_stock_only: bool = False,
-    skip: int = 0,
-    limit: int = 100
+    in_stock_only: bool = False
 ):
-    """
-    Búsqueda avanzada de productos con múltiples filtros.
-    
-    Args:
-        search_query: Búsqueda por nombre, descripción o marca
-        category: Filtro por categoría
-        brand: Filtro por marca
-        sport: Filtro por deporte
-        gender: Filtro por género
-        min_price: Precio mínimo
-        max_price: Precio máximo
-        in_stock_only: Solo productos en stock
-        skip: Número de registros a saltar
-        limit: Límite de resultados
-    """
+    """Consulta base de productos con los filtros exactos de la búsqueda"""
     query = db.query(Product)
     
-    # Búsqueda por texto en nombre, descripción o marca
-    if search_query:
-        search_filter = or_(
-            Product.name.ilike(f"%{search_query}%"),
-            Product.description.ilike(f"%{search_query}%"),
-            Product.brand.ilike(f"%{search_query}%")
-        )
-        query = query.filter(search_filter)
-    
     # Filtros específicos
     if category:
         query = query.filter(Product.category == category)
@@ -70,33 +55,106 @@ def search_products(
     if in_stock_only:
         query = query.filter(Product.in_stock == True, Product.stock_quantity > 0)
     
+    return query
+
+def search_products(
+    db: Session,
+    search_query: Optional[str] = None,
+    category: Optional[str] = None,
+    brand: Optional[str] = None,
+    sport: Optional[str] = None,
+    gender: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock_only: bool = False,
+    skip: int = 0,
+    limit: int = 100,
+    columns: Optional[Sequence] = None
+):
+    """
+    Búsqueda avanzada de productos con múltiples filtros.
+    
+    Con texto de búsqueda los resultados se ordenan por relevancia usando el
+    índice full-text (tsvector en PostgreSQL, FTS5 en SQLite).
+
+    Args:
+        search_query: Búsqueda por nombre, descripción o marca
+        category: Filtro por categoría
+        brand: Filtro por marca
+        sport: Filtro por deporte
+        gender: Filtro por género
+        min_price: Precio mínimo
+        max_price: Precio máximo
+        in_stock_only: Solo productos en stock
+        skip: Número de registros a saltar
+        limit: Límite de resultados
+        columns: Columnas a devolver como filas (Row) en lugar de productos
+    """
+    query = _filtered_products(db, category, brand, sport, gender, min_price, max_price, in_stock_only)
+    
+    # Búsqueda por texto en nombre, descripción o marca (al final: ordena por relevancia)
+    if search_query:
+        query = apply_text_search(db, query, search_query, window=skip + limit)
+    if columns:
+        query = query.with_entities(*columns)
+    
     return query.offset(skip).limit(limit).all()
 
+def search_products_page(
+    db: Session,
+    search_query: Optional[str] = None,
+    category: Optional[str] = None,
+    brand: Optional[str] = None,
+    sport: Optional[str] = None,
+    gender: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock_only: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    columns: Optional[Sequence] = None
+):
+    """
+    Variante paginada por cursor de search_products. Los resultados se ordenan
+    por id (no por relevancia) para que el cursor sea estable.
+    Devuelve (productos, next_cursor).
+    """
+    query = _filtered_products(db, category, brand, sport, gender, min_price, max_price, in_stock_only)
+    if search_query:
+        query = apply_text_search(db, query, search_query, rank=False)
+    if columns:
+        query = query.with_entities(*columns)
+    return keyset_page(query, [Product.id], cursor, limit)
+
 def get_product(db: Session, product_id: int):
     return db.query(Product).filter(Product.id == product_id).first()
 
 def create_product(db: Session, product: ProductCreate):
     db_product = Product(**product.dict())
     db.add(db_product)
+    invalidate_facet_table(db)
     db.commit()
     db.refresh(db_product)
+    invalidate_products([db_product.id])
+    suggest_index.upsert(db_product)
     return db_product
 
 def update_product(db: Session, product_id: int, product_update: ProductUpdate):
-    db_product = db.query(Product).filter(Product.id == product_id).first()
-    if db_product:
-        update_data = product_update.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_product, key, value)
-        db.commit()
-        db.refresh(db_product)
-        return db_product
-    return None
+    """UPDATE ... RETURNING in one round-trip; None if the product does not exist"""
+    values = product_update.dict(exclude_unset=True)
+    if FACET_COLUMNS & values.keys():
+        invalidate_facet_table(db)  # se confirma con el UPDATE
+    updated = update_returning(db, Product, product_id, values)
+    if updated:
+        invalidate_products([product_id])
+        suggest_index.upsert(updated)
+    return updated
 
 def delete_product(db: Session, product_id: int):
-    db_product = db.query(Product).filter(Product.id == product_id).first()
-    if db_product:
-        db.delete(db_product)
-        db.commit()
-        return True
-    return False
\ No newline at end of file
+    invalidate_facet_table(db)  # se confirma con el DELETE
+    # Product.order_items tiene cascade="all, delete-orphan": el DELETE Core no lo aplica
+    deleted = delete_returning(db, Product, product_id, cascade=(OrderItem.product_id,))
+    if deleted:
+        invalidate_products([product_id])
+        suggest_index.remove(product_id)
+    return deleted
@@ -0,0 +1,72 @@
+"""
+Single-statement writes by primary key.
+
+``UPDATE ... RETURNING`` / ``DELETE ... RETURNING`` replace the
+SELECT + flush + refresh sequence of the ORM (three round-trips) with one.
+The updated row is returned as a Row keyed by model attribute names, so it
+serializes with the same ``from_attributes`` response schemas as the model.
+Requires a dialect with RETURNING (PostgreSQL, SQLite >= 3.35).
+
+synchronize_session="fetch" syncs objects already loaded in the session
+from the RETURNING rows instead of evaluating the WHERE clause in Python.
+
+A Core DELETE skips the ORM cascades (and SQLite runs without
+``PRAGMA foreign_keys``), so ``delete_returning`` deletes the child rows
+given in ``cascade`` itself, in the same transaction, before the parent.
+"""
+from typing import Any, Dict, Optional, Sequence
+from sqlalchemy import delete, inspect, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+
+def _columns(model):
+    return [getattr(model, prop.key) for prop in inspect(model).column_attrs]
+
+
+def update_returning(
+    db: Session, model, object_id: int, values: Dict[str, Any], where: Sequence = ()
+) -> Optional[Row]:
+    """
+    Apply ``values`` to the row with ``object_id``; None if it does not exist
+    or does not meet the extra conditions in ``where``. Without ``values``
+    it only reads the row and does not commit: callers must not queue other
+    writes (rollup marks) before it in that case.
+    """
+    if not values:
+        return db.execute(select(*_columns(model)).where(model.id == object_id, *where)).first()
+
+    statement = (
+        update(model).where(model.id == object_id, *where).values(values)
+        .returning(*_columns(model))
+        .execution_options(synchronize_session="fetch")
+    )
+    try:
+        row = db.execute(statement).first()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return row
+
+
+def delete_returning(db: Session, model, object_id: int, cascade: Sequence = ()) -> bool:
+    """
+    Delete the row with ``object_id``; False if it did not exist.
+    ``cascade``: foreign key columns (e.g. ``OrderItem.order_id``) whose rows go first.
+    """
+    try:
+        for column in cascade:
+            db.execute(
+                delete(column.class_).where(column == object_id)
+                .execution_options(synchronize_session="fetch")
+            )
+        deleted = db.execute(
+            delete(model).where(model.id == object_id).returning(model.id)
+            .execution_options(synchronize_session="fetch")
+        ).first()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return deleted is not None
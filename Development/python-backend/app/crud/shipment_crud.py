@@ -1,8 +1,14 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Sequence, Tuple
 from app.models.shipment import Shipment
-from app.schemas.shipment_schema import ShipmentCreate, ShipmentUpdate, ShipmentStatusUpdate
+from app.schemas.shipment_schema import ShipmentCreate
+from app.crud.pagination import keyset_page
+from app.crud.returning import delete_returning
+
+# Orden de get_shipments_page: más recientes primero
+SHIPMENT_PAGE_KEYS = [Shipment.created_at, Shipment.id]
 
 def create_shipment(db: Session, shipment: ShipmentCreate) -> Shipment:
     """Create a new shipment for an order"""
@@ -24,68 +30,45 @@ def get_shipment_by_tracking(db: Session, tracking_number: str) -> Optional[Ship
     """Get shipment by tracking number"""
     return db.query(Shipment).filter(Shipment.tracking_number == tracking_number).first()
 
-def get_shipments(db: Session, skip: int = 0, limit: int = 100, status: Optional[str] = None) -> List[Shipment]:
-    """Get all shipments with optional status filter"""
-    query = db.query(Shipment)
+def get_tracking_version(db: Session, tracking_number: str):
+    """(id, updated_at) of the shipment, for its ETag; every write sets updated_at"""
+    return (
+        db.query(Shipment.id, Shipment.updated_at)
+        .filter(Shipment.tracking_number == tracking_number)
+        .first()
+    )
+
+def get_shipments(
+    db: Session, skip: int = 0, limit: int = 100, status: Optional[str] = None, columns: Optional[Sequence] = None
+) -> List[Shipment]:
+    """Get all shipments with optional status filter (Row tuples of ``columns`` if given)"""
+    query = db.query(*(columns or [Shipment]))
     if status:
         query = query.filter(Shipment.status == status)
     return query.offset(skip).limit(limit).all()
 
-def update_shipment(db: Session, shipment_id: int, shipment_update: ShipmentUpdate) -> Optional[Shipment]:
-    """Update shipment information (tracking number, carrier, vehicle info)"""
-    db_shipment = get_shipment(db, shipment_id)
-    if not db_shipment:
-        return None
-    
-    update_data = shipment_update.model_dump(exclude_unset=True)
-    
-    # If status is being updated to 'shipped', set shipped_at timestamp
-    if "status" in update_data and update_data["status"] == "shipped" and not db_shipment.shipped_at:
-        update_data["shipped_at"] = datetime.utcnow()
-    
-    # If status is being updated to 'delivered', set delivered_at timestamp
-    if "status" in update_data and update_data["status"] == "delivered" and not db_shipment.delivered_at:
-        update_data["delivered_at"] = datetime.utcnow()
-    
-    for key, value in update_data.items():
-        setattr(db_shipment, key, value)
-    
-    db_shipment.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(db_shipment)
-    return db_shipment
+def get_shipments_page(
+    db: Session, cursor: Optional[str] = None, limit: int = 100, status: Optional[str] = None,
+    columns: Optional[Sequence] = None
+) -> Tuple[List[Shipment], Optional[str]]:
+    """Keyset-paginated shipments, newest first. Returns (shipments, next_cursor)"""
+    query = db.query(*(columns or [Shipment]))
+    if status:
+        query = query.filter(Shipment.status == status)
+    return keyset_page(query, SHIPMENT_PAGE_KEYS, cursor, limit, descending=True)
 
-def update_shipment_status(db: Session, shipment_id: int, status_update: ShipmentStatusUpdate) -> Optional[Shipment]:
-    """Update only the shipment status and optionally vehicle info"""
-    db_shipment = get_shipment(db, shipment_id)
-    if not db_shipment:
-        return None
-    
-    # Update status
-    db_shipment.status = status_update.status
-    
-    # Update vehicle info if provided
-    if status_update.vehicle_info:
-        db_shipment.vehicle_info = status_update.vehicle_info
-    
-    # Set timestamps based on status
-    if status_update.status == "shipped" and not db_shipment.shipped_at:
-        db_shipment.shipped_at = datetime.utcnow()
-    
-    if status_update.status == "delivered" and not db_shipment.delivered_at:
-        db_shipment.delivered_at = datetime.utcnow()
-    
-    db_shipment.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(db_shipment)
-    return db_shipment
+def status_timestamps(update_data: dict, now: datetime) -> dict:
+    """
+    shipped_at / delivered_at are set the first time the status is reached.
+    COALESCE keeps an existing value without reading the row first.
+    """
+    if update_data.get("status") == "shipped":
+        update_data["shipped_at"] = func.coalesce(Shipment.shipped_at, now)
+    if update_data.get("status") == "delivered":
+        update_data["delivered_at"] = func.coalesce(Shipment.delivered_at, now)
+    update_data["updated_at"] = now
+    return update_data
 
 def delete_shipment(db: Session, shipment_id: int) -> bool:
     """Delete a shipment"""
-    db_shipment = get_shipment(db, shipment_id)
-    if not db_shipment:
-        return False
-    
-    db.delete(db_shipment)
-    db.commit()
-    return True
+    return delete_returning(db, Shipment, shipment_id)
@@ -0,0 +1,116 @@
+"""
+Stock reservation for orders.
+
+Stock is decremented with one conditional UPDATE per order
+(``stock_quantity >= :q`` for each product of the cart) so the check and the
+write are a single atomic statement: concurrent checkouts cannot oversell,
+no row lock is held between a SELECT and the UPDATE, and a cart costs one
+round-trip whatever its number of lines. The quantities travel as a
+``CASE id WHEN ... THEN ...`` expression instead of ``UPDATE ... FROM
+(VALUES ...)``, which SQLite cannot alias column by column. RETURNING lists
+the products that had enough stock; the others are the shortfall.
+
+Both functions also return the products whose in_stock flipped (sold out,
+or back in stock), so the caller invalidates the cached product lists only
+then: lists filter and show in_stock, and a plain stock count change only
+reaches them through the cache TTL.
+
+Rows are locked in id order (the ordered ``SELECT ... FOR UPDATE`` in the
+WHERE clause, on PostgreSQL) so two multi-item orders never lock the same
+rows in opposite order.
+"""
+from typing import Dict, List
+from fastapi import HTTPException
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+from app.models.product import Product
+
+
+def _quantity(quantities: Dict[int, int]):
+    return case(quantities, value=Product.id)
+
+
+def _locked(product_ids):
+    return select(Product.id).where(Product.id.in_(product_ids)).order_by(Product.id).with_for_update()
+
+
+def reserve_statement(quantities: Dict[int, int]):
+    """Decrement stock of every product that has enough left; in_stock follows the new quantity"""
+    quantity = _quantity(quantities)
+    return (
+        update(Product)
+        .where(Product.id.in_(_locked(sorted(quantities))), Product.stock_quantity >= quantity)
+        .values(
+            stock_quantity=Product.stock_quantity - quantity,
+            in_stock=Product.stock_quantity - quantity > 0,
+        )
+        .returning(Product.id, Product.in_stock)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def release_statement(quantities: Dict[int, int]):
+    """
+    Give units back. in_stock is recomputed only when the stock had run out
+    (reserve_statement clears it at zero); a product taken off sale by hand
+    with units left keeps its flag.
+    """
+    quantity = _quantity(quantities)
+    return (
+        update(Product)
+        .where(Product.id.in_(_locked(sorted(quantities))))
+        .values(
+            stock_quantity=Product.stock_quantity + quantity,
+            in_stock=case(
+                (Product.stock_quantity <= 0, Product.stock_quantity + quantity > 0),
+                else_=Product.in_stock,
+            ),
+        )
+        .returning(Product.id, Product.stock_quantity)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def insufficient_stock(short: List[int]) -> HTTPException:
+    return HTTPException(status_code=409, detail=f"Insufficient stock for products: {short}")
+
+
+def shortfall(quantities: Dict[int, int], reserved_ids) -> List[int]:
+    """Products of the cart that reserve_statement did not decrement"""
+    return sorted(set(quantities) - set(reserved_ids))
+
+
+def sold_out(reserved_rows) -> List[int]:
+    """Products that reserve_statement left without stock (in_stock cleared)"""
+    return [row.id for row in reserved_rows if not row.in_stock]
+
+
+def back_in_stock(quantities: Dict[int, int], released_rows) -> List[int]:
+    """Products that release_statement took from zero stock back to some"""
+    return [row.id for row in released_rows if 0 < row.stock_quantity <= quantities[row.id]]
+
+
+def reserve_stock(db: Session, quantities: Dict[int, int]) -> List[int]:
+    """
+    Reserve ``quantities`` (product_id -> units) inside the caller's
+    transaction. Raises 409 listing every product without enough stock; the
+    caller must roll back so partial reservations are undone. Returns the
+    products that sold out.
+    """
+    if not quantities:
+        return []
+    rows = db.execute(reserve_statement(quantities)).all()
+    short = shortfall(quantities, [row.id for row in rows])
+    if short:
+        raise insufficient_stock(short)
+    return sold_out(rows)
+
+
+def release_stock(db: Session, quantities: Dict[int, int]) -> List[int]:
+    """
+    Give back reserved units (order cancelled) inside the caller's
+    transaction. Returns the products that are back in stock.
+    """
+    if not quantities:
+        return []
+    return back_in_stock(quantities, db.execute(release_statement(quantities)).all())
@@ -2,14 +2,47 @@ import os
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.config import settings
+from app.services import metrics, sql_profiler
+
+TESTING = os.getenv("TESTING") == "1"
+
+
+def _pool_options(url: str, is_async: bool = False) -> dict:
+    """Pool settings shared by the sync and async engines (see Settings)."""
+    options = {}
+    if url.startswith("sqlite"):
+        # SQLite (benchmarks locales): la conexión se comparte entre hilos del threadpool
+        options["connect_args"] = {"check_same_thread": False}
+        if url.startswith("sqlite+aiosqlite"):
+            return options  # NullPool: no admite tamaño de pool
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if settings.METRICS_ENABLED:
+        # Mide la espera por una conexión libre (db_pool_checkout_wait_seconds)
+        options["poolclass"] = metrics.TimedAsyncQueuePool if is_async else metrics.TimedQueuePool
+    return options
+
 
 # If running tests (pytest/conftest sets TESTING=1), use a local sqlite DB
-if os.getenv("TESTING") == "1":
-    SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test.db"
+if TESTING:
+    # conftest elige la base (un archivo por worker de pytest-xdist, o en memoria)
+    SQLALCHEMY_TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite:///./test.db")
+    ASYNC_TEST_DATABASE_URL = SQLALCHEMY_TEST_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
     engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False})
 else:
-    engine = create_engine(settings.DATABASE_URL)
+    engine = create_engine(settings.DATABASE_URL, **_pool_options(settings.DATABASE_URL))
+
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(engine, "sync")
+if settings.SQL_PROFILER_ENABLED:
+    sql_profiler.instrument_engine(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -20,4 +53,45 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# ========== ASYNC ENGINE (asyncpg) ==========
+# Se crea en el primer uso: el driver async solo es necesario si se usa /api/v2
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def get_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+        if TESTING:
+            # Sin pool: cada TestClient corre en su propio event loop
+            _async_engine = create_async_engine(ASYNC_TEST_DATABASE_URL, poolclass=NullPool)
+        else:
+            _async_engine = create_async_engine(
+                settings.ASYNC_DATABASE_URL, **_pool_options(settings.ASYNC_DATABASE_URL, is_async=True)
+            )
+        if settings.METRICS_ENABLED:
+            metrics.instrument_engine(_async_engine.sync_engine, "async")
+        if settings.SQL_PROFILER_ENABLED:
+            sql_profiler.instrument_engine(_async_engine.sync_engine)
+        # expire_on_commit=False: los objetos se serializan después del commit sin lazy loads
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+    return _async_engine
+
+
+async def get_async_db():
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _AsyncSessionLocal = None
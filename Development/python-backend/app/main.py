@@ -1,7 +1,15 @@
+import asyncio
+import logging
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from datetime import datetime
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
+from app.config import settings
+from app.logging_config import RequestIdMiddleware, configure_logging, logging_stats, shutdown_logging
+from app.database import TESTING, SessionLocal, engine, Base, dispose_async_engine
+from app.services import metrics, sales_rollup, sql_profiler
+from app.services.user_service import auth_cache_stats, close_http_client
+from app.services.catalog_cache import catalog_cache_stats
 
 # Importar modelos (sin User - ahora está en MySQL)
 from app.models.product import Product
@@ -10,6 +18,13 @@ from app.models.order_item import OrderItem
 from app.models.payment import Payment
 from app.models.shipment import Shipment
 from app.models.customer_profile import CustomerProfile
+from app.models.product_facet import ProductFacet
+from app.models.sales_rollup import SalesDaily, SalesDailyProduct, SalesDailySegment, SalesRollupDirty
+
+# Con pytest los registros quedan en los handlers de captura de pytest
+if not TESTING:
+    configure_logging()
+logger = logging.getLogger(__name__)
 
 # Crear tablas
 Base.metadata.create_all(bind=engine)
@@ -29,6 +44,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Perfil SQL por petición (Server-Timing en modo depuración)
+if settings.SQL_PROFILER_ENABLED:
+    app.add_middleware(sql_profiler.SQLProfilerMiddleware)
+
+# Métricas Prometheus: se agrega al final para quedar por fuera de CORS y medir la petición completa
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.register_stats("catalog", catalog_cache_stats)
+    metrics.register_stats("auth", auth_cache_stats)
+
+# Más externo: el X-Request-ID queda disponible para los logs de todos los demás middlewares
+app.add_middleware(RequestIdMiddleware)
+
+@app.on_event("startup")
+async def start_sales_rollup_refresh():
+    # Recalcula en segundo plano los días marcados: GET /analytics solo lee
+    if settings.SALES_ROLLUP_REFRESH_SECONDS > 0 and not TESTING:
+        app.state.sales_rollup_refresh = asyncio.create_task(
+            sales_rollup.refresh_periodically(SessionLocal, settings.SALES_ROLLUP_REFRESH_SECONDS)
+        )
+
+@app.on_event("shutdown")
+async def shutdown_http_clients():
+    task = getattr(app.state, "sales_rollup_refresh", None)
+    if task is not None:
+        task.cancel()
+    # Cierra el pool keep-alive compartido con el servicio de autenticación
+    await close_http_client()
+    await dispose_async_engine()
+    shutdown_logging()
+
 # ========== HEALTH CHECK ENDPOINTS ==========
 @app.get("/api/health")
 async def health_check():
@@ -48,26 +94,42 @@ async def detailed_health_check():
         "version": "1.0.0",
         "environment": "development",
         "database": "PostgreSQL",
-        "description": "Business Logic Backend"
+        "description": "Business Logic Backend",
+        "auth_cache": auth_cache_stats(),
+        "catalog_cache": catalog_cache_stats(),
+        "logging": logging_stats()
     }
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Routers - sin user_routes (usuarios están en MySQL)
 try:
     from app.routes.product_routes import router as product_router
     from app.routes.order_routes import router as order_router
     from app.routes.payment_routes import router as payment_router
     from app.routes.shipment_routes import router as shipment_router
+    from app.routes.async_routes import router as async_router
+    from app.routes.export_routes import router as export_router
+    from app.routes.analytics_routes import router as analytics_router
+    from app.routes.admin_routes import router as admin_router
     
+    # Antes que los routers de recursos: /orders/export no debe caer en /orders/{order_id}
+    app.include_router(export_router, prefix="/api/v1")
     app.include_router(product_router, prefix="/api/v1", tags=["products"])
     app.include_router(order_router, prefix="/api/v1", tags=["orders"])
     app.include_router(payment_router, prefix="/api/v1", tags=["payments"])
     app.include_router(shipment_router, prefix="/api/v1", tags=["shipments"])
+    app.include_router(analytics_router, prefix="/api/v1", tags=["analytics"])
+    app.include_router(admin_router, prefix="/api/v1", tags=["admin"])
+    # API async (AsyncSession/asyncpg), mismos contratos que v1
+    app.include_router(async_router, prefix="/api/v2", tags=["async"])
     
-    print("✅ All routes loaded successfully")
-    print("📊 Database: PostgreSQL (Business Logic)")
-    print("👤 Users: MySQL via http://localhost:8080")
+    logger.info("All routes loaded", extra={"database": "PostgreSQL", "auth_service": settings.AUTH_API_URL})
 except ImportError as e:
-    print(f"⚠️ Some routes not available: {e}")
+    logger.warning("Some routes not available: %s", e)
 
 @app.get("/")
 def root():
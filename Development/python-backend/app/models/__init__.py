@@ -4,6 +4,8 @@ from .order_item import OrderItem
 from .payment import Payment
 from .customer_profile import CustomerProfile
 from .shipment import Shipment
+from .product_facet import ProductFacet
+from .sales_rollup import SalesDaily, SalesDailyProduct, SalesDailySegment, SalesRollupDirty
 
 __all__ = [
 	"Product",
@@ -12,4 +14,9 @@ __all__ = [
 	"Payment",
 	"CustomerProfile",
 	"Shipment",
+	"ProductFacet",
+	"SalesDaily",
+	"SalesDailyProduct",
+	"SalesDailySegment",
+	"SalesRollupDirty",
 ]
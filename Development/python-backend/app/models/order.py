@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, Text, DateTime
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -20,4 +20,18 @@ class Order(Base):
         back_populates="order",
         cascade="all, delete-orphan",
         passive_deletes=True
-    )
\ No newline at end of file
+    )
+    # Solo lectura: envío y pagos se gestionan desde sus propios CRUD
+    shipment = relationship("Shipment", uselist=False, viewonly=True)
+    payments = relationship(
+        "Payment",
+        primaryjoin="Order.id == foreign(Payment.order_id)",
+        viewonly=True
+    )
+
+    # Mismo orden que la paginación por cursor (created_at DESC, id DESC)
+    __table_args__ = (
+        Index("idx_orders_user_created", "user_id", created_at.desc(), id.desc()),
+        Index("idx_orders_created", created_at.desc(), id.desc()),
+        Index("idx_orders_status_created", "status", created_at.desc()),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String
+from sqlalchemy import Column, Integer, Float, String, Index
 from app.database import Base
 
 class Payment(Base):
@@ -10,4 +10,8 @@ class Payment(Base):
     # Keep existing DB column names ('method', 'status') but expose
     # attributes expected by the rest of the code/tests (`payment_method`, `payment_status`).
     payment_method = Column('method', String(50), nullable=False)
-    payment_status = Column('status', String(50), default="pending")
\ No newline at end of file
+    payment_status = Column('status', String(50), default="pending")
+
+    __table_args__ = (
+        Index("idx_payments_order_id", "order_id"),
+    )
@@ -1,11 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean
+from sqlalchemy import Column, Integer, String, Float, Boolean, DDL, Index, event
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Product(Base):
     __tablename__ = "products"
-    
+
     id = Column(Integer, primary_key=True, index=True)
+    sku = Column(String(64))  # Clave externa del proveedor (POST /products/bulk)
     name = Column(String(100), nullable=False)
     description = Column(String(500))
     price = Column(Float, nullable=False)
@@ -23,4 +24,79 @@ class Product(Base):
         back_populates="product",
         cascade="all, delete-orphan",
         passive_deletes=True
-    )
\ No newline at end of file
+    )
+
+    # Filtros del catálogo: igualdad por faceta + rango de precio
+    __table_args__ = (
+        Index("idx_products_category_price", "category", "price"),
+        Index("idx_products_brand_price", "brand", "price"),
+        Index("idx_products_sport_price", "sport", "price"),
+        Index("idx_products_gender_price", "gender", "price"),
+        Index("idx_products_price", "price"),
+        # Único para el upsert ON CONFLICT (sku); productos sin sku (NULL) no chocan
+        Index("idx_products_sku", "sku", unique=True),
+    )
+
+
+# ========== FULL-TEXT SEARCH INDEX ==========
+# Documento indexado: name (peso A) + brand (B) + description (D). La expresión
+# de PostgreSQL debe ser idéntica a la usada en app/services/search_service.py
+# para que el planner pueda usar el índice GIN.
+#
+# Configuración de PostgreSQL: 'simple' (sin stemming) más unaccent, para que
+# "futbol" encuentre "Fútbol" como en el FTS5 de SQLite (remove_diacritics).
+SEARCH_TS_CONFIG = "sportgear_search"
+
+
+def search_document_sql(prefix: str = "") -> str:
+    return " || ".join(
+        f"setweight(to_tsvector('{SEARCH_TS_CONFIG}'::regconfig, coalesce({prefix}{column}, '')), '{weight}')"
+        for column, weight in (("name", "A"), ("brand", "B"), ("description", "D"))
+    )
+
+
+# PostgreSQL: la configuración de búsqueda y el índice GIN de expresión, que el
+# motor mantiene en INSERT/UPDATE. CREATE TEXT SEARCH CONFIGURATION no tiene
+# IF NOT EXISTS. Mismas sentencias en database/add_search_index.sql.
+_POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "DO $$ BEGIN "
+    f"IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{SEARCH_TS_CONFIG}') THEN "
+    f"CREATE TEXT SEARCH CONFIGURATION {SEARCH_TS_CONFIG} (COPY = simple); "
+    f"ALTER TEXT SEARCH CONFIGURATION {SEARCH_TS_CONFIG} "
+    "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple; "
+    "END IF; END $$",
+    f"CREATE INDEX IF NOT EXISTS idx_products_search ON products USING GIN (({search_document_sql()}))",
+]
+for _statement in _POSTGRES_SEARCH_DDL:
+    event.listen(Product.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+# SQLite: tabla FTS5 de contenido externo sincronizada por triggers
+_SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+    "name, brand, description, content='products', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='1 2 3 4')",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts(rowid, name, brand, description) "
+    "VALUES (new.id, new.name, new.brand, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, brand, description) "
+    "VALUES ('delete', old.id, old.name, old.brand, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, brand, description "
+    "ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, brand, description) "
+    "VALUES ('delete', old.id, old.name, old.brand, old.description); "
+    "INSERT INTO products_fts(rowid, name, brand, description) "
+    "VALUES (new.id, new.name, new.brand, new.description); END",
+    # Indexa filas existentes cuando la tabla FTS se crea sobre un catálogo ya cargado
+    "INSERT INTO products_fts(products_fts) VALUES ('rebuild')",
+]
+
+for _statement in _SQLITE_FTS_DDL:
+    event.listen(Product.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+event.listen(
+    Product.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS products_fts").execute_if(dialect="sqlite"),
+)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database import Base
+
+class ProductFacet(Base):
+    """
+    Conteos de facetas del catálogo completo (sin filtros), recalculados por
+    app/services/facet_service.py. ``value`` es el índice del rango en la
+    faceta "price"; la fila ("total", "") guarda el total de productos.
+    """
+    __tablename__ = "product_facets"
+
+    facet = Column(String(20), primary_key=True)
+    value = Column(String(100), primary_key=True)
+    count = Column(Integer, nullable=False)
+    refreshed_at = Column(DateTime, nullable=False)
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Date, Float, Integer, String
+from app.database import Base
+
+class SalesDaily(Base):
+    """
+    Órdenes por día (UTC) y estado, mantenidas por app/services/sales_rollup.py.
+    ``paid`` suma los pagos completados de esas órdenes.
+    """
+    __tablename__ = "sales_daily"
+
+    day = Column(Date, primary_key=True)
+    status = Column(String(50), primary_key=True)
+    orders = Column(Integer, nullable=False)
+    revenue = Column(Float, nullable=False)
+    paid = Column(Float, nullable=False)
+
+class SalesDailyProduct(Base):
+    """Unidades e ingresos por día y producto, sin órdenes canceladas"""
+    __tablename__ = "sales_daily_products"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True, index=True)
+    units = Column(Integer, nullable=False)
+    revenue = Column(Float, nullable=False)
+
+class SalesDailySegment(Base):
+    """
+    Unidades e ingresos por día y categoría o marca (``dimension``), sin
+    órdenes canceladas. Guarda la categoría/marca del producto al recalcular.
+    """
+    __tablename__ = "sales_daily_segments"
+
+    day = Column(Date, primary_key=True)
+    dimension = Column(String(20), primary_key=True)  # category o brand
+    value = Column(String(100), primary_key=True)     # "" si el producto no tiene
+    units = Column(Integer, nullable=False)
+    revenue = Column(Float, nullable=False)
+
+class SalesRollupDirty(Base):
+    """
+    Días cuyas órdenes o pagos cambiaron desde el último recálculo, una fila
+    por día (INSERT ... ON CONFLICT); el recálculo borra las que procesa.
+    """
+    __tablename__ = "sales_rollup_dirty"
+
+    day = Column(Date, primary_key=True)
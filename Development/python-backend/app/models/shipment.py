@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from datetime import datetime
 from app.database import Base
 
@@ -15,3 +15,9 @@ class Shipment(Base):
     delivered_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Listado por estado, más recientes primero (get_shipments_page)
+    __table_args__ = (
+        Index("idx_shipments_status_created", "status", created_at.desc(), id.desc()),
+        Index("idx_shipments_created", created_at.desc(), id.desc()),
+    )
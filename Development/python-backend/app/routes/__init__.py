@@ -3,5 +3,6 @@ from . import order_routes
 from . import payment_routes
 from . import user_routes
 from . import shipment_routes
+from . import async_routes
 
-__all__ = ["product_routes", "order_routes", "payment_routes", "user_routes", "shipment_routes"]
+__all__ = ["product_routes", "order_routes", "payment_routes", "user_routes", "shipment_routes", "async_routes"]
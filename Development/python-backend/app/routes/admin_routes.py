@@ -0,0 +1,36 @@
+"""
+Operational endpoints for admins: GET /admin/sql-profile lists the SQL
+statements of this process aggregated by fingerprint
+(app/services/sql_profiler.py); DELETE clears it.
+"""
+from fastapi import APIRouter, HTTPException, Query, Response
+from app.config import settings
+from app.schemas.admin_schema import SqlProfile
+from app.services import sql_profiler
+
+router = APIRouter()
+
+
+def _require_profiler():
+    if not settings.SQL_PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="SQL profiler disabled (SQL_PROFILER_ENABLED)")
+
+
+@router.get("/admin/sql-profile", response_model=SqlProfile)
+def sql_profile(
+    limit: int = Query(20, ge=1, le=200),
+    order_by: str = Query("total_ms", pattern="^(" + "|".join(sql_profiler.ORDER_KEYS) + ")$"),
+):
+    """Top ``limit`` statement fingerprints of this worker, by total time by default"""
+    _require_profiler()
+    return {
+        "slow_query_ms": settings.SQL_SLOW_QUERY_MS,
+        "fingerprints": sql_profiler.top(limit, order_by),
+    }
+
+
+@router.delete("/admin/sql-profile", status_code=204)
+def reset_sql_profile():
+    _require_profiler()
+    sql_profiler.reset()
+    return Response(status_code=204)
@@ -0,0 +1,89 @@
+"""
+Sales dashboards for admins: GET /analytics/sales and /analytics/top-products
+read the daily rollup tables (app/services/sales_rollup.py) instead of
+the orders; they never write. The marked days are recomputed every
+SALES_ROLLUP_REFRESH_SECONDS or by POST /analytics/refresh.
+GET /analytics/consistency compares them with a full recompute
+(read-only); POST /analytics/rebuild recomputes them from scratch.
+"""
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_db
+from app.schemas.analytics_schema import RollupCheck, RollupRebuild, SalesReport, TopProduct
+from app.services import sales_rollup
+
+router = APIRouter()
+
+
+def _range(date_from: Optional[date], date_to: Optional[date]):
+    try:
+        return sales_rollup.date_range(date_from, date_to)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/analytics/sales", response_model=SalesReport)
+def sales_report(
+    group_by: str = Query("day", pattern="^(day|status|category|brand)$"),
+    date_from: Optional[date] = Query(None, description="Desde (inclusive, UTC); por defecto hace 30 días"),
+    date_to: Optional[date] = Query(None, description="Hasta (inclusive, UTC); por defecto hoy"),
+    status: Optional[str] = Query(None, description="Solo órdenes en este estado (day y status)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Orders, revenue and amount paid per day or status, or units and revenue
+    per category or brand. Per day, cancelled orders are left out unless
+    ``status`` is given.
+    """
+    date_from, date_to = _range(date_from, date_to)
+    return {
+        "group_by": group_by,
+        "date_from": str(date_from),
+        "date_to": str(date_to),
+        "rows": sales_rollup.sales(db, group_by, date_from, date_to, status),
+    }
+
+
+@router.get("/analytics/top-products", response_model=list[TopProduct])
+def top_products(
+    date_from: Optional[date] = Query(None, description="Desde (inclusive, UTC); por defecto hace 30 días"),
+    date_to: Optional[date] = Query(None, description="Hasta (inclusive, UTC); por defecto hoy"),
+    limit: int = Query(10, ge=1, le=100),
+    by: str = Query("revenue", pattern="^(revenue|units)$"),
+    db: Session = Depends(get_db)
+):
+    """Best-selling products of the range (cancelled orders excluded)"""
+    date_from, date_to = _range(date_from, date_to)
+    return sales_rollup.top_products(db, date_from, date_to, limit, by)
+
+
+@router.get("/analytics/consistency", response_model=RollupCheck)
+def rollup_consistency(
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Compare the rollups of the range with a full recompute from orders,
+    items and payments. Read-only; repair with POST /analytics/rebuild.
+    Scans every order in the range; meant for periodic jobs, not dashboards.
+    """
+    date_from, date_to = _range(date_from, date_to)
+    return sales_rollup.check(db, date_from, date_to)
+
+
+@router.post("/analytics/refresh", response_model=RollupRebuild)
+def rollup_refresh(db: Session = Depends(get_db)):
+    """Recompute the days marked by writes since the last refresh"""
+    return {"days": sales_rollup.refresh(db)}
+
+
+@router.post("/analytics/rebuild", response_model=RollupRebuild)
+def rollup_rebuild(db: Session = Depends(get_db)):
+    """
+    Empty the rollup tables and recompute every day with orders (repair
+    after /analytics/consistency reports differences). Scans all orders.
+    """
+    return {"days": sales_rollup.rebuild(db)}
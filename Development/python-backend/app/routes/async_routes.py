@@ -0,0 +1,211 @@
+"""
+Async (AsyncSession) versions of the read paths and order creation, served
+under /api/v2. Same contracts as the /api/v1 routes, but the handlers run on
+the event loop instead of Starlette's threadpool.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from app.database import get_async_db
+from app.schemas.product_schema import ProductCreate, ProductResponse
+from app.schemas.order_schema import OrderCreate, OrderDetailResponse, OrderWithItemsResponse
+from app.schemas.payment_schema import PaymentCreate, PaymentResponse
+from app.schemas.shipment_schema import ShipmentResponse
+from app.schemas.pagination_schema import Page
+from app.crud.order_crud import parse_include
+from app.crud import async_product_crud, async_order_crud, async_payment_crud, async_shipment_crud
+from app.crud.pagination import MAX_PAGE_SIZE
+
+router = APIRouter()
+
+CURSOR_DESCRIPTION = "Paginación por cursor: vacío para la primera página, luego next_cursor"
+INCLUDE_DESCRIPTION = "Relaciones a incluir, separadas por coma: items, product, shipment, payments"
+
+
+async def _cursor_page(fetch):
+    try:
+        items, next_cursor = await fetch
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _include(include: Optional[str]):
+    try:
+        return parse_include(include)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+# ========== PRODUCTS ==========
+@router.get("/products", response_model=Union[List[ProductResponse], Page[ProductResponse]])
+async def read_products(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if cursor is not None:
+        return await _cursor_page(async_product_crud.get_products_page(db, cursor=cursor, limit=limit))
+    return await async_product_crud.get_products(db, skip=skip, limit=limit)
+
+@router.get("/products/search", response_model=Union[List[ProductResponse], Page[ProductResponse]])
+async def search_products_endpoint(
+    q: Optional[str] = Query(None, description="Búsqueda por nombre, descripción o marca"),
+    category: Optional[str] = Query(None, description="Filtrar por categoría"),
+    brand: Optional[str] = Query(None, description="Filtrar por marca"),
+    sport: Optional[str] = Query(None, description="Filtrar por deporte"),
+    gender: Optional[str] = Query(None, description="Filtrar por género"),
+    min_price: Optional[float] = Query(None, description="Precio mínimo"),
+    max_price: Optional[float] = Query(None, description="Precio máximo"),
+    in_stock: bool = Query(False, description="Solo productos en stock"),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    filters = dict(
+        search_query=q,
+        category=category,
+        brand=brand,
+        sport=sport,
+        gender=gender,
+        min_price=min_price,
+        max_price=max_price,
+        in_stock_only=in_stock,
+        limit=limit
+    )
+    if cursor is not None:
+        return await _cursor_page(async_product_crud.search_products_page(db, cursor=cursor, **filters))
+    return await async_product_crud.search_products(db, skip=skip, **filters)
+
+@router.get("/products/{product_id}", response_model=ProductResponse)
+async def read_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_product = await async_product_crud.get_product(db, product_id)
+    if db_product is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return db_product
+
+@router.post("/products", response_model=ProductResponse)
+async def create_new_product(product: ProductCreate, db: AsyncSession = Depends(get_async_db)):
+    return await async_product_crud.create_product(db, product)
+
+
+# ========== ORDERS ==========
+@router.get(
+    "/orders",
+    response_model=Union[List[OrderDetailResponse], Page[OrderDetailResponse]],
+    response_model_exclude_unset=True
+)
+async def read_orders(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    user_id: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all orders, optionally filtered by user_id and with the relations in ``include``"""
+    relations = _include(include)
+    if cursor is not None:
+        if user_id:
+            fetch = async_order_crud.get_orders_by_user_page(
+                db, user_id=user_id, cursor=cursor, limit=limit, include=relations
+            )
+        else:
+            fetch = async_order_crud.get_orders_page(db, cursor=cursor, limit=limit, include=relations)
+        page = await _cursor_page(fetch)
+        page["items"] = [OrderDetailResponse.from_order(o, relations) for o in page["items"]]
+        return page
+    if user_id:
+        orders = await async_order_crud.get_orders_by_user(
+            db, user_id=user_id, skip=skip, limit=limit, include=relations
+        )
+    else:
+        orders = await async_order_crud.get_orders(db, skip=skip, limit=limit, include=relations)
+    return [OrderDetailResponse.from_order(o, relations) for o in orders]
+
+@router.get("/orders/{order_id}", response_model=OrderDetailResponse, response_model_exclude_unset=True)
+async def read_order(
+    order_id: int,
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a specific order by ID"""
+    relations = _include(include)
+    db_order = await async_order_crud.get_order(db, order_id, include=relations)
+    if db_order is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return OrderDetailResponse.from_order(db_order, relations)
+
+@router.post("/orders", response_model=OrderWithItemsResponse)
+async def create_new_order(
+    order: OrderCreate,
+    db: AsyncSession = Depends(get_async_db),
+    authorization: str = Header(None)
+):
+    """
+    Create a new order. Validates that user_id exists in MySQL.
+    Requires Authorization header with Bearer token.
+    With ``items`` the line items are stored and the total is computed server-side.
+    """
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization header required")
+
+    token = authorization.replace("Bearer ", "").strip()
+    return await async_order_crud.create_order(db, order, token)
+
+
+# ========== PAYMENTS ==========
+@router.get("/payments", response_model=Union[List[PaymentResponse], Page[PaymentResponse]])
+async def read_payments(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if cursor is not None:
+        return await _cursor_page(async_payment_crud.get_payments_page(db, cursor=cursor, limit=limit))
+    return await async_payment_crud.get_payments(db, skip=skip, limit=limit)
+
+@router.get("/payments/{payment_id}", response_model=PaymentResponse)
+async def read_payment(payment_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_payment = await async_payment_crud.get_payment(db, payment_id)
+    if db_payment is None:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    return db_payment
+
+@router.post("/payments", response_model=PaymentResponse)
+async def create_new_payment(payment: PaymentCreate, db: AsyncSession = Depends(get_async_db)):
+    return await async_payment_crud.create_payment(db, payment)
+
+
+# ========== SHIPMENTS ==========
+@router.get("/shipments", response_model=Union[List[ShipmentResponse], Page[ShipmentResponse]])
+async def read_shipments(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    status: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all shipments with optional status filter"""
+    if cursor is not None:
+        return await _cursor_page(
+            async_shipment_crud.get_shipments_page(db, cursor=cursor, limit=limit, status=status)
+        )
+    return await async_shipment_crud.get_shipments(db, skip=skip, limit=limit, status=status)
+
+@router.get("/shipments/{shipment_id}", response_model=ShipmentResponse)
+async def read_shipment(shipment_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_shipment = await async_shipment_crud.get_shipment(db, shipment_id)
+    if db_shipment is None:
+        raise HTTPException(status_code=404, detail=f"Shipment with id {shipment_id} not found")
+    return db_shipment
+
+@router.get("/shipments/order/{order_id}", response_model=ShipmentResponse)
+async def read_shipment_by_order(order_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_shipment = await async_shipment_crud.get_shipment_by_order(db, order_id)
+    if db_shipment is None:
+        raise HTTPException(status_code=404, detail=f"No shipment found for order {order_id}")
+    return db_shipment
@@ -0,0 +1,61 @@
+"""
+Streaming exports for reporting jobs: GET /orders/export, /payments/export
+and /shipments/export. Registered before the resource routers so that
+``/orders/export`` is not captured by ``/orders/{order_id}``.
+"""
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_db
+from app.services import export_service
+
+router = APIRouter()
+
+FORMAT_PATTERN = "^(ndjson|csv)$"
+
+
+def _export(db: Session, resource: str, fmt: str, **filters) -> StreamingResponse:
+    # La sesión de get_db se cierra después de enviar la respuesta completa
+    return StreamingResponse(
+        export_service.stream_export(db, resource, fmt, **filters),
+        media_type=export_service.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{resource}.{fmt}"'},
+    )
+
+
+@router.get("/orders/export", tags=["orders"])
+def export_orders(
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN),
+    status: Optional[str] = Query(None, description="Filtrar por estado"),
+    created_from: Optional[datetime] = Query(None, description="Creadas desde (inclusive)"),
+    created_to: Optional[datetime] = Query(None, description="Creadas hasta (exclusivo)"),
+    db: Session = Depends(get_db)
+):
+    """Export orders oldest first as NDJSON or CSV, streamed"""
+    return _export(db, "orders", format, status=status, created_from=created_from, created_to=created_to)
+
+
+@router.get("/payments/export", tags=["payments"])
+def export_payments(
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN),
+    status: Optional[str] = Query(None, description="Filtrar por estado del pago"),
+    created_from: Optional[datetime] = Query(None, description="Pedido creado desde (inclusive)"),
+    created_to: Optional[datetime] = Query(None, description="Pedido creado hasta (exclusivo)"),
+    db: Session = Depends(get_db)
+):
+    """Export payments by id as NDJSON or CSV; the date range applies to the order"""
+    return _export(db, "payments", format, status=status, created_from=created_from, created_to=created_to)
+
+
+@router.get("/shipments/export", tags=["shipments"])
+def export_shipments(
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN),
+    status: Optional[str] = Query(None, description="Filtrar por estado"),
+    created_from: Optional[datetime] = Query(None, description="Creados desde (inclusive)"),
+    created_to: Optional[datetime] = Query(None, description="Creados hasta (exclusivo)"),
+    db: Session = Depends(get_db)
+):
+    """Export shipments oldest first as NDJSON or CSV, streamed"""
+    return _export(db, "shipments", format, status=status, created_from=created_from, created_to=created_to)
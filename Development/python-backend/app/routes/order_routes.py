@@ -1,41 +1,112 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Union
 from app.database import get_db
-from app.schemas.order_schema import OrderCreate, OrderResponse, OrderUpdate
+from app.schemas.order_schema import (
+    OrderCreate, OrderResponse, OrderUpdate, OrderWithItemsResponse, OrderDetailResponse
+)
+from app.schemas.pagination_schema import Page
 from app.crud.order_crud import (
+    ORDER_PAGE_KEYS,
     get_orders, 
+    get_orders_page,
     get_order, 
     get_orders_by_user,
+    get_orders_by_user_page,
+    parse_include,
     create_order, 
     update_order,
     delete_order,
-    update_order_status
+    cancel_order_and_release_stock
 )
+from app.services.fast_json import FIELDS_DESCRIPTION, ORDER_ROWS, rows_response, select_fields
+from app.crud.pagination import MAX_PAGE_SIZE
 
 router = APIRouter()
 
-@router.get("/orders", response_model=list[OrderResponse])
+INCLUDE_DESCRIPTION = "Relaciones a incluir, separadas por coma: items, product, shipment, payments"
+
+def _include(include: Optional[str]):
+    try:
+        return parse_include(include)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@router.get(
+    "/orders",
+    response_model=Union[list[OrderDetailResponse], Page[OrderDetailResponse]],
+    response_model_exclude_unset=True
+)
 def read_orders(
     skip: int = 0, 
-    limit: int = 100, 
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
     user_id: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Paginación por cursor: vacío para la primera página, luego next_cursor"),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
-    """Get all orders, optionally filtered by user_id"""
+    """
+    Get all orders, optionally filtered by user_id.
+    With ``cursor`` the response is a ``{items, next_cursor}`` envelope, newest first.
+    With ``include`` the requested relations are eager-loaded (fixed number of queries);
+    without it the orders are serialized from rows (app/services/fast_json.py)
+    and ``fields`` limits the selected and returned columns.
+    """
+    relations = _include(include)
+    if not relations:
+        return _order_rows(db, skip, limit, user_id, cursor, fields)
+    if fields:
+        raise HTTPException(status_code=400, detail="fields cannot be combined with include")
+    if cursor is not None:
+        try:
+            if user_id:
+                items, next_cursor = get_orders_by_user_page(
+                    db, user_id=user_id, cursor=cursor, limit=limit, include=relations
+                )
+            else:
+                items, next_cursor = get_orders_page(db, cursor=cursor, limit=limit, include=relations)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return {"items": [OrderDetailResponse.from_order(o, relations) for o in items], "next_cursor": next_cursor}
     if user_id:
-        return get_orders_by_user(db, user_id=user_id, skip=skip, limit=limit)
-    return get_orders(db, skip=skip, limit=limit)
+        orders = get_orders_by_user(db, user_id=user_id, skip=skip, limit=limit, include=relations)
+    else:
+        orders = get_orders(db, skip=skip, limit=limit, include=relations)
+    return [OrderDetailResponse.from_order(o, relations) for o in orders]
 
-@router.get("/orders/{order_id}", response_model=OrderResponse)
-def read_order(order_id: int, db: Session = Depends(get_db)):
-    """Get a specific order by ID"""
-    db_order = get_order(db, order_id)
+def _order_rows(db: Session, skip: int, limit: int, user_id: Optional[str], cursor: Optional[str], fields: Optional[str]):
+    rows = select_fields(ORDER_ROWS, fields, keys=ORDER_PAGE_KEYS if cursor is not None else ())
+    columns = rows.columns
+    if cursor is not None:
+        try:
+            if user_id:
+                items, next_cursor = get_orders_by_user_page(
+                    db, user_id=user_id, cursor=cursor, limit=limit, columns=columns
+                )
+            else:
+                items, next_cursor = get_orders_page(db, cursor=cursor, limit=limit, columns=columns)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return rows_response(rows, items, next_cursor, paged=True)
+    if user_id:
+        return rows_response(rows, get_orders_by_user(db, user_id=user_id, skip=skip, limit=limit, columns=columns))
+    return rows_response(rows, get_orders(db, skip=skip, limit=limit, columns=columns))
+
+@router.get("/orders/{order_id}", response_model=OrderDetailResponse, response_model_exclude_unset=True)
+def read_order(
+    order_id: int,
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
+    """Get a specific order by ID, with the relations listed in ``include``"""
+    relations = _include(include)
+    db_order = get_order(db, order_id, include=relations)
     if db_order is None:
         raise HTTPException(status_code=404, detail="Order not found")
-    return db_order
+    return OrderDetailResponse.from_order(db_order, relations)
 
-@router.post("/orders", response_model=OrderResponse)
+@router.post("/orders", response_model=OrderWithItemsResponse)
 async def create_new_order(
     order: OrderCreate, 
     db: Session = Depends(get_db),
@@ -44,6 +115,7 @@ async def create_new_order(
     """
     Create a new order. Validates that user_id exists in MySQL.
     Requires Authorization header with Bearer token.
+    With ``items`` the line items are stored and the total is computed server-side.
     """
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header required")
@@ -74,8 +146,8 @@ def delete_existing_order(order_id: int, db: Session = Depends(get_db)):
 
 @router.post("/orders/{order_id}/cancel", response_model=OrderResponse)
 def cancel_order(order_id: int, db: Session = Depends(get_db)):
-    """Cancel an order by setting status to 'cancelled'"""
-    db_order = update_order_status(db, order_id, "cancelled")
+    """Cancel an order by setting status to 'cancelled' and release its reserved stock"""
+    db_order = cancel_order_and_release_stock(db, order_id)
     if db_order is None:
         raise HTTPException(status_code=404, detail="Order not found")
     return db_order
\ No newline at end of file
@@ -1,14 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from typing import Optional, Union
 from app.database import get_db
 from app.schemas.payment_schema import PaymentCreate, PaymentResponse
-from app.crud.payment_crud import get_payments, get_payment, create_payment, delete_payment
+from app.schemas.pagination_schema import Page
+from app.crud.payment_crud import get_payments, get_payments_page, get_payment, create_payment, delete_payment
+from app.services.fast_json import PAYMENT_ROWS, rows_response
+from app.crud.pagination import MAX_PAGE_SIZE
 
 router = APIRouter()
 
-@router.get("/payments", response_model=list[PaymentResponse])
-def read_payments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_payments(db, skip=skip, limit=limit)
+@router.get("/payments", response_model=Union[list[PaymentResponse], Page[PaymentResponse]])
+def read_payments(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Paginación por cursor: vacío para la primera página, luego next_cursor"),
+    db: Session = Depends(get_db)
+):
+    """Get payments (serialized from rows, see app/services/fast_json.py)"""
+    if cursor is not None:
+        try:
+            items, next_cursor = get_payments_page(db, cursor=cursor, limit=limit, columns=PAYMENT_ROWS.columns)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return rows_response(PAYMENT_ROWS, items, next_cursor, paged=True)
+    return rows_response(PAYMENT_ROWS, get_payments(db, skip=skip, limit=limit, columns=PAYMENT_ROWS.columns))
 
 @router.get("/payments/{payment_id}", response_model=PaymentResponse)
 def read_payment(payment_id: int, db: Session = Depends(get_db)):
@@ -1,17 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from anyio import from_thread
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Union
 from app.database import get_db
-from app.schemas.product_schema import ProductCreate, ProductResponse, ProductUpdate
-from app.crud.product_crud import get_products, get_product, create_product, delete_product, search_products, update_product
+from app.schemas.product_schema import (
+    ProductCreate, ProductFacets, ProductImportReport, ProductResponse, ProductSuggestions, ProductUpdate
+)
+from app.config import settings
+from app.services import facet_service, product_import
+from app.models.product import Product
+from app.services.fast_json import FIELDS_DESCRIPTION, PRODUCT_ROWS, FastJSONResponse, select_fields
+from app.services.http_cache import Conditional, cache_control
+from app.services.catalog_cache import LIST_TAG, catalog_cache, invalidate_catalog, product_tag
+from app.services.suggest_service import suggest_index
+from app.schemas.pagination_schema import Page
+from app.crud.pagination import MAX_PAGE_SIZE
+from app.crud.product_crud import (
+    get_products,
+    get_products_page,
+    get_product,
+    create_product,
+    delete_product,
+    search_products,
+    search_products_page,
+    update_product
+)
 
 router = APIRouter()
+catalog_http_cache = cache_control(settings.CATALOG_HTTP_CACHE_CONTROL)
 
-@router.get("/products", response_model=list[ProductResponse])
-def read_products(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_products(db, skip=skip, limit=limit)
 
-@router.get("/products/search", response_model=list[ProductResponse])
+def _conditional(http: Conditional, cached):
+    """(value, etag) from the catalog cache -> 304 if the client has it, else the value as JSON"""
+    value, etag = cached
+    not_modified = http.check(etag)
+    if not_modified is not None:
+        return not_modified
+    return FastJSONResponse(value, headers=http.headers)
+
+
+def _fields_key(rows) -> Optional[str]:
+    """Projection part of the cache key (None for the full schema)"""
+    return None if rows.fields == PRODUCT_ROWS.fields else ",".join(rows.fields)
+
+
+@router.get("/products", response_model=Union[list[ProductResponse], Page[ProductResponse]])
+def read_products(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Paginación por cursor: vacío para la primera página, luego next_cursor"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db),
+    http: Conditional = Depends(catalog_http_cache)
+):
+    """
+    Get products. With ``cursor`` the response is a ``{items, next_cursor}``
+    envelope paginated by id instead of skip/limit. With ``fields`` only
+    those columns are selected and returned.
+    """
+    if cursor is not None:
+        rows = select_fields(PRODUCT_ROWS, fields, keys=[Product.id])
+
+        def load_page():
+            items, next_cursor = get_products_page(db, cursor=cursor, limit=limit, columns=rows.columns)
+            return {"items": rows.dump(items), "next_cursor": next_cursor}
+
+        try:
+            return _conditional(http, catalog_cache.fetch(
+                "products-page", {"cursor": cursor, "limit": limit, "fields": _fields_key(rows)}, [LIST_TAG], load_page
+            ))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows = select_fields(PRODUCT_ROWS, fields)
+    return _conditional(http, catalog_cache.fetch(
+        "products", {"skip": skip, "limit": limit, "fields": _fields_key(rows)}, [LIST_TAG],
+        lambda: rows.dump(get_products(db, skip=skip, limit=limit, columns=rows.columns))
+    ))
+
+@router.get("/products/search", response_model=Union[list[ProductResponse], Page[ProductResponse]])
 def search_products_endpoint(
     q: Optional[str] = Query(None, description="Búsqueda por nombre, descripción o marca"),
     category: Optional[str] = Query(None, description="Filtrar por categoría"),
@@ -22,15 +89,69 @@ def search_products_endpoint(
     max_price: Optional[float] = Query(None, description="Precio máximo"),
     in_stock: bool = Query(False, description="Solo productos en stock"),
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Paginación por cursor: vacío para la primera página, luego next_cursor"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db),
+    http: Conditional = Depends(catalog_http_cache)
 ):
     """
     Endpoint de búsqueda avanzada de productos.
     Permite filtrar por múltiples criterios simultáneamente.
+    Con ``cursor`` devuelve ``{items, next_cursor}`` ordenado por id.
+    Con ``fields`` solo se consultan y devuelven esas columnas.
+    """
+    filters = {
+        "search_query": q,
+        "category": category,
+        "brand": brand,
+        "sport": sport,
+        "gender": gender,
+        "min_price": min_price,
+        "max_price": max_price,
+        "in_stock_only": in_stock,
+    }
+    key = {"q": q, **{name: value for name, value in filters.items() if name != "search_query"}}
+    if cursor is not None:
+        rows = select_fields(PRODUCT_ROWS, fields, keys=[Product.id])
+
+        def load_page():
+            items, next_cursor = search_products_page(
+                db=db, cursor=cursor, limit=limit, columns=rows.columns, **filters
+            )
+            return {"items": rows.dump(items), "next_cursor": next_cursor}
+
+        try:
+            return _conditional(http, catalog_cache.fetch(
+                "search-page", {**key, "cursor": cursor, "limit": limit, "fields": _fields_key(rows)},
+                [LIST_TAG], load_page
+            ))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows = select_fields(PRODUCT_ROWS, fields)
+    return _conditional(http, catalog_cache.fetch(
+        "search", {**key, "skip": skip, "limit": limit, "fields": _fields_key(rows)}, [LIST_TAG],
+        lambda: rows.dump(search_products(db=db, skip=skip, limit=limit, columns=rows.columns, **filters))
+    ))
+
+@router.get("/products/facets", response_model=ProductFacets)
+def product_facets(
+    q: Optional[str] = Query(None, description="Búsqueda por nombre, descripción o marca"),
+    category: Optional[str] = Query(None, description="Filtrar por categoría"),
+    brand: Optional[str] = Query(None, description="Filtrar por marca"),
+    sport: Optional[str] = Query(None, description="Filtrar por deporte"),
+    gender: Optional[str] = Query(None, description="Filtrar por género"),
+    min_price: Optional[float] = Query(None, description="Precio mínimo"),
+    max_price: Optional[float] = Query(None, description="Precio máximo"),
+    in_stock: bool = Query(False, description="Solo productos en stock"),
+    db: Session = Depends(get_db)
+):
+    """
+    Conteos por categoría, marca, deporte, género y rango de precio para los
+    mismos filtros de /products/search (para construir la barra de filtros).
     """
-    return search_products(
-        db=db,
+    return facet_service.facet_counts(
+        db,
         search_query=q,
         category=category,
         brand=brand,
@@ -39,22 +160,77 @@ def search_products_endpoint(
         min_price=min_price,
         max_price=max_price,
         in_stock_only=in_stock,
-        skip=skip,
-        limit=limit
     )
 
+@router.get("/products/suggest", response_model=ProductSuggestions)
+def suggest_products(
+    q: str = Query("", description="Texto escrito hasta ahora en el buscador"),
+    limit: int = Query(8, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """
+    Top completions of ``q`` among product names, brands and categories,
+    from the in-memory prefix index (app/services/suggest_service.py). Does
+    not hit the database once the index is built.
+    """
+    return FastJSONResponse({"q": q, "suggestions": suggest_index.suggest(db, q, limit)})
+
 @router.get("/products/{product_id}", response_model=ProductResponse)
-def read_product(product_id: int, db: Session = Depends(get_db)):
-    db_product = get_product(db, product_id)
-    if db_product is None:
+def read_product(product_id: int, db: Session = Depends(get_db), http: Conditional = Depends(catalog_http_cache)):
+    def load():
+        db_product = get_product(db, product_id)
+        return ProductResponse.model_validate(db_product).model_dump(mode="json") if db_product is not None else None
+
+    cached = catalog_cache.fetch("product", {"id": product_id}, [product_tag(product_id)], load)
+    if cached[0] is None:
         raise HTTPException(status_code=404, detail="Product not found")
-    return db_product
+    return _conditional(http, cached)
 
 @router.post("/products", response_model=ProductResponse)
 def create_new_product(product: ProductCreate, db: Session = Depends(get_db)):
     return create_product(db, product)
 
 
+@router.post("/products/bulk", response_model=ProductImportReport)
+async def bulk_import_products(
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson o csv; por defecto según Content-Type"),
+    db: Session = Depends(get_db)
+):
+    """
+    Upsert a supplier feed by SKU. The body (NDJSON, one product per line, or
+    CSV with a header row) is streamed: parsing, validation and batched
+    INSERT ... ON CONFLICT run in a worker thread that pulls the body chunk by
+    chunk, so memory does not grow with the feed. Rows that fail validation or
+    whose batch is rejected by the database are listed in ``errors``.
+    """
+    try:
+        fmt = product_import.detect_format(request.headers.get("content-type"), format)
+    except ValueError as exc:
+        raise HTTPException(status_code=415, detail=str(exc))
+    # Antes de leer el cuerpo: sin upsert no se puede importar ninguna fila
+    if not product_import.supports_upsert(db):
+        raise HTTPException(
+            status_code=501,
+            detail=f"Bulk import is not supported on {db.get_bind().dialect.name}",
+        )
+
+    body = request.stream()
+
+    def chunks():
+        while True:
+            try:
+                yield from_thread.run(body.__anext__)
+            except StopAsyncIteration:
+                return
+
+    report = await run_in_threadpool(product_import.import_products, db, chunks(), fmt)
+    if report["upserted"]:
+        invalidate_catalog()
+        suggest_index.mark_stale()
+    return report
+
+
 @router.put("/products/{product_id}", response_model=ProductResponse)
 def update_existing_product(product_id: int, product: ProductUpdate, db: Session = Depends(get_db)):
     updated = update_product(db, product_id, product)
@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 from app.database import get_db
-from app.schemas.shipment_schema import ShipmentCreate, ShipmentUpdate, ShipmentStatusUpdate, ShipmentResponse
+from app.schemas.shipment_schema import (
+    ShipmentCreate, ShipmentUpdate, ShipmentStatusUpdate, ShipmentResponse,
+    ShipmentBulkStatusUpdate, ShipmentBulkStatusResult
+)
+from app.schemas.pagination_schema import Page
 from app.crud import shipment_crud
 from app.crud import order_crud
+from app.config import settings
+from app.services import shipment_lifecycle
+from app.services.fast_json import FIELDS_DESCRIPTION, SHIPMENT_ROWS, rows_response, select_fields
+from app.services.http_cache import Conditional, cache_control, etag_for
+from app.crud.pagination import MAX_PAGE_SIZE
 
 router = APIRouter()
 
@@ -35,15 +44,33 @@ def create_shipment(shipment: ShipmentCreate, db: Session = Depends(get_db)):
     
     return shipment_crud.create_shipment(db, shipment)
 
-@router.get("/shipments", response_model=List[ShipmentResponse])
+@router.get("/shipments", response_model=Union[List[ShipmentResponse], Page[ShipmentResponse]])
 def get_shipments(
     skip: int = 0, 
-    limit: int = 100, 
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
     status: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Paginación por cursor: vacío para la primera página, luego next_cursor"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
-    """Get all shipments with optional status filter"""
-    return shipment_crud.get_shipments(db, skip=skip, limit=limit, status=status)
+    """
+    Get all shipments with optional status filter.
+    With ``cursor`` the response is a ``{items, next_cursor}`` envelope, newest first.
+    With ``fields`` only those columns are selected and returned.
+    """
+    if cursor is not None:
+        rows = select_fields(SHIPMENT_ROWS, fields, keys=shipment_crud.SHIPMENT_PAGE_KEYS)
+        try:
+            items, next_cursor = shipment_crud.get_shipments_page(
+                db, cursor=cursor, limit=limit, status=status, columns=rows.columns
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return rows_response(rows, items, next_cursor, paged=True)
+    rows = select_fields(SHIPMENT_ROWS, fields)
+    return rows_response(
+        rows, shipment_crud.get_shipments(db, skip=skip, limit=limit, status=status, columns=rows.columns)
+    )
 
 @router.get("/shipments/{shipment_id}", response_model=ShipmentResponse)
 def get_shipment(shipment_id: int, db: Session = Depends(get_db)):
@@ -73,14 +100,27 @@ def get_shipment_by_order(order_id: int, db: Session = Depends(get_db)):
     return db_shipment
 
 @router.get("/shipments/tracking/{tracking_number}", response_model=ShipmentResponse)
-def get_shipment_by_tracking(tracking_number: str, db: Session = Depends(get_db)):
+def get_shipment_by_tracking(
+    tracking_number: str,
+    db: Session = Depends(get_db),
+    http: Conditional = Depends(cache_control(settings.TRACKING_HTTP_CACHE_CONTROL))
+):
     """
     Get shipment by tracking number.
     
     **Acceptance Criteria:**
     - Customers can track their shipment using the tracking number.
+
+    Responds 304 when If-None-Match holds the current ETag (id + updated_at),
+    checked with an index lookup before loading the shipment.
     """
-    db_shipment = shipment_crud.get_shipment_by_tracking(db, tracking_number)
+    version = shipment_crud.get_tracking_version(db, tracking_number)
+    db_shipment = None
+    if version is not None:
+        not_modified = http.check(etag_for("shipment", *version))
+        if not_modified is not None:
+            return not_modified
+        db_shipment = shipment_crud.get_shipment_by_tracking(db, tracking_number)
     if not db_shipment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -99,8 +139,12 @@ def update_shipment(
     
     **Acceptance Criteria:**
     - Logistics Operator can update tracking number, carrier, and vehicle information.
+
+    A status change also moves the order, as in PUT /shipments/{id}/status.
     """
-    db_shipment = shipment_crud.update_shipment(db, shipment_id, shipment_update)
+    db_shipment = shipment_lifecycle.update_shipment(
+        db, shipment_id, shipment_update.model_dump(exclude_unset=True)
+    )
     if not db_shipment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -122,24 +166,36 @@ def update_shipment_status(
       entonces el cliente debe ver la información del vehículo.
     - Dado que un envío se entrega, cuando lo marco como completado, 
       entonces el sistema debe actualizar el estado del pedido.
+
+    The shipment and its order are updated in the same transaction
+    (see shipment_lifecycle.ORDER_STATUS_FOR_SHIPMENT).
     """
-    db_shipment = shipment_crud.update_shipment_status(db, shipment_id, status_update)
+    db_shipment = shipment_lifecycle.update_shipment_status(
+        db, shipment_id, status_update.status, status_update.vehicle_info
+    )
     if not db_shipment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Shipment with id {shipment_id} not found"
         )
-    
-    # Update order status based on shipment status
-    if db_shipment.status == "delivered":
-        order_crud.update_order_status(db, db_shipment.order_id, "completed")
-    elif db_shipment.status == "shipped":
-        order_crud.update_order_status(db, db_shipment.order_id, "shipped")
-    elif db_shipment.status == "in_transit":
-        order_crud.update_order_status(db, db_shipment.order_id, "in_transit")
-    
     return db_shipment
 
+@router.post("/shipments/bulk-status", response_model=ShipmentBulkStatusResult)
+def bulk_update_shipment_status(bulk_update: ShipmentBulkStatusUpdate, db: Session = Depends(get_db)):
+    """
+    Move many shipments (by id and/or carrier, optionally only those in
+    ``current_status``) and their orders to a status in one transaction.
+    E.g. a whole carrier manifest to ``in_transit``.
+    """
+    updated = shipment_lifecycle.bulk_update_status(
+        db,
+        bulk_update.status,
+        shipment_ids=bulk_update.shipment_ids,
+        carrier=bulk_update.carrier,
+        current_status=bulk_update.current_status,
+    )
+    return {"status": bulk_update.status, "updated": updated}
+
 @router.delete("/shipments/{shipment_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_shipment(shipment_id: int, db: Session = Depends(get_db)):
     """Delete a shipment"""
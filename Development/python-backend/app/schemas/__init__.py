@@ -1,13 +1,35 @@
-from .product_schema import ProductBase, ProductCreate, ProductUpdate, ProductResponse
-from .order_schema import OrderBase, OrderCreate, OrderUpdate, OrderResponse
+from .product_schema import (
+    ProductBase, ProductCreate, ProductUpdate, ProductResponse,
+    ProductImportRow, ProductImportError, ProductImportReport,
+    FacetValue, PriceBucket, ProductFacets, ProductSuggestion, ProductSuggestions
+)
+from .order_schema import (
+    OrderBase, OrderCreate, OrderUpdate, OrderResponse,
+    OrderItemCreate, OrderItemResponse, OrderWithItemsResponse,
+    OrderItemDetailResponse, OrderDetailResponse
+)
 from .payment_schema import PaymentBase, PaymentCreate, PaymentResponse
 from .user_schema import UserBase, UserCreate, UserUpdate, UserResponse
-from .shipment_schema import ShipmentBase, ShipmentCreate, ShipmentUpdate, ShipmentStatusUpdate, ShipmentResponse
+from .shipment_schema import (
+    ShipmentBase, ShipmentCreate, ShipmentUpdate, ShipmentStatusUpdate, ShipmentResponse,
+    ShipmentBulkStatusUpdate, ShipmentBulkStatusResult
+)
+from .pagination_schema import Page
+from .analytics_schema import SalesRow, SalesReport, TopProduct, RollupMismatch, RollupCheck
+from .admin_schema import SqlFingerprint, SqlProfile
 
 __all__ = [
     "ProductBase", "ProductCreate", "ProductUpdate", "ProductResponse",
+    "ProductImportRow", "ProductImportError", "ProductImportReport",
+    "FacetValue", "PriceBucket", "ProductFacets", "ProductSuggestion", "ProductSuggestions",
     "OrderBase", "OrderCreate", "OrderUpdate", "OrderResponse",
+    "OrderItemCreate", "OrderItemResponse", "OrderWithItemsResponse",
+    "OrderItemDetailResponse", "OrderDetailResponse",
     "PaymentBase", "PaymentCreate", "PaymentResponse",
     "UserBase", "UserCreate", "UserUpdate", "UserResponse",
-    "ShipmentBase", "ShipmentCreate", "ShipmentUpdate", "ShipmentStatusUpdate", "ShipmentResponse"
+    "ShipmentBase", "ShipmentCreate", "ShipmentUpdate", "ShipmentStatusUpdate", "ShipmentResponse",
+    "ShipmentBulkStatusUpdate", "ShipmentBulkStatusResult",
+    "Page",
+    "SalesRow", "SalesReport", "TopProduct", "RollupMismatch", "RollupCheck",
+    "SqlFingerprint", "SqlProfile"
 ]
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import List
+
+class SqlFingerprint(BaseModel):
+    # SQL normalizado: literales y parámetros como ?, listas IN como (?...)
+    fingerprint: str
+    calls: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    rows: int
+    slow: int  # ejecuciones por encima de SQL_SLOW_QUERY_MS
+    routes: List[str]
+
+class SqlProfile(BaseModel):
+    """Sentencias agregadas por huella desde el arranque del proceso (o el último reset)"""
+    slow_query_ms: float
+    fingerprints: List[SqlFingerprint]
@@ -0,0 +1,43 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class SalesRow(BaseModel):
+    # Día (YYYY-MM-DD), estado, categoría o marca según group_by
+    key: Optional[str] = None
+    orders: Optional[int] = None  # solo por día y estado
+    units: Optional[int] = None   # solo por categoría y marca
+    revenue: float
+    paid: Optional[float] = None  # pagos completados; solo por día y estado
+
+class SalesReport(BaseModel):
+    group_by: str
+    date_from: str
+    date_to: str
+    rows: List[SalesRow]
+
+class TopProduct(BaseModel):
+    product_id: int
+    name: str
+    category: Optional[str] = None
+    brand: Optional[str] = None
+    units: int
+    revenue: float
+
+class RollupMismatch(BaseModel):
+    table: str
+    day: str
+    key: str
+    rollup: Optional[List[float]] = None
+    recomputed: Optional[List[float]] = None
+
+class RollupCheck(BaseModel):
+    """Resultado de comparar las tablas de resumen con un recálculo completo"""
+    consistent: bool
+    date_from: str
+    date_to: str
+    mismatches: List[RollupMismatch]
+    pending_days: List[str] = []  # marcados para el próximo recálculo; no se comparan
+
+class RollupRebuild(BaseModel):
+    """Días recalculados por /analytics/refresh o /analytics/rebuild"""
+    days: int
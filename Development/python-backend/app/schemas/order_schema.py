@@ -1,6 +1,23 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import AliasChoices, BaseModel, Field, model_validator
+from typing import Iterable, List, Optional
 from datetime import datetime
+from app.schemas.product_schema import ProductResponse
+from app.schemas.payment_schema import PaymentResponse
+from app.schemas.shipment_schema import ShipmentResponse
+
+class OrderItemCreate(BaseModel):
+    # productId: mismo formato de carrito que usa el frontend
+    product_id: int = Field(..., validation_alias=AliasChoices("product_id", "productId"))
+    quantity: int = Field(1, gt=0)
+
+class OrderItemResponse(BaseModel):
+    id: int
+    product_id: int
+    quantity: int
+    unit_price: float
+
+    class Config:
+        from_attributes = True
 
 class OrderBase(BaseModel):
     user_id: str  # UUID from MySQL users table
@@ -8,7 +25,15 @@ class OrderBase(BaseModel):
     shipping_address: Optional[str] = None
 
 class OrderCreate(OrderBase):
-    pass
+    # Con items el total se calcula en el servidor con los precios actuales
+    total: Optional[float] = None
+    items: List[OrderItemCreate] = []
+
+    @model_validator(mode="after")
+    def total_or_items(self):
+        if self.total is None and not self.items:
+            raise ValueError("total is required when the order has no items")
+        return self
 
 class OrderUpdate(BaseModel):
     status: Optional[str] = None
@@ -22,4 +47,35 @@ class OrderResponse(OrderBase):
     updated_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class OrderWithItemsResponse(OrderResponse):
+    items: List[OrderItemResponse] = []
+
+
+class OrderItemDetailResponse(OrderItemResponse):
+    product: Optional[ProductResponse] = None
+
+class OrderDetailResponse(OrderResponse):
+    """Order plus the relations requested with ?include= (the rest are omitted)"""
+    items: Optional[List[OrderItemDetailResponse]] = None
+    shipment: Optional[ShipmentResponse] = None
+    payments: Optional[List[PaymentResponse]] = None
+
+    @classmethod
+    def from_order(cls, order, include: Iterable[str] = ()):
+        """Serialize only the included relations, so nothing else is lazy-loaded"""
+        data = OrderResponse.model_validate(order).model_dump()
+        if "items" in include:
+            data["items"] = [
+                OrderItemDetailResponse(
+                    **OrderItemResponse.model_validate(item).model_dump(),
+                    **({"product": ProductResponse.model_validate(item.product)} if "product" in include else {})
+                )
+                for item in order.items
+            ]
+        if "shipment" in include:
+            data["shipment"] = order.shipment and ShipmentResponse.model_validate(order.shipment)
+        if "payments" in include:
+            data["payments"] = [PaymentResponse.model_validate(payment) for payment in order.payments]
+        return cls(**data)
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    """Response envelope for cursor-paginated lists"""
+    items: List[T]
+    # Opaque cursor for the next page; null on the last page
+    next_cursor: Optional[str] = None
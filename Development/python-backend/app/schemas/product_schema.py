@@ -1,7 +1,8 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class ProductBase(BaseModel):
+    sku: Optional[str] = Field(None, max_length=64)
     name: str
     description: Optional[str] = None
     price: float
@@ -17,6 +18,7 @@ class ProductCreate(ProductBase):
     pass
 
 class ProductUpdate(BaseModel):
+    sku: Optional[str] = Field(None, max_length=64)
     name: Optional[str] = None
     description: Optional[str] = None
     price: Optional[float] = None
@@ -32,4 +34,47 @@ class ProductResponse(ProductBase):
     id: int
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ProductImportRow(ProductCreate):
+    """One row of a bulk import feed; the SKU is the upsert key"""
+    sku: str = Field(..., min_length=1, max_length=64)
+
+class ProductImportError(BaseModel):
+    row: int
+    sku: Optional[str] = None
+    errors: List[str]
+
+class ProductImportReport(BaseModel):
+    received: int
+    upserted: int
+    failed: int
+    errors: List[ProductImportError]
+    errors_truncated: bool = False
+
+class FacetValue(BaseModel):
+    value: str
+    count: int
+
+class PriceBucket(BaseModel):
+    min: float
+    max: Optional[float] = None  # None: sin límite superior
+    count: int
+
+class ProductFacets(BaseModel):
+    """Conteos por faceta; cada faceta ignora su propio filtro"""
+    total: int
+    category: List[FacetValue]
+    brand: List[FacetValue]
+    sport: List[FacetValue]
+    gender: List[FacetValue]
+    price: List[PriceBucket]
+
+class ProductSuggestion(BaseModel):
+    text: str
+    type: str  # name, brand o category
+
+class ProductSuggestions(BaseModel):
+    """Autocompletado del buscador (GET /products/suggest)"""
+    q: str
+    suggestions: List[ProductSuggestion]
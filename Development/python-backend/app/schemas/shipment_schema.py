@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
 from datetime import datetime
 
 class ShipmentBase(BaseModel):
@@ -24,6 +24,23 @@ class ShipmentStatusUpdate(BaseModel):
     status: str = Field(..., pattern="^(pending|shipped|in_transit|delivered|cancelled)$")
     vehicle_info: Optional[str] = None
 
+class ShipmentBulkStatusUpdate(BaseModel):
+    """Schema for moving many shipments (e.g. a carrier manifest) to one status"""
+    status: str = Field(..., pattern="^(pending|shipped|in_transit|delivered|cancelled)$")
+    shipment_ids: Optional[List[int]] = None
+    carrier: Optional[str] = None
+    current_status: Optional[str] = Field(None, pattern="^(pending|shipped|in_transit|delivered|cancelled)$")
+
+    @model_validator(mode="after")
+    def ids_or_carrier(self):
+        if self.shipment_ids is None and self.carrier is None:
+            raise ValueError("shipment_ids or carrier is required")
+        return self
+
+class ShipmentBulkStatusResult(BaseModel):
+    status: str
+    updated: int
+
 class ShipmentResponse(ShipmentBase):
     id: int
     status: str
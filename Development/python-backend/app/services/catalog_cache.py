@@ -0,0 +1,268 @@
+"""
+Read-through cache for catalog reads (GET /products, /products/{id},
+/products/search).
+
+Entries are the serialized responses (plain dicts), keyed by the route and
+its normalized query parameters, with a content hash used as the response
+ETag (app/services/http_cache.py). Entries carry tags:
+
+- ``catalog``: every entry (bulk imports invalidate everything);
+- ``products``: lists and searches (any product write);
+- ``product:{id}``: one product (its update, delete or stock change).
+
+Invalidation does not look for keys: each tag has a version number, every
+entry remembers the versions it was built with, and ``invalidate`` bumps
+the versions. A read whose entry has older versions is a miss. Versions are
+read before loading, so a write that lands while an entry is being built
+leaves that entry already stale.
+
+Two tiers: a per-process LRU (always) and an optional shared backend
+(CATALOG_CACHE_BACKEND): ``redis`` (requires the redis package) or
+``local``, an in-process stand-in with the same interface for tests and
+single-worker deployments. With a shared backend the tag versions live
+there too, so a write in one worker invalidates every worker's LRU.
+"""
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+from app.config import settings
+from app.services.ttl_cache import TTLCache
+
+CATALOG_TAG = "catalog"
+LIST_TAG = "products"
+
+
+def product_tag(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def cache_key(namespace: str, params: Dict[str, Any]) -> str:
+    """Stable key: parameters without None values, sorted; free text lowercased and whitespace-collapsed"""
+    normalized = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        if name == "q":
+            value = " ".join(str(value).lower().split())
+        normalized[name] = value
+    return f"{namespace}:{json.dumps(normalized, sort_keys=True, separators=(',', ':'))}"
+
+
+class LocalSharedBackend:
+    """In-process stand-in for a shared cache (same operations as RedisBackend)"""
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        with self._lock:
+            values = []
+            for key in keys:
+                value, expires_at = self._data.get(key, (None, None))
+                values.append(value if expires_at is None or expires_at > now else None)
+            return values
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl if ttl else None)
+
+    def incr_many(self, keys: List[str]) -> None:
+        with self._lock:
+            for key in keys:
+                value, _ = self._data.get(key, (b"0", None))
+                self._data[key] = (str(int(value) + 1).encode(), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend:
+    """Shared cache on Redis; the redis package is only needed with CATALOG_CACHE_BACKEND=redis"""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return self._client.mget(keys)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self._client.set(key, value, ex=int(ttl) if ttl else None)
+
+    def incr_many(self, keys: List[str]) -> None:
+        pipeline = self._client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.incr(key)
+        pipeline.execute()
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter("catalog-cache:*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+def content_etag(serialized: bytes) -> str:
+    """Strong ETag of a serialized response"""
+    return '"' + hashlib.blake2b(serialized, digest_size=16).hexdigest() + '"'
+
+
+def _serialize(value: Any) -> bytes:
+    return json.dumps(value, default=str, sort_keys=True, separators=(",", ":")).encode()
+
+
+class _Entry:
+    __slots__ = ("value", "versions", "etag", "size")
+
+    def __init__(self, value: Any, versions: tuple, etag: str, size: int):
+        self.value = value
+        self.versions = versions
+        self.etag = etag
+        self.size = size
+
+
+class CatalogCache:
+    """Two-tier read-through cache with tag invalidation (see module docstring)"""
+
+    PREFIX = "catalog-cache:"
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 60.0, backend=None, enabled: bool = True):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.backend = backend
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # Aciertos propios: una entrada con versiones viejas cuenta como fallo
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+
+    def _current_versions(self, tags: List[str]) -> tuple:
+        if self.backend is not None:
+            raw = self.backend.get_many([f"{self.PREFIX}v:{tag}" for tag in tags])
+            return tuple(int(value) if value is not None else 0 for value in raw)
+        with self._lock:
+            return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    def get_or_load(self, namespace: str, params: Dict[str, Any], tags: Iterable[str], loader: Callable[[], Any]) -> Any:
+        """Cached value for ``namespace``+``params``, or ``loader()`` (stored under ``tags``)"""
+        return self.fetch(namespace, params, tags, loader)[0]
+
+    def fetch(
+        self, namespace: str, params: Dict[str, Any], tags: Iterable[str], loader: Callable[[], Any]
+    ) -> Tuple[Any, str]:
+        """Like get_or_load, also returning the value's ETag (hashed once, when the entry is filled)"""
+        if not self.enabled:
+            value = loader()
+            return value, content_etag(_serialize(value))
+        tags = [CATALOG_TAG, *tags]
+        key = cache_key(namespace, params)
+        versions = self._current_versions(tags)
+
+        with self._lock:
+            entry = self._local.get(key)
+        if entry is not None and entry.versions == versions:
+            self.hits += 1
+            return entry.value, entry.etag
+
+        if self.backend is not None:
+            raw = self.backend.get_many([self.PREFIX + key])[0]
+            if raw is not None:
+                stored = json.loads(raw)
+                if tuple(stored["versions"]) == versions:
+                    self.hits += 1
+                    self.shared_hits += 1
+                    self._store_local(key, _Entry(stored["value"], versions, stored["etag"], len(raw)))
+                    return stored["value"], stored["etag"]
+
+        self.misses += 1
+        value = loader()
+        serialized = _serialize(value)
+        etag = content_etag(serialized)
+        self._store_local(key, _Entry(value, versions, etag, len(serialized)))
+        if self.backend is not None:
+            payload = json.dumps({"value": value, "versions": versions, "etag": etag}, default=str).encode()
+            self.backend.set(self.PREFIX + key, payload, self.ttl)
+        return value, etag
+
+    def _store_local(self, key: Hashable, entry: _Entry) -> None:
+        with self._lock:
+            self._local.set(key, entry)
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        tags = list(tags)
+        if not tags:
+            return
+        if self.backend is not None:
+            self.backend.incr_many([f"{self.PREFIX}v:{tag}" for tag in tags])
+            return
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local.clear()
+            self._versions.clear()
+            self.hits = self.misses = self.shared_hits = 0
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._local)
+            memory = sum(entry.size for entry in self._local.values())
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "maxsize": self._local.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__ if self.backend is not None else None,
+            "shared_hits": self.shared_hits,
+            "memory_bytes": memory,
+            "ttl_seconds": self.ttl,
+        }
+
+
+def _build_backend():
+    kind = settings.CATALOG_CACHE_BACKEND
+    if kind == "redis":
+        return RedisBackend(settings.CATALOG_CACHE_URL)
+    if kind == "local":
+        return LocalSharedBackend()
+    return None
+
+
+catalog_cache = CatalogCache(
+    maxsize=settings.CATALOG_CACHE_MAX_ENTRIES,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+    backend=_build_backend(),
+    enabled=settings.CATALOG_CACHE_ENABLED,
+)
+
+
+def invalidate_products(product_ids: Iterable[int], lists: bool = True) -> None:
+    """
+    After a product write: its own entries and, with ``lists``, every list.
+    Orders pass lists=False unless a product sold out or came back in stock.
+    """
+    tags = [product_tag(product_id) for product_id in product_ids]
+    catalog_cache.invalidate(tags + [LIST_TAG] if lists else tags)
+
+
+def invalidate_catalog() -> None:
+    """After a write that may touch any product (bulk import)"""
+    catalog_cache.invalidate([CATALOG_TAG])
+
+
+def catalog_cache_stats() -> Dict[str, Any]:
+    return catalog_cache.stats()
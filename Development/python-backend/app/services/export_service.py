@@ -0,0 +1,104 @@
+"""
+Streaming exports of orders, payments and shipments as NDJSON or CSV.
+
+Rows are read with a server-side cursor (``stream_results`` + ``yield_per``)
+as plain Core rows, never as ORM objects or Pydantic models, and encoded one
+partition at a time. Memory therefore depends on ``PARTITION_SIZE``, not on
+how many rows are exported, and there is no OFFSET: the query runs once.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from typing import Iterator, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.order import Order
+from app.models.payment import Payment
+from app.models.shipment import Shipment
+
+FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+PARTITION_SIZE = 1000
+
+# Columnas exportadas, con los mismos nombres que las respuestas de la API
+EXPORTS = {
+    "orders": (Order, ["id", "user_id", "total", "status", "shipping_address", "created_at", "updated_at"]),
+    "payments": (Payment, ["id", "order_id", "amount", "payment_method", "payment_status"]),
+    "shipments": (Shipment, [
+        "id", "order_id", "tracking_number", "carrier", "vehicle_info", "status",
+        "shipped_at", "delivered_at", "created_at", "updated_at",
+    ]),
+}
+
+
+def export_statement(
+    resource: str,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """
+    SELECT for one export. ``created_to`` is exclusive. Payments have no
+    timestamp of their own: the date range applies to their order's created_at.
+    """
+    model, columns = EXPORTS[resource]
+    statement = select(*[getattr(model, column).label(column) for column in columns])
+
+    if model is Payment:
+        if status:
+            statement = statement.where(Payment.payment_status == status)
+        if created_from or created_to:
+            statement = statement.join(Order, Order.id == Payment.order_id)
+        created_at, order_by = Order.created_at, [Payment.id]
+    else:
+        if status:
+            statement = statement.where(model.status == status)
+        created_at, order_by = model.created_at, [model.created_at, model.id]
+
+    if created_from:
+        statement = statement.where(created_at >= created_from)
+    if created_to:
+        statement = statement.where(created_at < created_to)
+    return statement.order_by(*order_by)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def stream_export(db: Session, resource: str, fmt: str, partition_size: int = PARTITION_SIZE, **filters) -> Iterator[bytes]:
+    """Yield the export as byte chunks, one per partition of rows"""
+    columns = EXPORTS[resource][1]
+    result = db.execute(
+        export_statement(resource, **filters),
+        execution_options={"stream_results": True, "yield_per": partition_size},
+    )
+    try:
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerow(columns)
+            for partition in result.partitions():
+                writer.writerows([_csv_value(value) for value in row] for row in partition)
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue().encode()
+        else:
+            encode = json.JSONEncoder(default=_json_default, ensure_ascii=False).encode
+            for partition in result.partitions():
+                yield "".join(encode(dict(zip(columns, row))) + "\n" for row in partition).encode()
+    finally:
+        result.close()
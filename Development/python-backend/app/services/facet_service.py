@@ -0,0 +1,194 @@
+"""
+Facet counts for the catalog sidebar (category, brand, sport, gender and
+price ranges) in one grouped pass over the products.
+
+Counts are disjunctive: the counts of a facet apply every active filter
+except that facet's own, so with ``brand=Nike`` the brand list still shows
+how many products each other brand would give. Full-text search and
+``in_stock`` narrow every facet.
+
+PostgreSQL groups by GROUPING SETS, one set per facet plus the total. Other
+dialects group by the combination of all facet columns and the rows are
+rolled up in Python. Either way it is a single statement and a single scan.
+
+The unfiltered catalog, which every sidebar shows first, is served from the
+product_facets table. Catalog writes (app/crud/product_crud.py, the bulk
+import) empty the table in their own transaction, and it is also rebuilt
+once it is older than FACET_CACHE_TTL_SECONDS.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import and_, case, delete, func, insert, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.product import Product
+from app.models.product_facet import ProductFacet
+from app.services.search_service import apply_text_search
+
+FACETS = ("category", "brand", "sport", "gender")
+# Columnas cuyo cambio invalida la tabla de facetas
+FACET_COLUMNS = frozenset(FACETS + ("price",))
+
+
+def price_bucket_edges() -> List[float]:
+    return [float(edge) for edge in settings.FACET_PRICE_BUCKETS.split(",") if edge.strip()]
+
+
+def _bucket_expression(edges: List[float]):
+    return case(*[(Product.price < edge, index) for index, edge in enumerate(edges)], else_=len(edges))
+
+
+def _counts(rows_filter: Dict[str, object]):
+    """Count per facet ignoring its own filter, plus the total under all filters"""
+    def count_without(facet: Optional[str]):
+        others = [condition for name, condition in rows_filter.items() if name != facet]
+        if not others:
+            return func.count()
+        return func.count().filter(and_(*others))
+
+    return {facet: count_without(facet) for facet in FACETS + ("price", None)}
+
+
+def _compute(
+    db: Session,
+    search_query: Optional[str] = None,
+    category: Optional[str] = None,
+    brand: Optional[str] = None,
+    sport: Optional[str] = None,
+    gender: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock_only: bool = False,
+) -> dict:
+    edges = price_bucket_edges()
+    base = db.query(
+        Product.category, Product.brand, Product.sport, Product.gender, Product.price,
+        _bucket_expression(edges).label("price_bucket"),
+    )
+    if in_stock_only:
+        base = base.filter(Product.in_stock == True, Product.stock_quantity > 0)
+    if search_query:
+        base = apply_text_search(db, base, search_query, rank=False)
+    rows = base.subquery()
+
+    conditions = {}
+    for facet, value in (("category", category), ("brand", brand), ("sport", sport), ("gender", gender)):
+        if value:
+            conditions[facet] = rows.c[facet] == value
+    price = []
+    if min_price is not None:
+        price.append(rows.c.price >= min_price)
+    if max_price is not None:
+        price.append(rows.c.price <= max_price)
+    if price:
+        conditions["price"] = and_(*price)
+
+    counts = _counts(conditions)
+    columns = {facet: rows.c[facet] for facet in FACETS}
+    columns["price"] = rows.c.price_bucket
+    selected = [column.label(name) for name, column in columns.items()] + [
+        count.label(f"{name or 'total'}_count") for name, count in counts.items()
+    ]
+
+    totals = {name: {} for name in columns}
+    total = 0
+    if db.get_bind().dialect.name == "postgresql":
+        groupings = [func.grouping(column).label(f"{name}_grouping") for name, column in columns.items()]
+        statement = db.query(*selected, *groupings).group_by(
+            func.grouping_sets(*[tuple_(column) for column in columns.values()], tuple_())
+        )
+        for row in statement:
+            grouped = [name for name in columns if getattr(row, f"{name}_grouping") == 0]
+            if not grouped:
+                total = row.total_count or 0
+                continue
+            name = grouped[0]
+            totals[name][getattr(row, name)] = getattr(row, f"{name}_count") or 0
+    else:
+        for row in db.query(*selected).group_by(*columns.values()):
+            total += row.total_count or 0
+            for name in columns:
+                value = getattr(row, name)
+                totals[name][value] = totals[name].get(value, 0) + (getattr(row, f"{name}_count") or 0)
+
+    return _shape(total, totals, edges)
+
+
+def _shape(total: int, totals: Dict[str, Dict], edges: List[float]) -> dict:
+    facets = {"total": total}
+    for name in FACETS:
+        values = [(value, count) for value, count in totals[name].items() if value is not None and count]
+        values.sort(key=lambda item: (-item[1], item[0]))
+        facets[name] = [{"value": value, "count": count} for value, count in values]
+    bounds = [0.0] + edges
+    facets["price"] = [
+        {
+            "min": bounds[index],
+            "max": edges[index] if index < len(edges) else None,
+            "count": totals["price"].get(index, 0),
+        }
+        for index in range(len(bounds))
+    ]
+    return facets
+
+
+def _table_rows(facets: dict, now: datetime) -> List[dict]:
+    rows = [{"facet": "total", "value": "", "count": facets["total"], "refreshed_at": now}]
+    for name in FACETS:
+        rows += [{"facet": name, "value": item["value"], "count": item["count"], "refreshed_at": now}
+                 for item in facets[name]]
+    rows += [{"facet": "price", "value": str(index), "count": item["count"], "refreshed_at": now}
+             for index, item in enumerate(facets["price"])]
+    return rows
+
+
+def _from_table(rows: List[ProductFacet], edges: List[float]) -> Optional[dict]:
+    totals = {name: {} for name in FACETS + ("price",)}
+    total = None
+    for row in rows:
+        if row.facet == "total":
+            total = row.count
+        elif row.facet == "price":
+            totals["price"][int(row.value)] = row.count
+        elif row.facet in totals:
+            totals[row.facet][row.value] = row.count
+    if total is None or len(totals["price"]) != len(edges) + 1:
+        return None  # tabla incompleta o de otra configuración de rangos
+    return _shape(total, totals, edges)
+
+
+def refresh_facet_table(db: Session) -> dict:
+    """Recompute the unfiltered facets and replace the product_facets rows"""
+    facets = _compute(db)
+    try:
+        db.execute(delete(ProductFacet))
+        db.execute(insert(ProductFacet), _table_rows(facets, datetime.utcnow()))
+        db.commit()
+    except IntegrityError:
+        # Otra petición la recalculó al mismo tiempo: su contenido es equivalente
+        db.rollback()
+    return facets
+
+
+def invalidate_facet_table(db: Session) -> None:
+    """
+    Empty product_facets inside the caller's transaction, so it commits (or
+    rolls back) with the catalog write; the next read rebuilds it.
+    """
+    db.execute(delete(ProductFacet))
+
+
+def catalog_facets(db: Session) -> dict:
+    """Facets of the unfiltered catalog, from product_facets while it is fresh"""
+    fresh_after = datetime.utcnow() - timedelta(seconds=settings.FACET_CACHE_TTL_SECONDS)
+    rows = db.query(ProductFacet).filter(ProductFacet.refreshed_at > fresh_after).all()
+    facets = _from_table(rows, price_bucket_edges()) if rows else None
+    return facets if facets is not None else refresh_facet_table(db)
+
+
+def facet_counts(db: Session, **filters) -> dict:
+    """Facet counts for the filters of /products/search (same argument names as search_products)"""
+    if not any(value not in (None, "", False) for value in filters.values()):
+        return catalog_facets(db)
+    return _compute(db, **filters)
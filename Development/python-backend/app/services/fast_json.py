@@ -0,0 +1,132 @@
+"""
+Fast JSON path for list routes.
+
+With ``response_model`` FastAPI validates every ORM instance through
+Pydantic, dumps it to a dict and encodes that with the stdlib ``json``. For
+a 100-row page this costs more than the query itself. List routes use this
+path instead:
+
+- ``RowSerializer`` is built once per response schema. It holds the mapped
+  columns of the schema's fields, in the schema's order. The crud list
+  functions select only those columns (``columns=...``), so SQLAlchemy
+  returns plain ``Row`` tuples without creating ORM instances.
+- ``dump`` turns each row into a dict with ``zip``, with no per-field
+  validation. The columns have the types the schema declares (Float,
+  Boolean, DateTime), so the output equals the Pydantic one.
+- ``project`` gives the serializer of a ``?fields=`` subset, so the
+  projection reaches the SELECT as well as the JSON.
+- ``FastJSONResponse`` encodes with orjson, which handles datetimes
+  natively. orjson is optional: without it the stdlib ``json`` is used.
+
+``response_model`` stays on the routes for the OpenAPI schema. It is not
+applied because the route returns a Response.
+"""
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Type
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.models.order import Order
+from app.models.payment import Payment
+from app.models.product import Product
+from app.models.shipment import Shipment
+from app.schemas.order_schema import OrderResponse
+from app.schemas.payment_schema import PaymentResponse
+from app.schemas.product_schema import ProductResponse
+from app.schemas.shipment_schema import ShipmentResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON bytes (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RowSerializer:
+    """Column list and row -> dict conversion for one response schema"""
+
+    def __init__(self, schema: Type[BaseModel], model, fields: Sequence[str] = (), keys: Sequence = ()):
+        self.schema = schema
+        self.model = model
+        self.fields = tuple(fields or schema.model_fields)
+        # Atributos mapeados (no table.c): Payment.payment_method es la columna "method"
+        self.columns = [getattr(model, name) for name in self.fields]
+        # Claves del cursor que no se pidieron: se seleccionan al final y zip las descarta
+        self.columns += [key for key in keys if key.key not in self.fields]
+        self._projections: Dict[tuple, "RowSerializer"] = {}
+
+    def dump(self, rows: Iterable[tuple]) -> List[Dict[str, Any]]:
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in rows]
+
+    def project(self, fields: Optional[str], keys: Sequence = ()) -> "RowSerializer":
+        """
+        Serializer for ``fields`` (comma-separated, as in ``?fields=``) in
+        schema order; ``keys`` are the keyset pagination columns, selected
+        but not returned. Raises ValueError on fields the schema does not have.
+        """
+        requested = {name.strip() for name in (fields or "").split(",") if name.strip()}
+        if not requested and not keys:
+            return self
+        unknown = requested - set(self.schema.model_fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        selected = tuple(name for name in self.schema.model_fields if name in requested) or self.fields
+        cache_key = (selected, tuple(key.key for key in keys))
+        projection = self._projections.get(cache_key)
+        if projection is None:
+            projection = RowSerializer(self.schema, self.model, selected, keys)
+            self._projections[cache_key] = projection
+        return projection
+
+
+FIELDS_DESCRIPTION = "Campos a devolver, separados por coma (p. ej. id,name,price,image_url,in_stock)"
+
+
+def select_fields(serializer: RowSerializer, fields: Optional[str], keys: Sequence = ()) -> RowSerializer:
+    """``serializer.project`` for a route: unknown fields are a 400"""
+    try:
+        return serializer.project(fields, keys)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+PRODUCT_ROWS = RowSerializer(ProductResponse, Product)
+ORDER_ROWS = RowSerializer(OrderResponse, Order)
+PAYMENT_ROWS = RowSerializer(PaymentResponse, Payment)
+SHIPMENT_ROWS = RowSerializer(ShipmentResponse, Shipment)
+
+
+def rows_response(
+    serializer: RowSerializer,
+    rows: Iterable[tuple],
+    next_cursor: Optional[str] = None,
+    paged: bool = False,
+    headers: Optional[Mapping[str, str]] = None,
+) -> FastJSONResponse:
+    """List response, or the ``{items, next_cursor}`` envelope when ``paged``"""
+    items = serializer.dump(rows)
+    content = {"items": items, "next_cursor": next_cursor} if paged else items
+    return FastJSONResponse(content, headers=headers)
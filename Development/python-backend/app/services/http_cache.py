@@ -0,0 +1,65 @@
+"""
+Conditional GET support: ETag / If-None-Match and per-route Cache-Control.
+
+A route declares its policy with ``Depends(cache_control("..."))`` and gets
+a ``Conditional`` for the request. Once it knows the resource's ETag (from
+the catalog cache entry or a cheap validator such as ``updated_at``) it
+calls ``check``. If the client already has that version, ``check`` returns
+the 304 response to send, so the full query and serialization are skipped.
+Otherwise ``check`` sets ETag and Cache-Control on the 200 response.
+
+Compute the ETag before loading the body: if a write commits between the
+two, the response pairs the old ETag with the new body. The client's next
+revalidation then gets a 200, never a wrong 304.
+"""
+import hashlib
+import json
+from typing import Optional
+from fastapi import Request, Response
+
+
+def etag_for(*validators) -> str:
+    """Strong ETag from validator values (ids, updated_at, versions)"""
+    digest = hashlib.blake2b(json.dumps(validators, default=str).encode(), digest_size=16)
+    return '"' + digest.hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class Conditional:
+    """Per-request helper returned by the cache_control() dependency"""
+
+    def __init__(self, request: Request, response: Response, policy: str):
+        self.request = request
+        self.response = response
+        self.policy = policy
+        self.headers = {"Cache-Control": policy}
+
+    def check(self, etag: str) -> Optional[Response]:
+        """
+        304 response if the client already has ``etag``; otherwise None and the
+        headers are set on the 200 (routes returning their own Response pass
+        ``self.headers``)
+        """
+        self.headers = {"ETag": etag, "Cache-Control": self.policy}
+        if etag_matches(self.request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=self.headers)
+        self.response.headers.update(self.headers)
+        return None
+
+
+def cache_control(policy: str):
+    """Dependency factory: ``http: Conditional = Depends(cache_control("public, no-cache"))``"""
+    def dependency(request: Request, response: Response) -> Conditional:
+        response.headers["Cache-Control"] = policy
+        return Conditional(request, response, policy)
+
+    return dependency
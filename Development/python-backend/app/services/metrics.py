@@ -0,0 +1,346 @@
+"""
+Prometheus metrics for GET /metrics (text exposition format 0.0.4).
+
+A small in-process registry, so the API needs no extra dependency:
+
+- ``MetricsMiddleware`` is a pure ASGI middleware. It records request
+  counts and latency per method, route template and status class. The
+  template is the ``path`` of the route FastAPI matched (scope["route"]),
+  e.g. ``/api/v1/products/{product_id}``, never the raw URL. Requests that
+  match no route are counted under ``unmatched``.
+- ``instrument_engine`` hooks the execute calls of a SQLAlchemy engine and
+  counts statements and their time, in total and per request. A context
+  variable carries the per-request counter into the threadpool where the
+  sync routes run.
+- ``TimedQueuePool`` / ``TimedAsyncQueuePool`` time how long a checkout
+  waits for a free connection; in-use, idle and overflow counts are read
+  from the pool at scrape time.
+- ``observe_upstream`` times the calls to the auth service (UserService).
+- ``register_stats`` exposes the stats() of the catalog and auth caches.
+
+Label values are bounded by the route table, so cardinality stays low.
+Each metric has its own lock, held only to update a few floats.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Segundos; cubren desde aciertos de caché hasta peticiones lentas
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Por combinación de labels: [conteo por bucket (no acumulado)..., +Inf], suma
+        self._values: Dict[tuple, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose samples are read from ``collect`` at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 collect: Callable[[], Dict[tuple, float]]):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+                for key, value in sorted(self.collect().items())]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by method, route template and status class",
+    ("method", "route", "status")))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route")))
+request_queries = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per request",
+    ("method", "route"), buckets=QUERY_COUNT_BUCKETS))
+request_query_time = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request",
+    ("method", "route")))
+db_queries = registry.register(Counter("db_queries_total", "SQL statements executed", ("engine",)))
+db_query_time = registry.register(Counter(
+    "db_query_seconds_total", "Time spent in SQL statements", ("engine",)))
+pool_wait = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time waiting for a pooled connection", ("pool",)))
+upstream_latency = registry.register(Histogram(
+    "upstream_request_duration_seconds", "Calls to other services by endpoint and outcome",
+    ("service", "endpoint", "outcome")))
+
+# Pools observados: nombre -> pool (se leen al exponer las métricas)
+_pools: Dict[str, object] = {}
+
+
+def _pool_status() -> Dict[tuple, float]:
+    status = {}
+    for name, pool in list(_pools.items()):
+        if not hasattr(pool, "checkedout"):
+            continue  # NullPool/StaticPool: sin conteos
+        status[(name, "in_use")] = pool.checkedout()
+        status[(name, "idle")] = pool.checkedin()
+        status[(name, "overflow")] = max(pool.overflow(), 0)
+        status[(name, "size")] = pool.size()
+    return status
+
+
+registry.register(Gauge("db_pool_connections", "Pool connections by state", ("pool", "state"), _pool_status))
+
+# Estadísticas de las cachés (catálogo, autenticación): nombre -> función stats()
+_stats_sources: Dict[str, Callable[[], dict]] = {}
+
+
+def register_stats(cache: str, collect: Callable[[], dict]) -> None:
+    """Expose the numeric fields of ``collect()`` as app_cache{cache, stat}"""
+    _stats_sources[cache] = collect
+
+
+def _cache_stats() -> Dict[tuple, float]:
+    values = {}
+    for cache, collect in list(_stats_sources.items()):
+        for stat, value in collect().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values[(cache, stat)] = value
+    return values
+
+
+registry.register(Gauge("app_cache", "Cache statistics (size, hits, misses, ...)", ("cache", "stat"), _cache_stats))
+
+
+# ---- por petición ----
+
+class _RequestStats:
+    __slots__ = ("queries", "seconds", "engine")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.engine = None
+
+
+_request_stats: ContextVar[Optional[_RequestStats]] = ContextVar("request_stats", default=None)
+
+
+_STATUS_CLASSES = {digit: f"{digit}xx" for digit in range(1, 6)}
+
+
+def _status_class(status: int) -> str:
+    return _STATUS_CLASSES.get(status // 100) or f"{status // 100}xx"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, latency and SQL usage per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        stats = _RequestStats()
+        token = _request_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.inc(method, template, _status_class(status))
+            http_latency.observe(elapsed, method, template)
+            request_queries.observe(stats.queries, method, template)
+            request_query_time.observe(stats.seconds, method, template)
+            if stats.queries:
+                _record_queries(stats.engine, stats.queries, stats.seconds)
+
+
+# ---- base de datos ----
+
+def _record_queries(engine: str, count: int, seconds: float) -> None:
+    db_queries.inc(engine, amount=count)
+    db_query_time.inc(engine, amount=seconds)
+
+
+def instrument_engine(engine, name: str = "sync") -> None:
+    """Count and time every statement of ``engine`` (sync Engine, or async_engine.sync_engine)
+
+    Uses the dialect's do_execute hooks, which wrap the DBAPI call itself:
+    before/after_cursor_execute would switch every connection of the engine
+    to SQLAlchemy's slower event path. Inside a request the statements only
+    update its _RequestStats (no lock); the middleware adds them to the
+    global counters once, when it ends.
+    """
+    dialect = engine.dialect
+
+    def _observe(started: float) -> None:
+        elapsed = time.perf_counter() - started
+        stats = _request_stats.get()
+        if stats is None:
+            _record_queries(name, 1, elapsed)  # fuera de una petición (scripts, tareas)
+        else:
+            stats.queries += 1
+            stats.seconds += elapsed
+            stats.engine = name
+
+    @event.listens_for(engine, "do_execute")
+    def _do_execute(cursor, statement, parameters, context):
+        started = time.perf_counter()
+        try:
+            dialect.do_execute(cursor, statement, parameters, context)
+        finally:
+            _observe(started)
+        return True
+
+    @event.listens_for(engine, "do_execute_no_params")
+    def _do_execute_no_params(cursor, statement, context):
+        started = time.perf_counter()
+        try:
+            dialect.do_execute_no_params(cursor, statement, context)
+        finally:
+            _observe(started)
+        return True
+
+    @event.listens_for(engine, "do_executemany")
+    def _do_executemany(cursor, statement, parameters, context):
+        started = time.perf_counter()
+        try:
+            dialect.do_executemany(cursor, statement, parameters, context)
+        finally:
+            _observe(started)
+        return True
+
+    _pools[name] = engine.pool
+
+
+class _TimedCheckout:
+    """Pool mixin: histogram of the time ``_do_get`` waits for a connection"""
+    metrics_name = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait.observe(time.perf_counter() - started, self.metrics_name)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    metrics_name = "sync"
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+
+# ---- servicios externos ----
+
+def observe_upstream(service: str, endpoint: str, started: float, status: Optional[int] = None) -> None:
+    """Record a call that began at ``started`` (perf_counter); ``status`` None means it failed"""
+    outcome = _status_class(status) if status is not None else "error"
+    upstream_latency.observe(time.perf_counter() - started, service, endpoint, outcome)
+
+
+def render() -> str:
+    return registry.render()
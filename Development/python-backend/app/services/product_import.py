@@ -0,0 +1,198 @@
+"""
+Bulk product import: NDJSON or CSV feeds upserted by SKU.
+
+The body is consumed as an iterator of byte chunks and parsed line by line,
+so memory is bounded by ``batch_size`` rows (plus the error report, capped
+at ``max_errors`` entries) regardless of the feed size. Each batch is
+validated with ProductImportRow and written with a batched
+``INSERT ... ON CONFLICT (sku) DO UPDATE`` and its own commit: a failing
+batch is rolled back and reported without losing the batches before it.
+Only dialects with that statement (PostgreSQL, SQLite) are supported; check
+``supports_upsert`` before reading the body.
+"""
+import codecs
+import csv
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.models.product import Product
+from app.schemas.product_schema import ProductImportRow
+from app.services.facet_service import invalidate_facet_table
+
+FORMATS = ("ndjson", "csv")
+BATCH_SIZE = 1000
+MAX_ERRORS = 1000
+
+_products = Product.__table__
+
+# insert() con on_conflict_do_update por dialecto
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+_CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+
+def detect_format(content_type: Optional[str], explicit: Optional[str] = None) -> str:
+    """Format from ?format= or the Content-Type header; ValueError if unsupported"""
+    if explicit:
+        if explicit not in FORMATS:
+            raise ValueError(f"Unsupported format: {explicit}")
+        return explicit
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in _CONTENT_TYPES:
+        raise ValueError(f"Unsupported content type: {media_type or 'none'} (use NDJSON or CSV)")
+    return _CONTENT_TYPES[media_type]
+
+
+def _lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decode UTF-8 chunks incrementally and yield complete lines (with line endings)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    for chunk in chunks:
+        # Solo "\n" separa registros (splitlines también cortaría en U+2028 dentro de un JSON)
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _ndjson_records(lines: Iterator[str]) -> Iterator[Tuple[Optional[dict], Optional[str]]]:
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield None, f"Invalid JSON: {exc.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield None, "Each line must be a JSON object"
+            continue
+        yield record, None
+
+
+def _csv_records(lines: Iterator[str]) -> Iterator[Tuple[Optional[dict], Optional[str]]]:
+    # csv pide líneas a demanda, así que los campos entre comillas con saltos de línea funcionan
+    for record in csv.DictReader(lines):
+        if None in record:
+            yield None, "Too many fields"
+            continue
+        # Celda vacía = columna no informada (se aplica el valor por defecto)
+        yield {key: value for key, value in record.items() if value not in ("", None)}, None
+
+
+def supports_upsert(db: Session) -> bool:
+    """Whether the database has INSERT ... ON CONFLICT DO UPDATE"""
+    return db.get_bind().dialect.name in _UPSERT_INSERTS
+
+
+def _upsert_statement(db: Session, columns: tuple):
+    """
+    INSERT ... ON CONFLICT (sku) DO UPDATE of ``columns``, executed with one
+    parameter set per row. The statement depends only on the column set, so
+    it is compiled once and cached; the drivers batch the rows into
+    multi-row VALUES (psycopg2 through insertmanyvalues) or executemany.
+    """
+    statement = _UPSERT_INSERTS[db.get_bind().dialect.name](_products)
+    return statement.on_conflict_do_update(
+        index_elements=[_products.c.sku],
+        set_={key: statement.excluded[key] for key in columns if key != "sku"},
+    )
+
+
+class _Report:
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.received = self.upserted = self.failed = 0
+        self.errors: List[dict] = []
+        self.errors_truncated = False
+
+    def fail(self, row: int, sku: Optional[str], errors: List[str]):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "sku": sku, "errors": errors})
+        else:
+            self.errors_truncated = True
+
+    def as_dict(self) -> dict:
+        return {
+            "received": self.received,
+            "upserted": self.upserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.errors_truncated,
+        }
+
+
+def _validation_messages(exc: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()]
+
+
+def _flush(db: Session, batch: Dict[str, Tuple[int, dict]], report: _Report):
+    """Upsert one batch; rows are grouped by their set of columns so each INSERT is rectangular"""
+    groups: Dict[tuple, List[Tuple[int, dict]]] = {}
+    for row_number, values in batch.values():
+        groups.setdefault(tuple(sorted(values)), []).append((row_number, values))
+
+    for columns, rows in groups.items():
+        try:
+            db.execute(_upsert_statement(db, columns), [values for _, values in rows])
+            invalidate_facet_table(db)
+            db.commit()
+            report.upserted += len(rows)
+        except SQLAlchemyError as exc:
+            db.rollback()
+            message = str(getattr(exc, "orig", None) or exc).splitlines()[0]
+            for row_number, values in rows:
+                report.fail(row_number, values["sku"], [message])
+    batch.clear()
+
+
+def import_products(
+    db: Session,
+    chunks: Iterable[bytes],
+    fmt: str,
+    batch_size: int = BATCH_SIZE,
+    max_errors: int = MAX_ERRORS,
+) -> dict:
+    """
+    Upsert every valid row of the feed by SKU and return the import report.
+    Rows are numbered from 1 in feed order (the CSV header is not a row).
+    ValueError if the database has no upsert (see ``supports_upsert``).
+    """
+    if not supports_upsert(db):
+        raise ValueError(f"Bulk import is not supported on {db.get_bind().dialect.name}")
+    records = _ndjson_records(_lines(chunks)) if fmt == "ndjson" else _csv_records(_lines(chunks))
+    report = _Report(max_errors)
+    batch: Dict[str, Tuple[int, dict]] = {}
+
+    for row_number, (record, parse_error) in enumerate(records, start=1):
+        report.received += 1
+        if parse_error:
+            report.fail(row_number, None, [parse_error])
+            continue
+        try:
+            row = ProductImportRow(**record)
+        except ValidationError as exc:
+            sku = record.get("sku")
+            report.fail(row_number, None if sku is None else str(sku), _validation_messages(exc))
+            continue
+        values = row.model_dump(exclude_unset=True)
+        if values["sku"] in batch or len(batch) >= batch_size:
+            # ON CONFLICT no admite el mismo SKU dos veces en un INSERT: se escribe el lote
+            # pendiente y la fila repetida entra en el siguiente (gana la última)
+            _flush(db, batch, report)
+        batch[values["sku"]] = (row_number, values)
+
+    if batch:
+        _flush(db, batch, report)
+    return report.as_dict()
@@ -0,0 +1,373 @@
+"""
+Sales rollups behind /analytics/sales and /analytics/top-products.
+
+Three tables hold the aggregates per UTC day:
+
+- sales_daily: orders, revenue and amount paid by order status;
+- sales_daily_segments: units and revenue by category and by brand;
+- sales_daily_products: units and revenue by product, for the top-products
+  ranking.
+
+The last two leave cancelled orders out. Dashboard queries read only these
+tables, so their cost grows with the number of days in the range rather
+than the number of orders (top-products: days x products sold per day).
+
+Writes to orders, order items or payments call ``mark_orders`` inside their
+own transaction. It marks the day of every affected order in
+sales_rollup_dirty (one row per day) with a single INSERT ... SELECT ...
+ON CONFLICT. ``refresh`` recomputes only the marked days from the base
+tables and drops their marks; app.main runs it every
+SALES_ROLLUP_REFRESH_SECONDS and POST /analytics/refresh runs it on demand.
+The dashboard reads never write, so they can lag the orders by that
+interval. ``rebuild`` recomputes every day, for backfills and repairs.
+``check`` compares the rollups with a full recompute.
+
+Two product writes do not mark the days they affect:
+
+- deleting a product cascades to its order items;
+- changing a product's category or brand leaves its past segments under
+  the old value.
+
+``check`` reports both and ``rebuild`` repairs them.
+"""
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import Date, and_, delete, func, insert, literal, or_, select, true, union_all
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.payment import Payment
+from app.models.product import Product
+from app.models.sales_rollup import SalesDaily, SalesDailyProduct, SalesDailySegment, SalesRollupDirty
+
+CANCELLED = "cancelled"
+SEGMENTS = ("category", "brand")
+GROUPS = ("day", "status") + SEGMENTS
+# Días recalculados por sentencia: acota el tamaño del OR de rangos
+DAY_BATCH = 31
+# Días que se consultan cuando no se indica el rango
+DEFAULT_RANGE_DAYS = 30
+
+logger = logging.getLogger(__name__)
+
+
+def _day(column):
+    # date() existe en PostgreSQL y SQLite; type_=Date convierte el texto que devuelve SQLite
+    return func.date(column, type_=Date)
+
+
+# ---- marcas de días modificados ----
+
+def _mark(days):
+    """INSERT ... SELECT of ``days`` that keeps one row per day"""
+    # SQLite (>= 3.24) acepta el mismo ON CONFLICT; exige un WHERE en el SELECT (WHERE true)
+    statement = postgresql.insert(SalesRollupDirty).from_select(["day"], days.where(true()).distinct())
+    # DO UPDATE y no DO NOTHING: bloquea la marca existente, así un refresh que la esté
+    # borrando espera a que esta transacción confirme y recalcula el día con sus cambios
+    return statement.on_conflict_do_update(
+        index_elements=[SalesRollupDirty.day], set_={"day": statement.excluded.day}
+    )
+
+
+def mark_statement(*criteria):
+    """INSERT marking the days of the orders matching ``criteria`` (for AsyncSession)"""
+    return _mark(select(_day(Order.created_at)).where(*criteria))
+
+
+def mark_column_statement(created_at):
+    """INSERT marking the days of ``created_at``, a column of a CTE or subquery of orders"""
+    return _mark(select(_day(created_at)))
+
+
+def mark_orders(db: Session, *criteria) -> None:
+    """Mark the days of the orders matching ``criteria``; runs in the caller's transaction"""
+    db.execute(mark_statement(*criteria))
+
+
+def mark_payment(db: Session, payment_id: int) -> None:
+    """Mark the day of the payment's order"""
+    mark_orders(db, Order.id.in_(select(Payment.order_id).where(Payment.id == payment_id)))
+
+
+# ---- recálculo ----
+
+def _spans(days: List[date]) -> List[Tuple[date, date]]:
+    """Sorted days -> [first, last] runs of consecutive days"""
+    spans = []
+    for day in days:
+        if spans and spans[-1][1] + timedelta(days=1) == day:
+            spans[-1] = (spans[-1][0], day)
+        else:
+            spans.append((day, day))
+    return spans
+
+
+def _created_in(spans: List[Tuple[date, date]]):
+    # Rangos sobre created_at (no date(created_at)): usan idx_orders_created
+    return or_(*(
+        and_(Order.created_at >= datetime.combine(first, time.min),
+             Order.created_at < datetime.combine(last + timedelta(days=1), time.min))
+        for first, last in spans
+    ))
+
+
+def _daily_query(condition):
+    paid = (
+        select(func.coalesce(func.sum(Payment.amount), 0.0))
+        .where(Payment.order_id == Order.id, Payment.payment_status == "completed")
+        .correlate(Order)
+        .scalar_subquery()
+    )
+    per_order = select(
+        _day(Order.created_at).label("day"),
+        func.coalesce(Order.status, "pending").label("status"),
+        Order.total.label("total"),
+        paid.label("paid"),
+    ).where(condition).subquery()
+    return (
+        select(per_order.c.day, per_order.c.status, func.count(),
+               func.coalesce(func.sum(per_order.c.total), 0.0), func.coalesce(func.sum(per_order.c.paid), 0.0))
+        .group_by(per_order.c.day, per_order.c.status)
+    )
+
+
+def _not_cancelled():
+    return or_(Order.status.is_(None), Order.status != CANCELLED)
+
+
+def _products_query(condition):
+    day = _day(Order.created_at)
+    return (
+        select(day, OrderItem.product_id, func.sum(OrderItem.quantity),
+               func.sum(OrderItem.quantity * OrderItem.unit_price))
+        .select_from(Order)
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .where(condition, _not_cancelled())
+        .group_by(day, OrderItem.product_id)
+    )
+
+
+def _segments_query(condition):
+    day = _day(Order.created_at)
+    selects = []
+    for dimension in SEGMENTS:
+        value = func.coalesce(getattr(Product, dimension), "")
+        selects.append(
+            select(day, literal(dimension), value, func.sum(OrderItem.quantity),
+                   func.sum(OrderItem.quantity * OrderItem.unit_price))
+            .select_from(Order)
+            .join(OrderItem, OrderItem.order_id == Order.id)
+            .join(Product, Product.id == OrderItem.product_id)
+            .where(condition, _not_cancelled())
+            .group_by(day, value)
+        )
+    return union_all(*selects)
+
+
+def refresh(db: Session) -> int:
+    """Recompute the marked days; returns how many were recomputed"""
+    if db.scalar(select(SalesRollupDirty.day).limit(1)) is None:
+        return 0
+    try:
+        # Antes del recálculo: un día marcado después de este DELETE queda para el próximo refresh
+        days = sorted(db.scalars(delete(SalesRollupDirty).returning(SalesRollupDirty.day)))
+        for start in range(0, len(days), DAY_BATCH):
+            batch = days[start:start + DAY_BATCH]
+            condition = _created_in(_spans(batch))
+            db.execute(delete(SalesDaily).where(SalesDaily.day.in_(batch)))
+            db.execute(delete(SalesDailyProduct).where(SalesDailyProduct.day.in_(batch)))
+            db.execute(delete(SalesDailySegment).where(SalesDailySegment.day.in_(batch)))
+            db.execute(insert(SalesDaily).from_select(
+                ["day", "status", "orders", "revenue", "paid"], _daily_query(condition)))
+            db.execute(insert(SalesDailyProduct).from_select(
+                ["day", "product_id", "units", "revenue"], _products_query(condition)))
+            db.execute(insert(SalesDailySegment).from_select(
+                ["day", "dimension", "value", "units", "revenue"], _segments_query(condition)))
+        db.commit()
+    except IntegrityError:
+        # Otra petición recalculó los mismos días al mismo tiempo
+        db.rollback()
+        return 0
+    return len(days)
+
+
+async def refresh_periodically(session_factory: Callable[[], Session], interval: float) -> None:
+    """Run ``refresh`` every ``interval`` seconds in a worker thread (started by app.main)"""
+    def run() -> int:
+        db = session_factory()
+        try:
+            return refresh(db)
+        finally:
+            db.close()
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            days = await asyncio.to_thread(run)
+        except Exception:
+            logger.exception("Sales rollup refresh failed")
+            continue
+        if days:
+            logger.info("Sales rollups refreshed", extra={"days": days})
+
+
+def rebuild(db: Session) -> int:
+    """Recompute every day with orders (backfill, or repair after ``check``)"""
+    db.execute(delete(SalesDaily))
+    db.execute(delete(SalesDailyProduct))
+    db.execute(delete(SalesDailySegment))
+    mark_orders(db)
+    return refresh(db)
+
+
+# ---- consultas del dashboard ----
+
+def date_range(date_from: Optional[date], date_to: Optional[date]) -> Tuple[date, date]:
+    """Inclusive range; by default the last DEFAULT_RANGE_DAYS days (UTC)"""
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if date_from > date_to:
+        raise ValueError("date_from must not be after date_to")
+    return date_from, date_to
+
+
+def sales(
+    db: Session,
+    group_by: str = "day",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+) -> List[dict]:
+    """
+    Totals per day, status, category or brand. ``orders`` and ``paid`` are
+    only defined for day and status; ``units`` only for category and brand.
+    By day, cancelled orders are left out unless ``status`` asks for them.
+    """
+    if group_by not in GROUPS:
+        raise ValueError(f"group_by must be one of: {', '.join(GROUPS)}")
+    date_from, date_to = date_range(date_from, date_to)
+
+    if group_by in ("day", "status"):
+        key = SalesDaily.day if group_by == "day" else SalesDaily.status
+        query = (
+            select(key, func.sum(SalesDaily.orders), func.sum(SalesDaily.revenue), func.sum(SalesDaily.paid))
+            .where(SalesDaily.day.between(date_from, date_to))
+            .group_by(key)
+        )
+        if status is not None:
+            query = query.where(SalesDaily.status == status)
+        elif group_by == "day":
+            query = query.where(SalesDaily.status != CANCELLED)
+        query = query.order_by(key if group_by == "day" else func.sum(SalesDaily.revenue).desc())
+        return [
+            {"key": str(value), "orders": orders, "units": None, "revenue": round(revenue, 2), "paid": round(paid, 2)}
+            for value, orders, revenue, paid in db.execute(query)
+        ]
+
+    query = (
+        select(SalesDailySegment.value, func.sum(SalesDailySegment.units), func.sum(SalesDailySegment.revenue))
+        .where(SalesDailySegment.dimension == group_by, SalesDailySegment.day.between(date_from, date_to))
+        .group_by(SalesDailySegment.value)
+        .order_by(func.sum(SalesDailySegment.revenue).desc())
+    )
+    return [
+        {"key": value or None, "orders": None, "units": units, "revenue": round(revenue, 2), "paid": None}
+        for value, units, revenue in db.execute(query)
+    ]
+
+
+def top_products(
+    db: Session,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = 10,
+    by: str = "revenue",
+) -> List[dict]:
+    """Best-selling products of the range by revenue or units"""
+    date_from, date_to = date_range(date_from, date_to)
+    units = func.sum(SalesDailyProduct.units).label("units")
+    revenue = func.sum(SalesDailyProduct.revenue).label("revenue")
+    query = (
+        select(Product.id, Product.name, Product.category, Product.brand, units, revenue)
+        .join(Product, Product.id == SalesDailyProduct.product_id)
+        .where(SalesDailyProduct.day.between(date_from, date_to))
+        .group_by(Product.id, Product.name, Product.category, Product.brand)
+        .order_by((units if by == "units" else revenue).desc(), Product.id)
+        .limit(limit)
+    )
+    return [
+        {"product_id": row.id, "name": row.name, "category": row.category, "brand": row.brand,
+         "units": row.units, "revenue": round(row.revenue, 2)}
+        for row in db.execute(query)
+    ]
+
+
+# ---- verificación ----
+
+def _same(left: tuple, right: tuple) -> bool:
+    return all(
+        abs(a - b) < 0.005 if isinstance(a, float) or isinstance(b, float) else a == b
+        for a, b in zip(left, right)
+    )
+
+
+def _diff(table: str, rollup: Dict[tuple, tuple], recomputed: Dict[tuple, tuple]) -> List[dict]:
+    mismatches = []
+    for key in sorted(set(rollup) | set(recomputed), key=str):
+        stored, expected = rollup.get(key), recomputed.get(key)
+        if stored is None or expected is None or not _same(stored, expected):
+            mismatches.append({
+                "table": table, "day": str(key[0]), "key": str(key[1]),
+                "rollup": list(stored) if stored else None,
+                "recomputed": list(expected) if expected else None,
+            })
+    return mismatches
+
+
+def check(db: Session, date_from: Optional[date] = None, date_to: Optional[date] = None) -> dict:
+    """
+    Compare the rollups of the range with a full recompute from orders,
+    items and payments. Days still marked for ``refresh`` are listed in
+    ``pending_days`` and left out of the comparison.
+    """
+    date_from, date_to = date_range(date_from, date_to)
+    pending = {str(day) for day in db.scalars(
+        select(SalesRollupDirty.day).where(SalesRollupDirty.day.between(date_from, date_to)))}
+    condition = _created_in([(date_from, date_to)])
+
+    daily = {
+        (row[0], row[1]): tuple(row[2:])
+        for row in db.execute(select(SalesDaily.day, SalesDaily.status, SalesDaily.orders, SalesDaily.revenue,
+                                     SalesDaily.paid).where(SalesDaily.day.between(date_from, date_to)))
+    }
+    products = {
+        (row[0], row[1]): tuple(row[2:])
+        for row in db.execute(select(SalesDailyProduct.day, SalesDailyProduct.product_id, SalesDailyProduct.units,
+                                     SalesDailyProduct.revenue)
+                              .where(SalesDailyProduct.day.between(date_from, date_to)))
+    }
+    segments = {
+        (row[0], f"{row[1]}:{row[2]}"): tuple(row[3:])
+        for row in db.execute(select(SalesDailySegment.day, SalesDailySegment.dimension, SalesDailySegment.value,
+                                     SalesDailySegment.units, SalesDailySegment.revenue)
+                              .where(SalesDailySegment.day.between(date_from, date_to)))
+    }
+    mismatches = _diff("sales_daily", daily, {
+        (row[0], row[1]): tuple(row[2:]) for row in db.execute(_daily_query(condition))
+    }) + _diff("sales_daily_products", products, {
+        (row[0], row[1]): tuple(row[2:]) for row in db.execute(_products_query(condition))
+    }) + _diff("sales_daily_segments", segments, {
+        (row[0], f"{row[1]}:{row[2]}"): tuple(row[3:]) for row in db.execute(_segments_query(condition))
+    })
+    mismatches = [mismatch for mismatch in mismatches if mismatch["day"] not in pending]
+    return {
+        "consistent": not mismatches,
+        "date_from": str(date_from),
+        "date_to": str(date_to),
+        "mismatches": mismatches,
+        "pending_days": sorted(pending),
+    }
@@ -0,0 +1,133 @@
+import re
+import weakref
+from typing import List
+
+from sqlalchemy import inspect, or_, text, literal_column, func, table, column, case
+from sqlalchemy.orm import Query, Session
+
+from app.config import settings
+from app.models.product import SEARCH_TS_CONFIG, Product, search_document_sql
+
+# Tokens de búsqueda: palabras alfanuméricas (incluye acentos) del texto del usuario
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_products_fts = table("products_fts", column("rowid"))
+
+# Caché por engine de la existencia de la tabla FTS5 (solo resultados positivos)
+_fts_available = weakref.WeakKeyDictionary()
+
+
+def tokenize(search_query: str) -> List[str]:
+    """Split a raw search string into lowercase word tokens."""
+    return [token.lower() for token in _TOKEN_RE.findall(search_query or "")]
+
+
+def _sqlite_fts_ready(db: Session) -> bool:
+    engine = db.get_bind()
+    if _fts_available.get(engine):
+        return True
+    available = inspect(engine).has_table("products_fts")
+    if available:
+        _fts_available[engine] = True
+    return available
+
+
+def _like_filter(query: Query, search_query: str) -> Query:
+    """Legacy substring match, used when no full-text index is available."""
+    return query.filter(or_(
+        Product.name.ilike(f"%{search_query}%"),
+        Product.description.ilike(f"%{search_query}%"),
+        Product.brand.ilike(f"%{search_query}%")
+    ))
+
+
+def _sqlite_match_expression(tokens: List[str]) -> str:
+    """
+    FTS5 query: complete words match as terms, the last token (still being
+    typed) as a prefix. Prefixes up to 4 chars are served by the FTS5 prefix
+    index; longer ones are rarely broad.
+    """
+    *words, last = tokens
+    return " ".join([f'"{word}"' for word in words] + [f'"{last}"*'])
+
+
+def _sqlite_relevance(tokens: List[str]):
+    """
+    Cheap per-row score: token presence weighted by column (name > brand >
+    description). SQLite LIKE is already case-insensitive for ASCII.
+    """
+    score = 0
+    for token in tokens:
+        pattern = f"%{token}%"
+        score = score + (
+            case((Product.name.like(pattern), 10), else_=0)
+            + case((Product.brand.like(pattern), 5), else_=0)
+            + case((Product.description.like(pattern), 1), else_=0)
+        )
+    return -score
+
+
+def apply_text_search(
+    db: Session, query: Query, search_query: str, window: int = 0, rank: bool = True
+) -> Query:
+    """
+    Restrict ``query`` (already filtered) to products matching ``search_query``
+    using the full-text index of the current dialect, ordered by relevance.
+
+    All tokens must match; the last one is matched as a prefix so results
+    follow the user while typing (``zapat`` finds ``Zapatillas``). PostgreSQL
+    uses the GIN tsvector index, SQLite the FTS5 shadow table; other dialects
+    fall back to ILIKE.
+
+    Only the ``SEARCH_CANDIDATE_LIMIT`` best matches (or ``window`` if larger,
+    so the requested page is always reachable) are joined back to ``products``,
+    which keeps broad terms like a brand name from loading the whole catalog
+    on each keystroke.
+    With ``rank=False`` the matches are returned unordered and unbounded, for
+    callers that impose their own ordering (keyset pagination).
+    """
+    tokens = tokenize(search_query)
+    if not tokens:
+        return _like_filter(query, search_query)
+
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        document = literal_column(search_document_sql("products."))
+        *words, last = tokens
+        ts_query = func.to_tsquery(
+            literal_column(f"'{SEARCH_TS_CONFIG}'::regconfig"),
+            " & ".join(words + [f"{last}:*"])
+        )
+        matches = query.filter(document.op("@@")(ts_query))
+        # ts_rank_cd (pesos A/B/D del documento): mayor es más relevante
+        score = -func.ts_rank_cd(document, ts_query)
+    elif dialect == "sqlite" and _sqlite_fts_ready(db):
+        matches = (
+            query.join(_products_fts, _products_fts.c.rowid == Product.id)
+            .filter(text("products_fts MATCH :fts_match").bindparams(
+                fts_match=_sqlite_match_expression(tokens)
+            ))
+        )
+        # bm25 recorre la lista completa de coincidencias para calcular el IDF,
+        # por eso se usa una puntuación por fila
+        score = _sqlite_relevance(tokens)
+    else:
+        return _like_filter(query, search_query)
+
+    if not rank:
+        return matches
+
+    # El límite se aplica después de ordenar por relevancia: sin ORDER BY la
+    # base devolvería cualquier subconjunto y podría dejar fuera los mejores
+    candidates = (
+        matches.with_entities(Product.id.label("id"))
+        .order_by(score, Product.id)
+        .limit(max(settings.SEARCH_CANDIDATE_LIMIT, window))
+        .subquery()
+    )
+    return (
+        db.query(Product)
+        .join(candidates, candidates.c.id == Product.id)
+        .order_by(score, Product.id)
+    )
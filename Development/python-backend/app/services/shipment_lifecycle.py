@@ -0,0 +1,120 @@
+"""
+Shipment lifecycle: a shipment status change and the order status it implies
+are applied in one transaction.
+
+On PostgreSQL both UPDATEs travel in a single statement (data-modifying
+CTEs); other dialects run the order UPDATE and the shipment UPDATE ...
+RETURNING back to back inside the same transaction. Order status changes
+also mark the orders' days for the sales rollups (app/services/sales_rollup.py).
+Cancelled orders keep their status: their stock was already released, and
+moving them on would let a second cancel release it again.
+"""
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.crud.shipment_crud import status_timestamps
+from app.models.order import Order
+from app.models.shipment import Shipment
+from app.services import sales_rollup
+
+# Estado de la orden que implica cada estado del envío (los demás no la cambian)
+ORDER_STATUS_FOR_SHIPMENT = {
+    "shipped": "shipped",
+    "in_transit": "in_transit",
+    "delivered": "completed",
+}
+
+_shipments = Shipment.__table__
+_orders = Order.__table__
+
+
+def _statement(criteria: list, values: dict, order_values: Optional[dict], returning: list):
+    """
+    PostgreSQL: shipment UPDATE ... RETURNING, order UPDATE and the sales
+    rollup mark of the orders' days as data-modifying CTEs
+    """
+    updated = update(_shipments).where(*criteria).values(values).returning(*returning).cte("updated_shipments")
+    statement = select(updated)
+    if order_values:
+        orders = (
+            update(_orders).where(_orders.c.id == updated.c.order_id, _orders.c.status != "cancelled")
+            .values(order_values).returning(_orders.c.created_at).cte("updated_orders")
+        )
+        statement = statement.add_cte(orders).add_cte(
+            sales_rollup.mark_column_statement(orders.c.created_at).cte("marked_days")
+        )
+    return statement
+
+
+def _apply(db: Session, criteria: list, values: dict, returning: list) -> List[Row]:
+    now = datetime.utcnow()
+    status = values.get("status")
+    values = status_timestamps(values, now)
+    order_values = None
+    if status in ORDER_STATUS_FOR_SHIPMENT:
+        order_values = {"status": ORDER_STATUS_FOR_SHIPMENT[status], "updated_at": now}
+
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            rows = db.execute(_statement(criteria, values, order_values, returning)).all()
+        else:
+            if order_values:
+                # Antes de los UPDATE: criteria puede filtrar por el estado anterior del envío
+                orders = (
+                    _orders.c.id.in_(select(_shipments.c.order_id).where(*criteria)),
+                    _orders.c.status != "cancelled",
+                )
+                sales_rollup.mark_orders(db, *orders)
+                db.execute(update(_orders).where(*orders).values(order_values))
+            rows = db.execute(update(_shipments).where(*criteria).values(values).returning(*returning)).all()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return rows
+
+
+def update_shipment_status(
+    db: Session, shipment_id: int, status: str, vehicle_info: Optional[str] = None
+) -> Optional[Row]:
+    """Change one shipment's status and its order's; None if the shipment does not exist"""
+    values = {"status": status}
+    if vehicle_info:
+        values["vehicle_info"] = vehicle_info
+    return update_shipment(db, shipment_id, values)
+
+
+def update_shipment(db: Session, shipment_id: int, values: dict) -> Optional[Row]:
+    """
+    Update shipment fields (tracking number, carrier, vehicle info, status);
+    a status in ``values`` moves the order like update_shipment_status.
+    None if the shipment does not exist.
+    """
+    rows = _apply(db, [_shipments.c.id == shipment_id], dict(values), list(_shipments.c))
+    return rows[0] if rows else None
+
+
+def bulk_update_status(
+    db: Session,
+    status: str,
+    shipment_ids: Optional[List[int]] = None,
+    carrier: Optional[str] = None,
+    current_status: Optional[str] = None,
+) -> int:
+    """
+    Move every matching shipment (ids and/or carrier, optionally only those
+    in ``current_status``) and their orders to ``status``. Returns how many
+    shipments changed.
+    """
+    criteria = []
+    if shipment_ids is not None:
+        criteria.append(_shipments.c.id.in_(shipment_ids))
+    if carrier is not None:
+        criteria.append(_shipments.c.carrier == carrier)
+    if current_status is not None:
+        criteria.append(_shipments.c.status == current_status)
+    if not criteria:
+        raise ValueError("shipment_ids or carrier is required")
+    return len(_apply(db, criteria, {"status": status}, [_shipments.c.id, _shipments.c.order_id]))
@@ -0,0 +1,250 @@
+"""
+Slow-query log and per-request SQL profiler.
+
+``instrument_engine`` listens to before/after_cursor_execute and, for
+every statement, records:
+
+- its fingerprint: the SQL with literals and bind parameters replaced by
+  ``?`` and IN lists collapsed, so ``id = 3`` and ``id = 7`` aggregate
+  together;
+- its duration and row count, as reported by the driver (cursor.rowcount:
+  PostgreSQL reports it for SELECT too, SQLite only for INSERT/UPDATE/DELETE).
+
+Statements are aggregated per fingerprint (calls, total/max time, rows,
+route templates) for GET /api/v1/admin/sql-profile. Inside a request,
+``SQLProfilerMiddleware`` also keeps the statements of that request and,
+when SQL_PROFILER_HEADER is on (debug only), sends
+``Server-Timing: db;dur=<ms>;desc="<n> queries"``.
+
+A statement slower than SQL_SLOW_QUERY_MS is logged as a warning with its
+EXPLAIN plan (EXPLAIN QUERY PLAN on SQLite), at most once per fingerprint
+every EXPLAIN_INTERVAL_SECONDS. Only SELECT/WITH statements are explained,
+on the same connection; on PostgreSQL inside a savepoint, so a failed
+EXPLAIN does not abort the transaction.
+"""
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_INTERVAL_SECONDS = 60.0
+ORDER_KEYS = ("total_ms", "mean_ms", "max_ms", "calls", "rows")
+OTHER = "(other)"  # agrupa huellas nuevas cuando se llega al máximo
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PARAMS = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):[A-Za-z_]\w*|\?")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Normalized SQL: literals and parameters as ?, IN lists as (?...), single spaces"""
+    text = _STRINGS.sub("?", statement)
+    text = _PARAMS.sub("?", text)
+    text = _NUMBERS.sub("?", text)
+    text = " ".join(text.split())
+    return _IN_LISTS.sub("(?...)", text)
+
+
+# ---- agregado por huella ----
+
+class _Stats:
+    __slots__ = ("calls", "seconds", "max_seconds", "rows", "slow", "routes")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.slow = 0
+        self.routes: List[str] = []
+
+
+_stats: Dict[str, _Stats] = {}
+_explained_at: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def _aggregate(key: str, seconds: float, rows: Optional[int], slow: bool, route: Optional[str]) -> None:
+    with _lock:
+        stats = _stats.get(key)
+        if stats is None:
+            if len(_stats) >= settings.SQL_PROFILER_MAX_FINGERPRINTS:
+                key = OTHER
+                stats = _stats.get(key)
+            if stats is None:
+                stats = _stats[key] = _Stats()
+        stats.calls += 1
+        stats.seconds += seconds
+        if seconds > stats.max_seconds:
+            stats.max_seconds = seconds
+        if rows:
+            stats.rows += rows
+        if slow:
+            stats.slow += 1
+        if route and route not in stats.routes and len(stats.routes) < 5:
+            stats.routes.append(route)
+
+
+def top(limit: int = 20, order_by: str = "total_ms") -> List[dict]:
+    """The ``limit`` fingerprints with the highest ``order_by`` (see ORDER_KEYS)"""
+    with _lock:
+        rows = [{
+            "fingerprint": key,
+            "calls": stats.calls,
+            "total_ms": round(stats.seconds * 1000, 3),
+            "mean_ms": round(stats.seconds * 1000 / stats.calls, 3),
+            "max_ms": round(stats.max_seconds * 1000, 3),
+            "rows": stats.rows,
+            "slow": stats.slow,
+            "routes": list(stats.routes),
+        } for key, stats in _stats.items()]
+    rows.sort(key=lambda row: row[order_by], reverse=True)
+    return rows[:limit]
+
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+        _explained_at.clear()
+
+
+# ---- por petición ----
+
+class RequestProfile:
+    __slots__ = ("scope", "statements")
+
+    def __init__(self, scope):
+        self.scope = scope
+        # (huella, ms, filas)
+        self.statements: List[Tuple[str, float, Optional[int]]] = []
+
+    @property
+    def route(self) -> Optional[str]:
+        route = self.scope.get("route")
+        return getattr(route, "path", None)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(ms for _, ms, _ in self.statements)
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+
+class SQLProfilerMiddleware:
+    """ASGI middleware: per-request statement list and the debug Server-Timing header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope)
+        token = _current.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.SQL_PROFILER_HEADER:
+                summary = f'db;dur={profile.total_ms:.2f};desc="{len(profile.statements)} queries"'
+                message["headers"] = [*message.get("headers", []), (b"server-timing", summary.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if profile.statements and logger.isEnabledFor(logging.DEBUG):
+                slowest = max(profile.statements, key=lambda statement: statement[1])
+                logger.debug(
+                    "%s %s: %d queries, %.1f ms (slowest %.1f ms: %s)", scope["method"],
+                    profile.route or scope["path"], len(profile.statements), profile.total_ms,
+                    slowest[1], slowest[0],
+                )
+
+
+# ---- engine ----
+
+def explain(cursor, dialect_name: str, statement: str, parameters) -> Optional[str]:
+    """Plan of ``statement`` on the connection of ``cursor``; None if it cannot be explained"""
+    if not _EXPLAINABLE.match(statement):
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if dialect_name == "sqlite" else "EXPLAIN "
+    savepoint = dialect_name == "postgresql"
+    raw = cursor.connection.cursor()
+    try:
+        if savepoint:
+            raw.execute("SAVEPOINT sql_profiler_explain")
+        try:
+            raw.execute(prefix + statement, parameters)
+            plan = "\n".join(str(row[-1]) for row in raw.fetchall())
+        except Exception:
+            if savepoint:
+                raw.execute("ROLLBACK TO SAVEPOINT sql_profiler_explain")
+            raise
+        finally:
+            if savepoint:
+                raw.execute("RELEASE SAVEPOINT sql_profiler_explain")
+        return plan
+    finally:
+        raw.close()
+
+
+def _log_slow(cursor, dialect_name, statement, parameters, executemany, key, seconds, rows, route) -> None:
+    plan = None
+    now = time.monotonic()
+    with _lock:
+        due = now - _explained_at.get(key, float("-inf")) >= EXPLAIN_INTERVAL_SECONDS
+        if due:
+            _explained_at[key] = now
+    if due and settings.SQL_EXPLAIN_SLOW and not executemany:
+        try:
+            plan = explain(cursor, dialect_name, statement, parameters)
+        except Exception as exc:
+            logger.debug("EXPLAIN failed for %s: %s", key, exc)
+    logger.warning(
+        "Slow query %.1f ms (rows=%s, route=%s): %s%s", seconds * 1000, rows, route or "-", key,
+        f"\nPlan:\n{plan}" if plan else "",
+    )
+
+
+def instrument_engine(engine) -> None:
+    """Profile every statement of ``engine`` (sync Engine, or async_engine.sync_engine)"""
+    dialect_name = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._profiler_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_profiler_started", None)
+        if started is None:
+            return
+        seconds = time.perf_counter() - started
+        rows = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+        key = fingerprint(statement)
+        profile = _current.get()
+        route = profile.route if profile is not None else None
+        slow = seconds * 1000 >= settings.SQL_SLOW_QUERY_MS
+        _aggregate(key, seconds, rows, slow, route)
+        if profile is not None:
+            profile.statements.append((key, seconds * 1000, rows))
+        if slow:
+            _log_slow(cursor, dialect_name, statement, parameters, executemany, key, seconds, rows, route)
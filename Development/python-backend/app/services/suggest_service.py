@@ -0,0 +1,246 @@
+"""
+Typeahead for the search box (GET /products/suggest).
+
+An in-memory prefix index over product names, brands and categories:
+
+- one sorted list of ``(key, text)`` entries per kind (name, brand,
+  category), searched with bisect. Keys are normalized (lowercase, no
+  accents). A name is indexed under each word-suffix, so "air" completes
+  "Zapatillas Nike Air". Brands and categories are few and always scanned
+  in full; the name scan stops after SCAN_LIMIT entries;
+- a weight per ``(kind, text)``: how many products carry that brand,
+  category or name. Results are ranked by weight;
+- edit-distance-1 expansion of the query when the exact prefixes give
+  fewer than ``limit`` results (typo tolerance, from 3 characters on).
+
+The index is built from the products table on the first request. After
+that it is updated in place by product_crud create/update/delete, while
+bulk imports mark it stale. Every process keeps its own copy, so writes
+made by another worker show up after at most SUGGEST_REFRESH_SECONDS,
+when the copy is rebuilt. A rebuild queries and sorts outside the lock and
+only swaps the new arrays in under it, so queries keep being answered from
+the old copy meanwhile.
+"""
+import threading
+import time
+import unicodedata
+import heapq
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.product import Product
+from app.services.ttl_cache import TTLCache
+
+KINDS = ("name", "brand", "category")
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789 "
+
+
+def normalize(text: str) -> str:
+    """Lowercase without accents and with single spaces ("Balón  Pro" -> "balon pro")"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return " ".join("".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower().split())
+
+
+def _keys(kind: str, text: str) -> List[str]:
+    key = normalize(text)
+    if not key:
+        return []
+    if kind != "name":
+        return [key]
+    words = key.split(" ")
+    return [" ".join(words[index:]) for index in range(len(words))]
+
+
+def _edits(word: str) -> Iterable[str]:
+    """Strings at edit distance 1 (deletion, transposition, substitution, insertion)"""
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    for left, right in splits:
+        if right:
+            yield left + right[1:]
+        if len(right) > 1:
+            yield left + right[1] + right[0] + right[2:]
+        for ch in _ALPHABET:
+            if right:
+                yield left + ch + right[1:]
+            yield left + ch + right
+
+
+class SuggestIndex:
+    """Sorted-array prefix index; thread-safe"""
+
+    # Nombres revisados por prefijo: acota el costo de prefijos muy cortos
+    SCAN_LIMIT = 200
+
+    def __init__(self):
+        self._entries: Dict[str, List[Tuple[str, str]]] = {kind: [] for kind in KINDS}
+        self._weights: Dict[Tuple[str, str], int] = {}
+        self._products: Dict[int, Tuple[Optional[str], Optional[str], Optional[str]]] = {}
+        self._lock = threading.RLock()
+        # Una sola reconstrucción a la vez; no se toma dentro de _lock
+        self._build_lock = threading.Lock()
+        self._built_at: Optional[float] = None
+        # Cambios desde upsert/remove/mark_stale; detecta escrituras durante un rebuild
+        self._version = 0
+        # Respuestas por (consulta, límite); se vacía con cada cambio del índice
+        self._results = TTLCache(maxsize=4096, ttl=settings.SUGGEST_REFRESH_SECONDS)
+
+    # ---- mantenimiento ----
+
+    def _add_term(self, kind: str, text: Optional[str], bulk: bool = False) -> None:
+        if not text:
+            return
+        term = (kind, text)
+        count = self._weights.get(term, 0)
+        self._weights[term] = count + 1
+        if count == 0:
+            entries = self._entries[kind]
+            for key in _keys(kind, text):
+                if bulk:
+                    entries.append((key, text))  # rebuild ordena al final
+                else:
+                    insort(entries, (key, text))
+
+    def _remove_term(self, kind: str, text: Optional[str]) -> None:
+        if not text:
+            return
+        term = (kind, text)
+        count = self._weights.get(term, 0)
+        if count > 1:
+            self._weights[term] = count - 1
+            return
+        self._weights.pop(term, None)
+        entries = self._entries[kind]
+        for key in _keys(kind, text):
+            index = bisect_left(entries, (key, text))
+            if index < len(entries) and entries[index] == (key, text):
+                del entries[index]
+
+    def _add_product(
+        self, product_id: int, terms: Tuple[Optional[str], Optional[str], Optional[str]], bulk: bool = False
+    ) -> None:
+        self._products[product_id] = terms
+        for kind, text in zip(KINDS, terms):
+            self._add_term(kind, text, bulk)
+
+    def upsert(self, product) -> None:
+        """Index a created or updated product (ORM object or RETURNING row)"""
+        with self._lock:
+            self._version += 1
+            if self._built_at is None:
+                return  # se construye completo en la primera consulta
+            terms = (product.name, product.brand, product.category)
+            if self._products.get(product.id) == terms:
+                return
+            self._remove_product(product.id)
+            self._add_product(product.id, terms)
+            self._results.clear()
+
+    def _remove_product(self, product_id: int) -> None:
+        old = self._products.pop(product_id, None)
+        if old is not None:
+            for kind, text in zip(KINDS, old):
+                self._remove_term(kind, text)
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            self._version += 1
+            if self._built_at is not None:
+                self._remove_product(product_id)
+                self._results.clear()
+
+    def mark_stale(self) -> None:
+        """Rebuild on the next query (after writes that bypass upsert/remove)"""
+        with self._lock:
+            self._version += 1
+            self._built_at = None
+            self._results.clear()
+
+    def rebuild(self, db: Session) -> None:
+        """Reload from the products table; only the final swap holds the lock"""
+        version = self._version
+        fresh = SuggestIndex()
+        for row in db.query(Product.id, Product.name, Product.brand, Product.category):
+            fresh._add_product(row.id, (row.name, row.brand, row.category), bulk=True)
+        for entries in fresh._entries.values():
+            entries.sort()
+        with self._lock:
+            self._entries, self._weights, self._products = fresh._entries, fresh._weights, fresh._products
+            # Una escritura durante la consulta puede faltar en las filas leídas:
+            # se usa la copia nueva, pero la siguiente consulta vuelve a reconstruir
+            self._built_at = time.monotonic() if self._version == version else None
+            self._results.clear()
+
+    def _is_fresh(self, built_at: Optional[float]) -> bool:
+        return built_at is not None and time.monotonic() - built_at <= settings.SUGGEST_REFRESH_SECONDS
+
+    def _ensure_built(self, db: Session) -> None:
+        built_at = self._built_at
+        if self._is_fresh(built_at):
+            return
+        # Con una copia vencida se sigue respondiendo con ella si otro hilo ya reconstruye
+        if not self._build_lock.acquire(blocking=built_at is None):
+            return
+        try:
+            # Otro hilo pudo reconstruir mientras se esperaba el candado
+            if not self._is_fresh(self._built_at):
+                self.rebuild(db)
+        finally:
+            self._build_lock.release()
+
+    # ---- consultas ----
+
+    def _prefix_matches(self, prefix: str, found: Dict[Tuple[str, str], int], scan: int) -> None:
+        weights = self._weights
+        for kind, entries in self._entries.items():
+            index = bisect_left(entries, (prefix,))
+            end = min(len(entries), index + scan) if kind == "name" else len(entries)
+            while index < end:
+                key, text = entries[index]
+                if not key.startswith(prefix):
+                    break
+                term = (kind, text)
+                if term not in found:
+                    found[term] = weights.get(term, 0)
+                index += 1
+
+    def _ranked(self, found: Dict[Tuple[str, str], int], limit: int) -> List[Tuple[str, str]]:
+        ranked = heapq.nsmallest(limit, found.items(), key=lambda item: (-item[1], len(item[0][1]), item[0][1]))
+        return [term for term, _ in ranked]
+
+    def suggest(self, db: Session, q: str, limit: int = 8) -> List[dict]:
+        """Top ``limit`` completions of ``q``: [{"text", "type"}], best first"""
+        prefix = normalize(q)
+        if not prefix:
+            return []
+        self._ensure_built(db)
+        with self._lock:
+            cached = self._results.get((prefix, limit))
+            if cached is not None:
+                return cached
+
+            found: Dict[Tuple[str, str], int] = {}
+            self._prefix_matches(prefix, found, self.SCAN_LIMIT)
+            results = self._ranked(found, limit)
+            if len(results) < limit and len(prefix) >= 3:
+                fuzzy: Dict[Tuple[str, str], int] = {}
+                for candidate in set(_edits(prefix)):
+                    self._prefix_matches(candidate, fuzzy, limit)  # cientos de candidatos: pocos nombres c/u
+                for term in results:
+                    fuzzy.pop(term, None)
+                results += self._ranked(fuzzy, limit - len(results))
+
+            suggestions = [{"text": text, "type": kind} for kind, text in results]
+            self._results.set((prefix, limit), suggestions)
+            return suggestions
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": sum(len(entries) for entries in self._entries.values()),
+                "terms": len(self._weights),
+                "products": len(self._products),
+            }
+
+
+suggest_index = SuggestIndex()
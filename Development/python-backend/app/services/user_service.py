@@ -1,87 +1,270 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import time
 import httpx
-from typing import Optional, Dict
-import os
+import jwt
+from enum import Enum
+from typing import Optional, Dict, Tuple
+
+from app.config import settings
+from app.logging_config import request_id
+from app.services import metrics
+from app.services.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # httpx[http2] no instalado: se usa HTTP/1.1 con keep-alive
+    HTTP2_AVAILABLE = False
+
+# ========== SHARED HTTP CLIENT ==========
+# Un único AsyncClient por proceso (y event loop) reutiliza conexiones keep-alive
+# con el backend de autenticación en lugar de abrir TCP/TLS en cada orden.
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the app-lifetime HTTP client, creating it on first use."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=settings.AUTH_HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.AUTH_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AUTH_HTTP_MAX_KEEPALIVE,
+            ),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (application shutdown)."""
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+# ========== VALIDATION CACHE ==========
+# Clave (user_id, sha256(token)): el token nunca se guarda en claro. Se cachean
+# los 200 (usuario válido) y los 404 (usuario inexistente, con TTL más corto);
+# errores de red, 401/403 y 5xx no se cachean.
+_validation_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+_inflight: Dict[Tuple[str, str], "asyncio.Future[bool]"] = {}
+_counters = {"upstream_calls": 0, "coalesced": 0}
+
+
+def _auth_headers(token: str) -> Dict[str, str]:
+    headers = {"Authorization": f"Bearer {token}"}
+    # Correlación con los logs del servicio de autenticación
+    rid = request_id.get()
+    if rid:
+        headers["X-Request-ID"] = rid
+    return headers
+
+
+def _cache_key(user_id: str, token: str) -> Tuple[str, str]:
+    return user_id, hashlib.sha256((token or "").encode()).hexdigest()
+
+
+def auth_cache_stats() -> Dict:
+    """Hit/miss counters of the user validation cache."""
+    return {
+        **_validation_cache.stats(),
+        **_counters,
+        "in_flight": len(_inflight),
+        "http2": HTTP2_AVAILABLE,
+    }
+
+
+def clear_auth_cache() -> None:
+    _validation_cache.clear()
+    _inflight.clear()
+    for name in _counters:
+        _counters[name] = 0
+
+
+# ========== LOCAL JWT VERIFICATION ==========
+class TokenCheck(str, Enum):
+    """Outcome of verifying a token locally against an order's user_id"""
+    VALID = "valid"                 # firma correcta y el token pertenece al usuario
+    INVALID = "invalid"             # firma incorrecta o token expirado
+    MISMATCH = "mismatch"           # token válido de otro usuario
+    UNVERIFIABLE = "unverifiable"   # sin secreto, formato no soportado o sin claim de id
+
+
+# Claims que pueden identificar al usuario; userId lo emite JwtUtil, sub es el email
+_USER_ID_CLAIMS = ("userId", "user_id")
+
+
+def _jwt_signing_key() -> Optional[bytes]:
+    secret = settings.JWT_SECRET
+    if not secret:
+        return None
+    if settings.JWT_SECRET_IS_BASE64:
+        try:
+            return base64.b64decode(secret + "=" * (-len(secret) % 4))
+        except (binascii.Error, ValueError):
+            logger.error("JWT_SECRET is not valid Base64; local token verification disabled")
+            return None
+    return secret.encode()
+
 
 class UserService:
     """Service to validate users against the MySQL authentication backend"""
-    
+
     def __init__(self, auth_api_url: str = None):
-        self.auth_api_url = auth_api_url or os.getenv("AUTH_API_URL", "http://localhost:8080")
-    
+        self.auth_api_url = auth_api_url or settings.AUTH_API_URL
+
     async def validate_user_exists(self, user_id: str, token: str) -> bool:
         """
         Validate that a user exists in the MySQL database via the authentication API
-        
+
+        Results are cached per (user_id, token) and concurrent identical lookups
+        share a single upstream request.
+
         Args:
             user_id: UUID of the user from MySQL
             token: JWT token for authentication
-            
+
         Returns:
             True if user exists and token is valid, False otherwise
         """
-        async with httpx.AsyncClient() as client:
-            try:
-                url = f"{self.auth_api_url}/api/auth/users/{user_id}"
-                print(f"[UserService] Validating user: {user_id}")
-                print(f"[UserService] Request URL: {url}")
-                print(f"[UserService] Token: {token[:20]}..." if token else "[UserService] No token")
-                
-                response = await client.get(
-                    url,
-                    headers={"Authorization": f"Bearer {token}"},
-                    timeout=5.0
-                )
-                
-                print(f"[UserService] Response status: {response.status_code}")
-                if response.status_code != 200:
-                    print(f"[UserService] Response body: {response.text}")
-                
-                return response.status_code == 200
-            except httpx.RequestError as e:
-                # Network error or timeout
-                print(f"[UserService] Request error: {str(e)}")
-                return False
-            except Exception as e:
-                print(f"[UserService] Unexpected error: {str(e)}")
-                return False
-    
+        key = _cache_key(user_id, token)
+        cached = _validation_cache.get(key)
+        if cached is not None:
+            return cached
+
+        pending = _inflight.get(key)
+        if pending is not None:
+            _counters["coalesced"] += 1
+        else:
+            pending = asyncio.ensure_future(self._fetch_validation(key, user_id, token))
+            _inflight[key] = pending
+            pending.add_done_callback(lambda _: _inflight.pop(key, None))
+        # shield: si un cliente cancela su petición no se cancela la de los demás
+        return await asyncio.shield(pending)
+
+    async def _fetch_validation(self, key: Tuple[str, str], user_id: str, token: str) -> bool:
+        _counters["upstream_calls"] += 1
+        started = time.perf_counter()
+        try:
+            response = await get_http_client().get(
+                f"{self.auth_api_url}/api/auth/users/{user_id}",
+                headers=_auth_headers(token)
+            )
+        except httpx.RequestError as e:
+            # Network error or timeout
+            metrics.observe_upstream("auth", "validate_user", started)
+            logger.warning("Auth service request failed for user %s: %s", user_id, e)
+            return False
+        except Exception:
+            metrics.observe_upstream("auth", "validate_user", started)
+            logger.exception("Unexpected error validating user %s", user_id)
+            return False
+        metrics.observe_upstream("auth", "validate_user", started, response.status_code)
+
+        logger.debug("Auth service answered %s for user %s", response.status_code, user_id)
+        if response.status_code == 200:
+            _validation_cache.set(key, True)
+            return True
+        if response.status_code == 404:
+            _validation_cache.set(key, False, ttl=settings.AUTH_NEGATIVE_CACHE_TTL_SECONDS)
+        else:
+            logger.info("User %s rejected by auth service (%s)", user_id, response.status_code)
+        return False
+
     async def get_user_info(self, user_id: str, token: str) -> Optional[Dict]:
         """
         Get user information from MySQL database
-        
+
         Args:
             user_id: UUID of the user
             token: JWT token for authentication
-            
+
         Returns:
             User data dict or None if not found
         """
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.auth_api_url}/api/auth/users/{user_id}",
-                    headers={"Authorization": f"Bearer {token}"},
-                    timeout=5.0
-                )
-                if response.status_code == 200:
-                    return response.json()
-                return None
-            except Exception:
-                return None
-    
+        started, response = time.perf_counter(), None
+        try:
+            response = await get_http_client().get(
+                f"{self.auth_api_url}/api/auth/users/{user_id}",
+                headers=_auth_headers(token)
+            )
+            metrics.observe_upstream("auth", "user_info", started, response.status_code)
+            if response.status_code == 200:
+                return response.json()
+            return None
+        except Exception:
+            if response is None:
+                metrics.observe_upstream("auth", "user_info", started)
+            return None
+
+    def verify_token_for_user(self, user_id: str, token: str) -> TokenCheck:
+        """
+        Verify the HS256 signature and expiry of a JWT locally (same secret as
+        the Spring JwtUtil) and check that it belongs to ``user_id``.
+
+        The token belongs to the user when ``userId``/``user_id`` or ``sub``
+        equals ``user_id``. Tokens that only carry the email in ``sub`` cannot
+        be bound to a user_id locally and are reported as UNVERIFIABLE.
+        """
+        key = _jwt_signing_key()
+        if key is None or not token:
+            return TokenCheck.UNVERIFIABLE
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.InvalidTokenError:
+            return TokenCheck.UNVERIFIABLE
+        if header.get("alg") != "HS256":
+            return TokenCheck.UNVERIFIABLE
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=["HS256"],
+                leeway=settings.JWT_LEEWAY_SECONDS,
+                options={"require": ["exp"]}
+            )
+        except (jwt.InvalidSignatureError, jwt.ExpiredSignatureError, jwt.MissingRequiredClaimError) as e:
+            logger.info("Rejected token for user %s: %s", user_id, e)
+            return TokenCheck.INVALID
+        except jwt.InvalidTokenError:
+            return TokenCheck.UNVERIFIABLE
+
+        user_claims = [str(claims[name]) for name in _USER_ID_CLAIMS if claims.get(name) is not None]
+        if user_id in user_claims or str(claims.get("sub")) == user_id:
+            return TokenCheck.VALID
+        if user_claims:
+            return TokenCheck.MISMATCH
+        return TokenCheck.UNVERIFIABLE
+
     def extract_user_id_from_token(self, token: str) -> Optional[str]:
         """
         Extract user ID from JWT token (basic implementation)
         For production, use proper JWT validation
-        
+
         Args:
             token: JWT token
-            
+
         Returns:
             User ID or None
         """
         try:
-            import jwt
             # Decode without verification for now (add secret verification in production)
             payload = jwt.decode(token, options={"verify_signature": False})
             return payload.get("sub") or payload.get("userId")
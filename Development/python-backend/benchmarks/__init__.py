@@ -0,0 +1 @@
+# Benchmarks del backend (scripts manuales, no forman parte de la suite de pytest)
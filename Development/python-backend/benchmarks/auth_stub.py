@@ -0,0 +1,56 @@
+"""
+Servicio de autenticación simulado para los benchmarks: reemplaza al
+backend Java (Spring Boot + MySQL) en GET /api/auth/users/{id}, que es lo
+único que el backend Python le consulta al validar una orden.
+
+Responde 200 a cualquier usuario con un token Bearer (401 sin él) tras
+AUTH_STUB_LATENCY_MS milisegundos, que simulan la consulta a MySQL.
+
+Uso:
+    AUTH_STUB_LATENCY_MS=5 python -m uvicorn benchmarks.auth_stub:app --port 8080
+    (o start_auth_stub() desde otro benchmark)
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI, Header, HTTPException
+
+LATENCY_SECONDS = float(os.getenv("AUTH_STUB_LATENCY_MS", "5")) / 1000
+
+app = FastAPI(title="Auth stub")
+
+
+@app.get("/health")
+def health():
+    return {"status": "healthy"}
+
+
+@app.get("/api/auth/users/{user_id}")
+async def get_user(user_id: str, authorization: str = Header(None)):
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    if LATENCY_SECONDS:
+        await asyncio.sleep(LATENCY_SECONDS)
+    return {"id": user_id, "email": f"{user_id[:8]}@bench.local", "firstName": "Bench", "lastName": "User"}
+
+
+def start_auth_stub(port: int, latency_ms: float) -> subprocess.Popen:
+    env = {**os.environ, "AUTH_STUB_LATENCY_MS": str(latency_ms)}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.auth_stub:app", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("auth stub did not start")
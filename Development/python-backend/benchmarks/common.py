@@ -0,0 +1,88 @@
+"""
+Utilidades compartidas por los benchmarks: catálogo sintético y percentiles.
+"""
+import random
+from typing import Dict, Iterator, List, Sequence
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.product import Product
+
+PRODUCT_TYPES = [
+    "Zapatillas", "Camiseta", "Pantalón", "Balón", "Raqueta", "Guantes", "Mochila",
+    "Leggings", "Short", "Chaqueta", "Gorra", "Medias", "Casco", "Bicicleta", "Mancuernas",
+]
+BRANDS = ["Nike", "Adidas", "Puma", "Wilson", "Reebok", "Under Armour", "Asics", "New Balance"]
+SPORTS = ["Running", "Fútbol", "Basketball", "Tennis", "Fitness", "Yoga", "Ciclismo", "Natación"]
+CATEGORIES = ["Calzado", "Ropa", "Equipamiento", "Accesorios"]
+GENDERS = ["Hombre", "Mujer", "Unisex"]
+ADJECTIVES = [
+    "Pro", "Elite", "Ultra", "Air", "Max", "Flex", "Trail", "Storm", "Boost", "Classic",
+    "Lite", "Carbon", "Velocity", "Impact", "Zoom", "Apex", "Nova", "Pulse", "Edge", "Core",
+]
+DESCRIPTION_WORDS = [
+    "ligero", "transpirable", "resistente", "profesional", "entrenamiento", "competición",
+    "comodidad", "amortiguación", "tecnología", "diseño", "agarre", "durabilidad",
+    "secado", "rápido", "soporte", "estabilidad", "impermeable", "oficial", "premium",
+]
+
+
+def synthetic_products(count: int, seed: int = 42) -> Iterator[Dict]:
+    """Genera ``count`` productos deterministas como diccionarios de columnas."""
+    rng = random.Random(seed)
+    for i in range(count):
+        brand = rng.choice(BRANDS)
+        sport = rng.choice(SPORTS)
+        name = f"{rng.choice(PRODUCT_TYPES)} {brand} {rng.choice(ADJECTIVES)} {rng.choice(ADJECTIVES)} {i}"
+        yield {
+            "name": name[:100],
+            "description": " ".join(rng.choices(DESCRIPTION_WORDS, k=12)) + f" para {sport.lower()}",
+            "price": round(rng.uniform(5, 400), 2),
+            "category": rng.choice(CATEGORIES),
+            "brand": brand,
+            "sport": sport,
+            "gender": rng.choice(GENDERS),
+            "in_stock": True,
+            "stock_quantity": rng.randint(0, 200),
+        }
+
+
+def build_catalog_database(url: str, product_count: int, batch_size: int = 10_000):
+    """Crea el esquema en ``url`` y carga un catálogo sintético. Devuelve (engine, Session)."""
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    batch: List[Dict] = []
+    with engine.begin() as conn:
+        for row in synthetic_products(product_count):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                conn.execute(insert(Product), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Product), batch)
+
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Percentil por rango más cercano (``pct`` entre 0 y 100)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize_ms(samples: Sequence[float]) -> Dict[str, float]:
+    """Resumen p50/p95/p99 en milisegundos a partir de muestras en segundos."""
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "samples": len(samples),
+    }
@@ -0,0 +1,16 @@
+-- =============================================
+-- Tabla de facetas del catálogo sin filtros (GET /api/v1/products/facets)
+-- Aplicar sobre bases de datos creadas con la versión anterior de
+-- init_database.sql. Debe coincidir con app/models/product_facet.py.
+-- La API la llena en la primera consulta y la vacía en cada escritura del catálogo.
+-- =============================================
+
+\c sportgear_db;
+
+CREATE TABLE IF NOT EXISTS product_facets (
+    facet VARCHAR(20) NOT NULL,
+    value VARCHAR(100) NOT NULL,
+    count INTEGER NOT NULL,
+    refreshed_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (facet, value)
+);
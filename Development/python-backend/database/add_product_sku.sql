@@ -0,0 +1,15 @@
+-- =============================================
+-- SKU de proveedor para la importación masiva (POST /api/v1/products/bulk)
+-- Aplicar sobre bases de datos creadas con la versión anterior de
+-- init_database.sql. Debe coincidir con app/models/product.py.
+-- CONCURRENTLY no bloquea escrituras: ejecutar fuera de una transacción
+-- (psql en modo autocommit, sin -1).
+-- =============================================
+
+\c sportgear_db;
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS sku VARCHAR(64);
+
+-- Índice único (no parcial) para que ON CONFLICT (sku) pueda usarlo;
+-- los productos sin sku (NULL) no entran en conflicto entre sí
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_products_sku ON products(sku);
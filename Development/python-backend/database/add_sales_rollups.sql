@@ -0,0 +1,49 @@
+-- =============================================
+-- Tablas de resumen de ventas (GET /api/v1/analytics/sales y /top-products)
+-- Aplicar sobre bases de datos creadas con la versión anterior de
+-- init_database.sql. Debe coincidir con app/models/sales_rollup.py.
+-- Marca todos los días con órdenes: el siguiente recálculo (POST /analytics/refresh o
+-- el periódico de la app) los calcula.
+-- =============================================
+
+\c sportgear_db;
+
+CREATE TABLE IF NOT EXISTS sales_daily (
+    day DATE NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    orders INTEGER NOT NULL,
+    revenue DECIMAL(12,2) NOT NULL,
+    paid DECIMAL(12,2) NOT NULL,
+    PRIMARY KEY (day, status)
+);
+
+CREATE TABLE IF NOT EXISTS sales_daily_products (
+    day DATE NOT NULL,
+    product_id INTEGER NOT NULL,
+    units INTEGER NOT NULL,
+    revenue DECIMAL(12,2) NOT NULL,
+    PRIMARY KEY (day, product_id)
+);
+
+CREATE TABLE IF NOT EXISTS sales_daily_segments (
+    day DATE NOT NULL,
+    dimension VARCHAR(20) NOT NULL,
+    value VARCHAR(100) NOT NULL,
+    units INTEGER NOT NULL,
+    revenue DECIMAL(12,2) NOT NULL,
+    PRIMARY KEY (day, dimension, value)
+);
+
+CREATE INDEX IF NOT EXISTS ix_sales_daily_products_product_id ON sales_daily_products(product_id);
+
+-- Versiones anteriores guardaban una fila por escritura (id SERIAL); se
+-- recrea con day como clave: las marcas perdidas se reponen abajo
+DROP TABLE IF EXISTS sales_rollup_dirty;
+
+CREATE TABLE sales_rollup_dirty (
+    day DATE PRIMARY KEY
+);
+
+INSERT INTO sales_rollup_dirty (day)
+SELECT DISTINCT date(created_at) FROM orders
+ON CONFLICT (day) DO NOTHING;
@@ -0,0 +1,32 @@
+-- =============================================
+-- Índice full-text para /api/v1/products/search
+-- Aplicar sobre bases de datos creadas antes de la búsqueda indexada.
+-- La expresión debe coincidir con search_document_sql() en app/models/product.py
+-- =============================================
+
+\c sportgear_db;
+
+-- Búsqueda sin acentos ("futbol" encuentra "Fútbol"): configuración 'simple' + unaccent.
+-- CREATE EXTENSION requiere un rol con permiso para crear extensiones.
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'sportgear_search') THEN
+        CREATE TEXT SEARCH CONFIGURATION sportgear_search (COPY = simple);
+        ALTER TEXT SEARCH CONFIGURATION sportgear_search
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+    END IF;
+END $$;
+
+-- Índice creado con la configuración 'simple' anterior: se reemplaza
+DROP INDEX IF EXISTS idx_products_search;
+
+CREATE INDEX IF NOT EXISTS idx_products_search ON products
+USING GIN ((
+    setweight(to_tsvector('sportgear_search'::regconfig, coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('sportgear_search'::regconfig, coalesce(brand, '')), 'B') ||
+    setweight(to_tsvector('sportgear_search'::regconfig, coalesce(description, '')), 'D')
+));
+
+ANALYZE products;
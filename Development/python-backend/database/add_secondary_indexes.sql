@@ -0,0 +1,45 @@
+-- =============================================
+-- Índices secundarios para los filtros más usados
+-- Aplicar sobre bases de datos creadas con la versión anterior de
+-- init_database.sql. Deben coincidir con los __table_args__ de app/models.
+-- CONCURRENTLY no bloquea escrituras: ejecutar fuera de una transacción
+-- (psql en modo autocommit, sin -1).
+-- =============================================
+
+\c sportgear_db;
+
+-- Catálogo: igualdad por faceta + rango de precio (/products/search)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_products_category_price ON products(category, price);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_products_brand_price ON products(brand, price);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_products_sport_price ON products(sport, price);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_products_gender_price ON products(gender, price);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_products_price ON products(price);
+
+-- Órdenes: mismo orden que la paginación por cursor (created_at DESC, id DESC)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_user_created ON orders(user_id, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_created ON orders(created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_status_created ON orders(status, created_at DESC);
+
+-- Pagos por orden (get_payments_by_order, ?include=payments)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_payments_order_id ON payments(order_id);
+
+-- Envíos por estado, más recientes primero
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_shipments_status_created ON shipments(status, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_shipments_created ON shipments(created_at DESC, id DESC);
+
+-- Índices de una columna cubiertos por el prefijo de los compuestos
+-- (shipments.order_id y tracking_number ya tienen índice por su UNIQUE)
+DROP INDEX CONCURRENTLY IF EXISTS idx_products_category;
+DROP INDEX CONCURRENTLY IF EXISTS idx_products_brand;
+DROP INDEX CONCURRENTLY IF EXISTS idx_products_sport;
+DROP INDEX CONCURRENTLY IF EXISTS idx_products_gender;
+DROP INDEX CONCURRENTLY IF EXISTS idx_orders_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_orders_status;
+DROP INDEX CONCURRENTLY IF EXISTS idx_shipments_order_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_shipments_tracking_number;
+DROP INDEX CONCURRENTLY IF EXISTS idx_shipments_status;
+
+ANALYZE products;
+ANALYZE orders;
+ANALYZE payments;
+ANALYZE shipments;
@@ -17,6 +17,7 @@ WHERE NOT EXISTS (SELECT FROM pg_database WHERE datname = 'sportgear_db')\gexec
 -- Products table
 CREATE TABLE IF NOT EXISTS products (
     id SERIAL PRIMARY KEY,
+    sku VARCHAR(64),
     name VARCHAR(100) NOT NULL,
     description TEXT,
     price DECIMAL(10,2) NOT NULL CHECK (price >= 0),
@@ -66,20 +67,65 @@ CREATE TABLE IF NOT EXISTS shipments (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Facet counts of the unfiltered catalog (cache rebuilt by the API, see facet_service.py)
+CREATE TABLE IF NOT EXISTS product_facets (
+    facet VARCHAR(20) NOT NULL,
+    value VARCHAR(100) NOT NULL,
+    count INTEGER NOT NULL,
+    refreshed_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (facet, value)
+);
+
+-- Sales rollups per day (maintained by the API, see sales_rollup.py)
+CREATE TABLE IF NOT EXISTS sales_daily (
+    day DATE NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    orders INTEGER NOT NULL,
+    revenue DECIMAL(12,2) NOT NULL,
+    paid DECIMAL(12,2) NOT NULL,
+    PRIMARY KEY (day, status)
+);
+
+CREATE TABLE IF NOT EXISTS sales_daily_products (
+    day DATE NOT NULL,
+    product_id INTEGER NOT NULL,
+    units INTEGER NOT NULL,
+    revenue DECIMAL(12,2) NOT NULL,
+    PRIMARY KEY (day, product_id)
+);
+
+CREATE TABLE IF NOT EXISTS sales_daily_segments (
+    day DATE NOT NULL,
+    dimension VARCHAR(20) NOT NULL,
+    value VARCHAR(100) NOT NULL,
+    units INTEGER NOT NULL,
+    revenue DECIMAL(12,2) NOT NULL,
+    PRIMARY KEY (day, dimension, value)
+);
+
+-- Days whose orders or payments changed since the last recompute
+CREATE TABLE IF NOT EXISTS sales_rollup_dirty (
+    day DATE PRIMARY KEY
+);
+
 -- =============================================
 -- Create Indexes for better performance
 -- =============================================
 
-CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
-CREATE INDEX IF NOT EXISTS idx_products_brand ON products(brand);
-CREATE INDEX IF NOT EXISTS idx_products_sport ON products(sport);
-CREATE INDEX IF NOT EXISTS idx_products_gender ON products(gender);
-CREATE INDEX IF NOT EXISTS idx_orders_user_id ON orders(user_id);
-CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
+-- Deben coincidir con los __table_args__ de app/models (ver add_secondary_indexes.sql)
+CREATE INDEX IF NOT EXISTS idx_products_category_price ON products(category, price);
+CREATE INDEX IF NOT EXISTS idx_products_brand_price ON products(brand, price);
+CREATE INDEX IF NOT EXISTS idx_products_sport_price ON products(sport, price);
+CREATE INDEX IF NOT EXISTS idx_products_gender_price ON products(gender, price);
+CREATE INDEX IF NOT EXISTS idx_products_price ON products(price);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_products_sku ON products(sku);
+CREATE INDEX IF NOT EXISTS idx_orders_user_created ON orders(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_orders_created ON orders(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_orders_status_created ON orders(status, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_payments_order_id ON payments(order_id);
-CREATE INDEX IF NOT EXISTS idx_shipments_order_id ON shipments(order_id);
-CREATE INDEX IF NOT EXISTS idx_shipments_tracking_number ON shipments(tracking_number);
-CREATE INDEX IF NOT EXISTS idx_shipments_status ON shipments(status);
+CREATE INDEX IF NOT EXISTS idx_shipments_status_created ON shipments(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_shipments_created ON shipments(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_sales_daily_products_product_id ON sales_daily_products(product_id);
 
 -- =============================================
 -- Insert Sample Data (Optional - for testing)
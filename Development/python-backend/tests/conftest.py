@@ -1,39 +1,160 @@
 """
 Fixtures compartidos para todas las pruebas
+
+El esquema se crea una vez por sesión y cada prueba corre dentro de una
+transacción que se deshace al terminar. Los commit del código bajo prueba
+solo liberan un SAVEPOINT (join_transaction_mode="create_savepoint").
+Las pruebas que necesitan datos confirmados, visibles desde otras
+conexiones (hilos propios, engine async de /api/v2), usan
+@pytest.mark.committed_db. Al terminar, esas pruebas vacían las tablas.
+
+Base de pruebas: SQLite en archivo (test.db, o test_<worker>.db con
+pytest-xdist), o con TEST_DATABASE=memory una base en memoria compartida
+(cache=shared) por worker.
 """
 import pytest
 import os
 import sys
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from fastapi.testclient import TestClient
 
 # Prevenir la creación automática de tablas al importar
 os.environ["TESTING"] = "1"
+# El perfil SQL es opcional en producción; las pruebas lo instrumentan (tests/test_sql_profiler.py)
+os.environ.setdefault("SQL_PROFILER_ENABLED", "true")
+os.environ.setdefault("SQL_EXPLAIN_SLOW", "true")
+
+WORKER = os.getenv("PYTEST_XDIST_WORKER", "")
+IN_MEMORY_DATABASE = os.getenv("TEST_DATABASE", "file") == "memory"
+if IN_MEMORY_DATABASE:
+    SQLALCHEMY_DATABASE_URL = f"sqlite:///file:test_{WORKER or 'main'}?mode=memory&cache=shared&uri=true"
+else:
+    SQLALCHEMY_DATABASE_URL = f"sqlite:///./test{'_' + WORKER if WORKER else ''}.db"
+# app.database (engine de la app y engine async) usa la misma base
+os.environ["TEST_DATABASE_URL"] = SQLALCHEMY_DATABASE_URL
 
 from app.database import Base, get_db
+from app.services import metrics, sql_profiler
 # Import common step definitions so pytest-bdd can find them when scenarios are declared
 from .step_defs import test_common_steps  # noqa: F401
 
-# Base de datos en memoria para pruebas
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False},
+    # En memoria SQLAlchemy usaría SingletonThreadPool, que cierra conexiones de otros hilos
+    poolclass=QueuePool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Como app.database.engine: las consultas de las pruebas cuentan en /metrics
+metrics.instrument_engine(engine, "sync")
+sql_profiler.instrument_engine(engine)
 
 
-@pytest.fixture(scope="function")
-def db_session():
-    """Crea una nueva sesión de base de datos para cada prueba"""
+# Los abre db_session en cada commit/rollback del código bajo prueba
+_TEST_TRANSACTION = ("SAVEPOINT", "RELEASE", "ROLLBACK TO")
+
+
+@pytest.fixture(scope="session")
+def database_schema():
+    """Crea el esquema una vez por sesión (por worker con pytest-xdist)"""
+    # En memoria la base existe mientras quede una conexión abierta
+    keeper = engine.connect() if IN_MEMORY_DATABASE else None
+    Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    try:
+        yield engine
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        if keeper is not None:
+            keeper.close()
+
+
+def _committed_session():
     session = TestingSessionLocal()
     try:
         yield session
     finally:
         session.close()
-        Base.metadata.drop_all(bind=engine)
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+class StatementLog(list):
+    """Sentencias en orden de ejecución, con los espacios normalizados; ``parameters`` va en paralelo"""
+
+    def __init__(self):
+        super().__init__()
+        self.parameters = []
+
+    def starting_with(self, *prefixes: str) -> list:
+        """Sentencias que empiezan por alguno de ``prefixes`` (sin distinguir mayúsculas)"""
+        prefixes = tuple(prefix.upper() for prefix in prefixes)
+        return [statement for statement in self if statement.upper().startswith(prefixes)]
+
+
+@pytest.fixture
+def count_statements():
+    """
+    Registra las sentencias que la sesión (o el engine/conexión) envía a la
+    base dentro del bloque, sin los SAVEPOINT, RELEASE y ROLLBACK TO de la
+    transacción de la prueba:
+
+        with count_statements(db_session) as statements:
+            update_product(db_session, 1, ProductUpdate(price=10))
+        assert statements.starting_with("UPDATE") == [...]
+    """
+    @contextmanager
+    def capture(db):
+        statements = StatementLog()
+        bind = db.get_bind() if hasattr(db, "get_bind") else db
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statement = " ".join(statement.split())
+            if not statement.upper().startswith(_TEST_TRANSACTION):
+                statements.append(statement)
+                statements.parameters.append(parameters)
+
+        event.listen(bind, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(bind, "before_cursor_execute", record)
+    return capture
+
+
+@pytest.fixture(scope="function")
+def db_session(request, database_schema):
+    """Sesión de una prueba: lo que escribe se deshace al terminar"""
+    from app.services.catalog_cache import catalog_cache
+    from app.services.suggest_service import suggest_index
+
+    # La base vuelve a su estado inicial en cada prueba: la caché del catálogo y
+    # el índice de autocompletado no deben sobrevivirla
+    catalog_cache.clear()
+    suggest_index.mark_stale()
+    if request.node.get_closest_marker("committed_db"):
+        yield from _committed_session()
+        return
+
+    connection = engine.connect()
+    dbapi_connection = connection.connection.driver_connection
+    isolation_level = dbapi_connection.isolation_level
+    # pysqlite abre y cierra transacciones por su cuenta, y así los SAVEPOINT no
+    # funcionan: se desactiva ese manejo y la transacción externa se abre con BEGIN
+    dbapi_connection.isolation_level = None
+    transaction = connection.begin()
+    dbapi_connection.execute("BEGIN")
+    session = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        dbapi_connection.isolation_level = isolation_level
+        connection.close()
 
 
 @pytest.fixture(scope="function")
@@ -391,6 +391,24 @@ class TestLogisticsOperatorShipmentTracking:
             data = response.json()
             assert data["status"] == "delivered"
 
+    def test_shipped_at_is_set_once(self, client: TestClient, db_session):
+        """Prueba que repetir el estado shipped no cambia la fecha de envío"""
+        from app.models.order import Order
+        order = Order(user_id="550e8400-e29b-41d4-a716-446655440000", total=10.0)
+        db_session.add(order)
+        db_session.commit()
+        shipment_id = client.post("/api/v1/shipments", json={"order_id": order.id}).json()["id"]
+
+        first = client.put(f"/api/v1/shipments/{shipment_id}/status", json={"status": "shipped"}).json()
+        second = client.put(
+            f"/api/v1/shipments/{shipment_id}/status", json={"status": "shipped", "vehicle_info": "Camión ABC123"}
+        ).json()
+
+        assert first["shipped_at"] is not None
+        assert second["shipped_at"] == first["shipped_at"]
+        assert second["vehicle_info"] == "Camión ABC123"
+        assert client.put("/api/v1/shipments/9999/status", json={"status": "shipped"}).status_code == 404
+
     def test_add_shipment_notes(self, client: TestClient):
         """Prueba agregar notas al envío"""
         shipment_data = {
@@ -0,0 +1,114 @@
+"""
+Pruebas de integración para la API async (/api/v2)
+"""
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+# El engine async abre sus propias conexiones: los datos de v1 deben estar confirmados
+pytestmark = pytest.mark.committed_db
+
+
+class TestAsyncProductRoutes:
+    """Tests para las rutas async de productos"""
+
+    def test_read_products_created_with_v1(self, client: TestClient, sample_product_data):
+        """Prueba que v2 lee los mismos datos que v1"""
+        created = client.post("/api/v1/products", json=sample_product_data).json()
+
+        response = client.get("/api/v2/products")
+
+        assert response.status_code == 200
+        assert [p["id"] for p in response.json()] == [created["id"]]
+
+    def test_create_and_get_product(self, client: TestClient, sample_product_data):
+        """Prueba crear y obtener un producto con AsyncSession"""
+        created = client.post("/api/v2/products", json=sample_product_data).json()
+
+        response = client.get(f"/api/v2/products/{created['id']}")
+
+        assert response.status_code == 200
+        assert response.json()["name"] == sample_product_data["name"]
+        assert client.get("/api/v2/products/9999").status_code == 404
+
+    def test_search_and_cursor(self, client: TestClient, sample_product_data):
+        """Prueba la búsqueda full-text y la paginación por cursor en v2"""
+        for name in ("Balón Adidas", "Balón Nike", "Raqueta Wilson"):
+            client.post("/api/v2/products", json={**sample_product_data, "name": name})
+
+        search = client.get("/api/v2/products/search?q=balon").json()
+        page = client.get("/api/v2/products?cursor=&limit=2").json()
+
+        assert {p["name"] for p in search} == {"Balón Adidas", "Balón Nike"}
+        assert len(page["items"]) == 2 and page["next_cursor"] is not None
+        assert client.get("/api/v2/products?cursor=xyz").status_code == 400
+
+
+class TestAsyncOrderRoutes:
+    """Tests para las rutas async de órdenes"""
+
+    @patch('app.crud.order_crud.validate_user_for_order')
+    def test_create_order(self, mock_validate, client: TestClient, sample_order_data):
+        """Prueba crear una orden por la ruta async"""
+        mock_validate.return_value = True
+
+        response = client.post(
+            "/api/v2/orders", json=sample_order_data, headers={"Authorization": "Bearer test.token"}
+        )
+
+        assert response.status_code == 200
+        order_id = response.json()["id"]
+        assert client.get(f"/api/v1/orders/{order_id}").json()["user_id"] == sample_order_data["user_id"]
+        mock_validate.assert_called_once_with(sample_order_data["user_id"], "test.token")
+
+    @patch('app.crud.order_crud.validate_user_for_order')
+    def test_create_order_with_items(self, mock_validate, client: TestClient, sample_product_data):
+        """Prueba que v2 guarda los items, calcula el total y reserva stock"""
+        product = client.post(
+            "/api/v2/products", json={**sample_product_data, "price": 10.0, "stock_quantity": 4}
+        ).json()
+
+        def buy(quantity):
+            return client.post(
+                "/api/v2/orders",
+                json={"user_id": "550e8400-e29b-41d4-a716-446655440000",
+                      "items": [{"product_id": product["id"], "quantity": quantity}]},
+                headers={"Authorization": "Bearer test.token"}
+            )
+
+        response = buy(3)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 30.0
+        assert [(i["product_id"], i["quantity"]) for i in data["items"]] == [(product["id"], 3)]
+        assert buy(2).status_code == 409
+        assert client.get(f"/api/v2/products/{product['id']}").json()["stock_quantity"] == 1
+
+    @patch('app.crud.order_crud.validate_user_for_order')
+    def test_read_order_with_include(self, mock_validate, client: TestClient, sample_product_data):
+        """Prueba ?include= en el detalle y el listado async de órdenes"""
+        product = client.post("/api/v2/products", json={**sample_product_data, "stock_quantity": 5}).json()
+        order = client.post(
+            "/api/v2/orders",
+            json={"user_id": "u1", "items": [{"product_id": product["id"], "quantity": 2}]},
+            headers={"Authorization": "Bearer test.token"}
+        ).json()
+
+        detail = client.get(f"/api/v2/orders/{order['id']}?include=product,shipment").json()
+        page = client.get("/api/v2/orders?cursor=&include=items").json()
+
+        assert detail["items"][0]["product"]["name"] == sample_product_data["name"]
+        assert detail["shipment"] is None and "payments" not in detail
+        assert page["items"][0]["items"][0]["quantity"] == 2
+        assert "items" not in client.get("/api/v2/orders").json()[0]
+
+    def test_create_order_requires_token(self, client: TestClient, sample_order_data):
+        """Prueba que la ruta async exige el header Authorization"""
+        response = client.post("/api/v2/orders", json=sample_order_data)
+        assert response.status_code == 401
+
+    def test_list_payments_and_shipments(self, client: TestClient):
+        """Prueba los listados async de pagos y envíos"""
+        assert client.get("/api/v2/payments").json() == []
+        assert client.get("/api/v2/shipments?cursor=").json() == {"items": [], "next_cursor": None}
@@ -0,0 +1,133 @@
+"""
+Pruebas para la caché de lecturas del catálogo (app/services/catalog_cache.py)
+"""
+from app.crud import order_crud
+from app.models import Product
+from app.schemas.order_schema import OrderCreate, OrderItemCreate
+from app.services.catalog_cache import (
+    CatalogCache, LocalSharedBackend, cache_key, catalog_cache, product_tag
+)
+
+
+def _seed(db):
+    products = [
+        Product(name="Zapatillas Nike Air", price=120, category="Calzado", brand="Nike", stock_quantity=5),
+        Product(name="Balón Adidas", price=45, category="Equipamiento", brand="Adidas", stock_quantity=9),
+    ]
+    db.add_all(products)
+    db.commit()
+    return [product.id for product in products]
+
+
+class TestCatalogCache:
+    """Tests para CatalogCache"""
+
+    def test_key_normalization(self):
+        """Prueba que el orden, los None y el formato del texto no cambian la clave"""
+        assert cache_key("search", {"q": "  Nike   AIR", "brand": None, "limit": 10}) == \
+            cache_key("search", {"limit": 10, "q": "nike air"})
+        assert cache_key("search", {"q": "nike", "limit": 10}) != cache_key("search", {"q": "nike", "limit": 20})
+
+    def test_invalidate_by_tag(self):
+        """Prueba que invalidar una etiqueta solo afecta a sus entradas"""
+        cache = CatalogCache()
+        loads = []
+
+        def loader(value):
+            def load():
+                loads.append(value)
+                return value
+            return load
+
+        cache.get_or_load("product", {"id": 1}, [product_tag(1)], loader("a"))
+        cache.get_or_load("product", {"id": 2}, [product_tag(2)], loader("b"))
+        cache.invalidate([product_tag(1)])
+        cache.get_or_load("product", {"id": 1}, [product_tag(1)], loader("a2"))
+        cache.get_or_load("product", {"id": 2}, [product_tag(2)], loader("b2"))
+
+        assert loads == ["a", "b", "a2"]
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["size"] == 2 and stats["memory_bytes"] > 0
+
+    def test_shared_backend_invalidates_other_workers(self):
+        """Prueba que con un backend compartido una escritura invalida la caché de otro proceso"""
+        backend = LocalSharedBackend()
+        worker_a, worker_b = CatalogCache(backend=backend), CatalogCache(backend=backend)
+
+        worker_a.get_or_load("products", {}, ["products"], lambda: ["v1"])
+        assert worker_b.get_or_load("products", {}, ["products"], lambda: ["db"]) == ["v1"]
+        assert worker_b.shared_hits == 1
+
+        worker_b.invalidate(["products"])
+        assert worker_a.get_or_load("products", {}, ["products"], lambda: ["v2"]) == ["v2"]
+
+
+class TestCatalogCacheRoutes:
+    """Tests para las lecturas de /products a través de la caché"""
+
+    def test_repeated_reads_skip_database(self, client, db_session, count_statements):
+        """Prueba que la segunda lectura idéntica no consulta la base de datos"""
+        ids = _seed(db_session)
+        for url in ("/api/v1/products", f"/api/v1/products/{ids[0]}", "/api/v1/products/search?q=Nike"):
+            first = client.get(url).json()
+            with count_statements(db_session) as statements:
+                second = client.get(url).json()
+            assert second == first
+            assert statements == []
+
+    def test_update_invalidates_detail_and_lists(self, client, db_session, count_statements):
+        """Prueba que actualizar un producto refresca su detalle y las listas, no los demás detalles"""
+        ids = _seed(db_session)
+        client.get(f"/api/v1/products/{ids[0]}")
+        client.get(f"/api/v1/products/{ids[1]}")
+        client.get("/api/v1/products/search?brand=Nike")
+
+        assert client.put(f"/api/v1/products/{ids[0]}", json={"price": 99}).status_code == 200
+
+        assert client.get(f"/api/v1/products/{ids[0]}").json()["price"] == 99
+        assert client.get("/api/v1/products/search?brand=Nike").json()[0]["price"] == 99
+        with count_statements(db_session) as statements:
+            client.get(f"/api/v1/products/{ids[1]}")
+        assert statements == []
+
+    def test_create_and_delete_invalidate_lists(self, client, db_session):
+        """Prueba que crear y eliminar productos se refleja en los listados"""
+        _seed(db_session)
+        assert len(client.get("/api/v1/products").json()) == 2
+
+        created = client.post("/api/v1/products", json={"name": "Gorra", "price": 20})
+        assert len(client.get("/api/v1/products").json()) == 3
+
+        client.delete(f"/api/v1/products/{created.json()['id']}")
+        assert len(client.get("/api/v1/products").json()) == 2
+        assert client.get(f"/api/v1/products/{created.json()['id']}").status_code == 404
+
+    def test_orders_refresh_lists_when_in_stock_flips(self, client, db_session, count_statements):
+        """Prueba que una orden invalida las listas solo si agota un producto, y cancelarla las vuelve a invalidar"""
+        ids = _seed(db_session)
+        client.get("/api/v1/products")
+
+        order_crud._insert_order(db_session, OrderCreate(user_id="u1", items=[
+            OrderItemCreate(product_id=ids[1], quantity=1)]))
+        with count_statements(db_session) as statements:
+            client.get("/api/v1/products")
+        assert statements == []  # quedan unidades: la lista sigue en caché
+
+        sold_out = order_crud._insert_order(db_session, OrderCreate(user_id="u1", items=[
+            OrderItemCreate(product_id=ids[0], quantity=5)]))
+        assert [p["in_stock"] for p in client.get("/api/v1/products").json()] == [False, True]
+
+        order_crud.cancel_order_and_release_stock(db_session, sold_out.id)
+        assert [p["in_stock"] for p in client.get("/api/v1/products").json()] == [True, True]
+
+    def test_stats_in_detailed_health(self, client, db_session):
+        """Prueba que /api/health/detailed reporta aciertos y memoria de la caché"""
+        ids = _seed(db_session)
+        client.get(f"/api/v1/products/{ids[0]}")
+        client.get(f"/api/v1/products/{ids[0]}")
+
+        stats = client.get("/api/health/detailed").json()["catalog_cache"]
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+        assert stats["memory_bytes"] > 0
+        assert catalog_cache.stats()["size"] == 1
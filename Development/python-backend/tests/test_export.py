@@ -0,0 +1,90 @@
+"""
+Pruebas para las exportaciones en streaming (app/services/export_service.py)
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from app.models import Order, Payment, Shipment
+from app.services import export_service
+
+
+def _seed(db):
+    orders = [
+        Order(user_id="u1", total=10.0, status="pending", created_at=datetime(2024, 1, 1)),
+        Order(user_id="u1", total=20.0, status="completed", created_at=datetime(2024, 2, 1)),
+        Order(user_id="u2", total=30.0, status="completed", created_at=datetime(2024, 3, 1)),
+    ]
+    db.add_all(orders)
+    db.flush()
+    db.add_all([Payment(order_id=order.id, amount=order.total, payment_method="card",
+                        payment_status="completed") for order in orders])
+    db.add(Shipment(order_id=orders[1].id, tracking_number="TRK1", status="delivered",
+                    created_at=datetime(2024, 2, 2)))
+    db.commit()
+    return [order.id for order in orders]
+
+
+def _ndjson(chunks):
+    return [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+
+
+class TestExportService:
+    """Tests para stream_export"""
+
+    def test_orders_ndjson_with_filters(self, db_session):
+        """Prueba exportar órdenes filtradas por estado y rango de fechas"""
+        ids = _seed(db_session)
+        rows = _ndjson(export_service.stream_export(
+            db_session, "orders", "ndjson", status="completed",
+            created_from=datetime(2024, 1, 15), created_to=datetime(2024, 3, 1),
+        ))
+        assert [row["id"] for row in rows] == [ids[1]]
+        assert rows[0]["created_at"] == "2024-02-01T00:00:00"
+        assert set(rows[0]) == set(export_service.EXPORTS["orders"][1])
+
+    def test_one_chunk_per_partition(self, db_session):
+        """Prueba que se emite un bloque por partición del cursor, en orden cronológico"""
+        ids = _seed(db_session)
+        chunks = list(export_service.stream_export(db_session, "orders", "ndjson", partition_size=2))
+        assert len(chunks) == 2
+        assert [row["id"] for row in _ndjson(chunks)] == ids
+
+    def test_payments_csv_filtered_by_order_date(self, db_session):
+        """Prueba exportar pagos en CSV filtrando por la fecha de su orden"""
+        ids = _seed(db_session)
+        data = b"".join(export_service.stream_export(
+            db_session, "payments", "csv", created_from=datetime(2024, 2, 1)
+        )).decode()
+        rows = list(csv.DictReader(io.StringIO(data)))
+        assert [int(row["order_id"]) for row in rows] == ids[1:]
+        assert rows[0]["payment_method"] == "card"
+
+    def test_empty_csv_has_header(self, db_session):
+        """Prueba que un CSV sin filas conserva la cabecera"""
+        data = b"".join(export_service.stream_export(db_session, "shipments", "csv")).decode()
+        assert data == ",".join(export_service.EXPORTS["shipments"][1]) + "\n"
+
+
+class TestExportRoutes:
+    """Tests para los endpoints /export"""
+
+    def test_export_orders_route(self, client, db_session):
+        """Prueba GET /orders/export en NDJSON"""
+        _seed(db_session)
+        response = client.get("/api/v1/orders/export?status=completed")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert len(response.text.splitlines()) == 2
+
+    def test_export_shipments_csv_route(self, client, db_session):
+        """Prueba GET /shipments/export en CSV como adjunto"""
+        _seed(db_session)
+        response = client.get("/api/v1/shipments/export?format=csv")
+        assert response.status_code == 200
+        assert response.headers["content-disposition"] == 'attachment; filename="shipments.csv"'
+        assert list(csv.DictReader(io.StringIO(response.text)))[0]["tracking_number"] == "TRK1"
+
+    def test_invalid_format(self, client):
+        """Prueba que un formato desconocido responde 422"""
+        assert client.get("/api/v1/payments/export?format=xml").status_code == 422
@@ -0,0 +1,144 @@
+"""
+Pruebas para los conteos de facetas (GET /api/v1/products/facets)
+"""
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.crud import product_crud
+from app.models import Product, ProductFacet
+from app.schemas.product_schema import ProductUpdate
+from app.services import facet_service
+
+
+def _seed(db):
+    db.add_all([
+        Product(name="Zapatillas Nike Air", price=120, category="Calzado", brand="Nike", sport="Running",
+                gender="Unisex", stock_quantity=5),
+        Product(name="Camiseta Nike Dry", price=40, category="Ropa", brand="Nike", sport="Running",
+                gender="Hombre", stock_quantity=0, in_stock=False),
+        Product(name="Balón Adidas", price=45, category="Equipamiento", brand="Adidas", sport="Fútbol",
+                gender="Unisex", stock_quantity=9),
+        Product(name="Zapatillas Adidas Boost", price=160, category="Calzado", brand="Adidas", sport="Running",
+                gender="Mujer", stock_quantity=3),
+        Product(name="Raqueta Wilson", price=650, category="Equipamiento", brand="Wilson", sport="Tennis",
+                stock_quantity=1),
+    ])
+    db.commit()
+
+
+def _values(facets, name):
+    return {item["value"]: item["count"] for item in facets[name]}
+
+
+class TestFacetCounts:
+    """Tests para app.services.facet_service"""
+
+    def test_unfiltered_catalog(self, db_session):
+        """Prueba conteos del catálogo completo, incluidos los rangos de precio"""
+        _seed(db_session)
+        facets = facet_service.facet_counts(db_session)
+
+        assert facets["total"] == 5
+        assert _values(facets, "category") == {"Calzado": 2, "Equipamiento": 2, "Ropa": 1}
+        assert _values(facets, "gender") == {"Unisex": 2, "Hombre": 1, "Mujer": 1}
+        assert facets["category"][0] == {"value": "Calzado", "count": 2}
+        assert [(b["min"], b["max"], b["count"]) for b in facets["price"]] == [
+            (0, 50, 2), (50, 100, 0), (100, 200, 2), (200, 500, 0), (500, None, 1)
+        ]
+
+    def test_facet_ignores_its_own_filter(self, db_session):
+        """Prueba que con brand=Nike la faceta de marca sigue mostrando las demás marcas"""
+        _seed(db_session)
+        facets = facet_service.facet_counts(db_session, brand="Nike", category="Calzado")
+
+        assert facets["total"] == 1
+        assert _values(facets, "brand") == {"Nike": 1, "Adidas": 1}
+        assert _values(facets, "category") == {"Calzado": 1, "Ropa": 1}
+        assert _values(facets, "sport") == {"Running": 1}
+
+    def test_text_search_and_stock_narrow_every_facet(self, db_session):
+        """Prueba que la búsqueda de texto y in_stock aplican a todas las facetas"""
+        _seed(db_session)
+        facets = facet_service.facet_counts(db_session, search_query="nike", in_stock_only=True)
+        assert facets["total"] == 1
+        assert _values(facets, "brand") == {"Nike": 1}
+
+    def test_filtered_counts_are_one_query(self, db_session, count_statements):
+        """Prueba que los conteos filtrados se calculan en una sola consulta agrupada"""
+        _seed(db_session)
+        with count_statements(db_session) as statements:
+            facet_service.facet_counts(db_session, brand="Nike", min_price=10, max_price=200)
+        assert len(statements) == 1
+        assert "GROUP BY" in statements[0]
+
+    def test_catalog_facets_served_from_table(self, db_session, count_statements):
+        """Prueba que el catálogo sin filtros se lee de product_facets tras el primer cálculo"""
+        _seed(db_session)
+        first = facet_service.facet_counts(db_session)
+        with count_statements(db_session) as statements:
+            second = facet_service.facet_counts(db_session)
+
+        assert second == first
+        assert len(statements) == 1
+        assert "FROM product_facets" in statements[0]
+
+    def test_stale_table_is_rebuilt(self, db_session):
+        """Prueba que una tabla de facetas vencida se recalcula"""
+        _seed(db_session)
+        facet_service.facet_counts(db_session)
+        db_session.query(ProductFacet).update({"refreshed_at": datetime.utcnow() - timedelta(days=1)})
+        db_session.add(Product(name="Gorra", price=20, category="Accesorios"))
+        db_session.commit()
+
+        assert facet_service.facet_counts(db_session)["total"] == 6
+
+
+class TestFacetRoutes:
+    """Tests para el endpoint de facetas"""
+
+    def test_facets_route(self, client, db_session):
+        """Prueba GET /products/facets con filtros"""
+        _seed(db_session)
+        response = client.get("/api/v1/products/facets", params={"sport": "Running"})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total"] == 3
+        assert _values(body, "sport") == {"Running": 3, "Fútbol": 1, "Tennis": 1}
+
+    def test_product_writes_invalidate_table(self, client, db_session):
+        """Prueba que crear, actualizar y eliminar productos invalida las facetas en caché"""
+        _seed(db_session)
+        assert client.get("/api/v1/products/facets").json()["total"] == 5
+
+        created = client.post("/api/v1/products", json={"name": "Gorra", "price": 20, "category": "Accesorios"})
+        assert created.status_code == 200
+        assert _values(client.get("/api/v1/products/facets").json(), "category")["Accesorios"] == 1
+
+        client.put(f"/api/v1/products/{created.json()['id']}", json={"category": "Ropa"})
+        assert _values(client.get("/api/v1/products/facets").json(), "category")["Ropa"] == 2
+
+        client.delete(f"/api/v1/products/{created.json()['id']}")
+        assert client.get("/api/v1/products/facets").json()["total"] == 5
+
+    def test_invalidation_shares_the_write_transaction(self, db_session):
+        """Prueba que la tabla se vacía en la transacción del CRUD: si la escritura falla, se conserva"""
+        _seed(db_session)
+        facet_service.facet_counts(db_session)
+        product_crud.update_product(db_session, 1, ProductUpdate(description="sin faceta"))
+        assert db_session.query(ProductFacet).count() > 0
+
+        def fail(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("DELETE FROM products"):
+                raise RuntimeError("boom")
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", fail)
+        try:
+            with pytest.raises(RuntimeError):
+                product_crud.delete_product(db_session, 1)
+        finally:
+            event.remove(engine, "before_cursor_execute", fail)
+        assert db_session.query(ProductFacet).count() > 0
+
+        product_crud.update_product(db_session, 1, ProductUpdate(brand="Puma"))
+        assert db_session.query(ProductFacet).count() == 0
@@ -0,0 +1,74 @@
+"""
+Pruebas para el camino rápido de serialización de listados (app/services/fast_json.py)
+"""
+import json
+from datetime import datetime
+from app.models import Order, Payment, Product, Shipment
+from app.schemas.order_schema import OrderResponse
+from app.schemas.payment_schema import PaymentResponse
+from app.schemas.product_schema import ProductResponse
+from app.schemas.shipment_schema import ShipmentResponse
+from app.services import fast_json
+
+
+def _seed(db):
+    db.add(Product(name="Balón", price=45, brand="Adidas", stock_quantity=3))
+    order = Order(user_id="u1", total=45.5, status="shipped", shipping_address="Calle 1",
+                  created_at=datetime(2024, 5, 1, 10, 30, 15, 123400))
+    db.add(order)
+    db.flush()
+    db.add(Payment(order_id=order.id, amount=45.5, payment_method="card", payment_status="completed"))
+    db.add(Shipment(order_id=order.id, tracking_number="TRK1", status="shipped",
+                    shipped_at=datetime(2024, 5, 2), created_at=datetime(2024, 5, 2)))
+    db.commit()
+
+
+def _pydantic(schema, objects):
+    return [schema.model_validate(obj).model_dump(mode="json") for obj in objects]
+
+
+class TestFastJsonRoutes:
+    """Tests para los listados servidos desde filas"""
+
+    def test_same_output_as_response_model(self, client, db_session):
+        """Prueba que cada listado responde exactamente lo mismo que con Pydantic"""
+        _seed(db_session)
+        for url, schema, model in (
+            ("/api/v1/products", ProductResponse, Product),
+            ("/api/v1/orders", OrderResponse, Order),
+            ("/api/v1/payments", PaymentResponse, Payment),
+            ("/api/v1/shipments", ShipmentResponse, Shipment),
+        ):
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response.json() == _pydantic(schema, db_session.query(model).all()), url
+
+    def test_cursor_pages(self, client, db_session):
+        """Prueba el sobre {items, next_cursor} del camino rápido"""
+        _seed(db_session)
+        db_session.add(Payment(order_id=1, amount=10, payment_method="cash"))
+        db_session.commit()
+
+        first = client.get("/api/v1/payments", params={"cursor": "", "limit": 1}).json()
+        assert first["items"][0]["payment_method"] == "card"
+        second = client.get("/api/v1/payments", params={"cursor": first["next_cursor"], "limit": 1}).json()
+        assert second["items"][0]["payment_method"] == "cash"
+        assert second["next_cursor"] is None
+
+    def test_include_keeps_nested_serialization(self, client, db_session):
+        """Prueba que ?include= sigue usando los esquemas anidados"""
+        _seed(db_session)
+        body = client.get("/api/v1/orders", params={"include": "payments"}).json()
+        assert body[0]["payments"][0]["amount"] == 45.5
+
+
+class TestDumps:
+    """Tests para fast_json.dumps"""
+
+    def test_stdlib_fallback_matches_orjson(self, monkeypatch):
+        """Prueba que sin orjson la salida es el mismo JSON"""
+        content = [{"name": "Balón", "created_at": datetime(2024, 5, 1, 10, 30), "price": 45.0, "sku": None}]
+        with_orjson = fast_json.dumps(content)
+        monkeypatch.setattr(fast_json, "orjson", None)
+        assert json.loads(fast_json.dumps(content)) == json.loads(with_orjson)
+        assert b'"2024-05-01T10:30:00"' in fast_json.dumps(content)
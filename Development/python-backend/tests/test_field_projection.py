@@ -0,0 +1,78 @@
+"""
+Pruebas para la proyección de columnas (?fields=) en los listados
+"""
+from datetime import datetime
+from app.models import Order, Product, Shipment
+
+
+def _seed_products(db):
+    db.add_all([
+        Product(name="Zapatillas Nike Air", description="x" * 500, price=120, brand="Nike", stock_quantity=5),
+        Product(name="Camiseta Nike Dry", description="y" * 500, price=40, brand="Nike", stock_quantity=2),
+    ])
+    db.commit()
+
+
+class TestProductFields:
+    """Tests para ?fields= en /products y /products/search"""
+
+    def test_projection_reaches_select(self, client, db_session, count_statements):
+        """Prueba que solo se consultan y devuelven los campos pedidos"""
+        _seed_products(db_session)
+        with count_statements(db_session) as statements:
+            response = client.get("/api/v1/products", params={"fields": "name, price,id"})
+        assert response.status_code == 200
+        assert response.json()[0] == {"id": 1, "name": "Zapatillas Nike Air", "price": 120.0}
+        select = statements.starting_with("SELECT")[0]
+        assert "description" not in select
+
+    def test_full_and_projected_cached_separately(self, client, db_session):
+        """Prueba que la caché distingue la respuesta completa de la proyectada"""
+        _seed_products(db_session)
+        assert "description" in client.get("/api/v1/products").json()[0]
+        assert set(client.get("/api/v1/products?fields=id,name").json()[0]) == {"id", "name"}
+
+    def test_search_cursor_pages_without_key_in_fields(self, client, db_session):
+        """Prueba que el cursor funciona aunque la clave de paginación no esté en fields"""
+        _seed_products(db_session)
+        params = {"q": "nike", "fields": "name", "cursor": "", "limit": 1}
+        first = client.get("/api/v1/products/search", params=params).json()
+        assert first["items"] == [{"name": "Zapatillas Nike Air"}]
+
+        second = client.get("/api/v1/products/search", params={**params, "cursor": first["next_cursor"]}).json()
+        assert second["items"] == [{"name": "Camiseta Nike Dry"}]
+        assert second["next_cursor"] is None
+
+    def test_unknown_field(self, client, db_session):
+        """Prueba que un campo que no está en el esquema responde 400"""
+        response = client.get("/api/v1/products?fields=id,password")
+        assert response.status_code == 400
+        assert "password" in response.json()["detail"]
+
+
+class TestOrderAndShipmentFields:
+    """Tests para ?fields= en /orders y /shipments"""
+
+    def test_orders_fields(self, client, db_session):
+        """Prueba la proyección de órdenes y su incompatibilidad con include"""
+        db_session.add(Order(user_id="u1", total=10.0, status="pending"))
+        db_session.commit()
+
+        assert client.get("/api/v1/orders?fields=id,status").json() == [{"id": 1, "status": "pending"}]
+        assert client.get("/api/v1/orders?fields=id&include=items").status_code == 400
+
+    def test_shipments_cursor_with_fields(self, client, db_session):
+        """Prueba el cursor de envíos (created_at, id) con fields=tracking_number"""
+        for number in range(2):
+            order = Order(user_id="u1", total=10.0)
+            db_session.add(order)
+            db_session.flush()
+            db_session.add(Shipment(order_id=order.id, tracking_number=f"TRK{number}",
+                                    created_at=datetime(2024, 1, number + 1)))
+        db_session.commit()
+
+        params = {"fields": "tracking_number", "cursor": "", "limit": 1}
+        first = client.get("/api/v1/shipments", params=params).json()
+        assert first["items"] == [{"tracking_number": "TRK1"}]
+        second = client.get("/api/v1/shipments", params={**params, "cursor": first["next_cursor"]}).json()
+        assert second["items"] == [{"tracking_number": "TRK0"}]
@@ -0,0 +1,94 @@
+"""
+Pruebas para las lecturas condicionales (ETag / If-None-Match y Cache-Control)
+"""
+from app.models import Order, Product, Shipment
+from app.services.http_cache import etag_matches
+
+
+class TestEtagMatches:
+    """Tests para etag_matches"""
+
+    def test_weak_comparison_and_lists(self):
+        """Prueba la comparación débil, las listas de etiquetas y el comodín"""
+        assert etag_matches('"a"', '"a"')
+        assert etag_matches('W/"a"', '"a"')
+        assert etag_matches('"b", W/"a"', '"a"')
+        assert etag_matches("*", '"a"')
+        assert not etag_matches('"b"', '"a"')
+        assert not etag_matches(None, '"a"')
+
+
+class TestCatalogConditionalGet:
+    """Tests para ETag en /products"""
+
+    def test_product_detail_not_modified(self, client, db_session, count_statements):
+        """Prueba que el detalle responde 304 sin consultar la base y 200 tras un cambio"""
+        product = Product(name="Balón", price=45, stock_quantity=3)
+        db_session.add(product)
+        db_session.commit()
+        url = f"/api/v1/products/{product.id}"
+
+        first = client.get(url)
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "public, no-cache"
+
+        with count_statements(db_session) as statements:
+            second = client.get(url, headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+        assert second.content == b""
+        assert statements == []
+
+        client.put(url, json={"price": 50})
+        third = client.get(url, headers={"If-None-Match": etag})
+        assert third.status_code == 200
+        assert third.headers["etag"] != etag
+        assert third.json()["price"] == 50
+
+    def test_list_etag_depends_on_content(self, client, db_session):
+        """Prueba que el ETag del listado cambia con el contenido y no con la petición"""
+        db_session.add(Product(name="Balón", price=45))
+        db_session.commit()
+
+        etag = client.get("/api/v1/products/search?q=Balón").headers["etag"]
+        assert client.get("/api/v1/products/search?q=balón",
+                          headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+        client.post("/api/v1/products", json={"name": "Balón de fútbol", "price": 60})
+        changed = client.get("/api/v1/products/search?q=balón", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert len(changed.json()) == 2
+
+    def test_not_found_has_no_etag(self, client, db_session):
+        """Prueba que un 404 no lleva ETag"""
+        response = client.get("/api/v1/products/999")
+        assert response.status_code == 404
+        assert "etag" not in response.headers
+
+
+class TestTrackingConditionalGet:
+    """Tests para ETag en /shipments/tracking/{n}"""
+
+    def test_tracking_not_modified_until_status_change(self, client, db_session, count_statements):
+        """Prueba que el seguimiento responde 304 con una sola consulta hasta que el envío cambia"""
+        order = Order(user_id="u1", total=10.0, status="processing")
+        db_session.add(order)
+        db_session.flush()
+        shipment = Shipment(order_id=order.id, tracking_number="TRK1", status="shipped")
+        db_session.add(shipment)
+        db_session.commit()
+        url = "/api/v1/shipments/tracking/TRK1"
+
+        first = client.get(url)
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "private, no-cache"
+
+        with count_statements(db_session) as statements:
+            second = client.get(url, headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert len(statements) == 1
+
+        client.put(f"/api/v1/shipments/{shipment.id}/status", json={"status": "in_transit"})
+        third = client.get(url, headers={"If-None-Match": etag})
+        assert third.status_code == 200
+        assert third.json()["status"] == "in_transit"
@@ -0,0 +1,120 @@
+"""
+Pruebas para los logs JSON, la cola de logs y el X-Request-ID (app/logging_config.py)
+"""
+import io
+import json
+import logging
+import queue
+import sys
+import httpx
+import pytest
+from logging.handlers import QueueListener
+from app.logging_config import JsonFormatter, QueueLogHandler, SamplingFilter, request_id
+from app.services import user_service
+from app.services.user_service import UserService, clear_auth_cache
+
+
+def _record(name="app.test", level=logging.INFO, msg="hola %s", args=("mundo",), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestJsonFormatter:
+    """Tests para el formato JSON de una línea"""
+
+    def test_fields_and_extras(self):
+        """Prueba que se escriben nivel, logger, mensaje, request_id y los campos extra"""
+        entry = json.loads(JsonFormatter().format(_record(request_id="abc", order_id=7)))
+        assert entry["level"] == "INFO" and entry["logger"] == "app.test"
+        assert entry["msg"] == "hola mundo"
+        assert entry["request_id"] == "abc" and entry["order_id"] == 7
+        assert entry["ts"].endswith("+00:00")
+
+    def test_exception_is_a_field(self):
+        """Prueba que el traceback va en exc y no en el mensaje"""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("app.test", logging.ERROR, __file__, 1, "falló", None, True)
+            record.exc_info = sys.exc_info()
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry["msg"] == "falló"
+        assert "ValueError: boom" in entry["exc"]
+
+
+class TestQueueHandler:
+    """Tests para el handler con cola"""
+
+    def test_listener_writes_with_request_id_of_caller(self):
+        """Prueba que el request_id se toma en el hilo que registra y el listener escribe JSON"""
+        log_queue, stream = queue.Queue(), io.StringIO()
+        output = logging.StreamHandler(stream)
+        output.setFormatter(JsonFormatter())
+        handler = QueueLogHandler(log_queue)
+        listener = QueueListener(log_queue, output)
+        listener.start()
+
+        token = request_id.set("req-1")
+        try:
+            handler.handle(_record())
+        finally:
+            request_id.reset(token)
+        listener.stop()
+
+        entry = json.loads(stream.getvalue())
+        assert entry["msg"] == "hola mundo" and entry["request_id"] == "req-1"
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Prueba que con la cola llena el registro se descarta y se cuenta"""
+        handler = QueueLogHandler(queue.Queue(maxsize=1))
+        handler.handle(_record())
+        handler.handle(_record())
+        assert handler.queue.qsize() == 1
+        assert handler.dropped == 1
+
+
+class TestSampling:
+    """Tests para el muestreo por logger"""
+
+    def test_sampling_keeps_warnings(self):
+        """Prueba que el muestreo aplica a hijos del logger y nunca a advertencias"""
+        sampler = SamplingFilter({"uvicorn.access": 0.0})
+        assert not sampler.filter(_record(name="uvicorn.access"))
+        assert not sampler.filter(_record(name="uvicorn.access.child", level=logging.DEBUG))
+        assert sampler.filter(_record(name="uvicorn.access", level=logging.WARNING))
+        assert sampler.filter(_record(name="uvicorn.accessible"))
+        assert sampler.filter(_record(name="app.routes"))
+
+
+class TestRequestId:
+    """Tests para la correlación con X-Request-ID"""
+
+    def test_generated_and_echoed(self, client):
+        """Prueba que se genera un id si no llega y se devuelve el recibido si es válido"""
+        generated = client.get("/api/health").headers["x-request-id"]
+        assert len(generated) == 32
+
+        assert client.get("/api/health", headers={"X-Request-ID": "abc-123"}).headers["x-request-id"] == "abc-123"
+        invalid = client.get("/api/health", headers={"X-Request-ID": "a b\tc"}).headers["x-request-id"]
+        assert invalid != "a b\tc"
+
+    @pytest.mark.asyncio
+    async def test_forwarded_to_auth_service(self, monkeypatch):
+        """Prueba que la llamada al servicio de autenticación lleva el X-Request-ID"""
+        seen = []
+
+        async def handler(request: httpx.Request):
+            seen.append(request.headers.get("x-request-id"))
+            return httpx.Response(200, json={"id": "u1"})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(user_service, "get_http_client", lambda: client)
+        clear_auth_cache()
+        token = request_id.set("req-42")
+        try:
+            assert await UserService().validate_user_exists("u1", "token")
+        finally:
+            request_id.reset(token)
+            clear_auth_cache()
+        assert seen == ["req-42"]
@@ -0,0 +1,134 @@
+"""
+Pruebas para GET /metrics (app/services/metrics.py)
+"""
+import re
+import time
+import httpx
+import pytest
+from app.models import Product
+from app.services import metrics
+from app.services.metrics import Counter, Histogram
+from app.services.user_service import UserService, clear_auth_cache
+
+
+def _sample(body, name, **labels):
+    """Valor de la muestra ``name`` con exactamente esos labels (0 si no existe)"""
+    wanted = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{re.escape(name)}\{{{re.escape(wanted)}\}} (\S+)$", body, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+class TestRegistry:
+    """Tests para el formato de exposición"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Prueba buckets acumulados, _sum y _count de un histograma"""
+        histogram = Histogram("demo_seconds", "demo", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, "/x")
+        assert histogram.samples() == [
+            'demo_seconds_bucket{route="/x",le="0.1"} 1',
+            'demo_seconds_bucket{route="/x",le="1.0"} 2',
+            'demo_seconds_bucket{route="/x",le="+Inf"} 3',
+            'demo_seconds_sum{route="/x"} 5.55',
+            'demo_seconds_count{route="/x"} 3',
+        ]
+
+    def test_label_values_are_escaped(self):
+        """Prueba que comillas y saltos de línea en un label no rompen el formato"""
+        counter = Counter("demo_total", "demo", ("route",))
+        counter.inc('a"b\nc')
+        assert counter.samples() == ['demo_total{route="a\\"b\\nc"} 1.0']
+
+
+class TestMetricsEndpoint:
+    """Tests para las métricas por ruta, SQL y pool"""
+
+    def test_requests_labelled_by_route_template(self, client, db_session):
+        """Prueba que /products/1 y /products/2 cuentan bajo la misma plantilla"""
+        db_session.add_all([Product(name=f"P{n}", price=10, stock_quantity=1) for n in range(2)])
+        db_session.commit()
+        before = client.get("/metrics").text
+        route = "/api/v1/products/{product_id}"
+
+        client.get("/api/v1/products/1")
+        client.get("/api/v1/products/2")
+        client.get("/api/v1/products/999")
+        client.get("/no-existe/123")
+        body = client.get("/metrics").text
+
+        def delta(name, **labels):
+            return _sample(body, name, **labels) - _sample(before, name, **labels)
+
+        assert delta("http_requests_total", method="GET", route=route, status="2xx") == 2
+        assert delta("http_requests_total", method="GET", route=route, status="4xx") == 1
+        assert delta("http_requests_total", method="GET", route="unmatched", status="4xx") == 1
+        assert delta("http_request_duration_seconds_count", method="GET", route=route) == 3
+        assert "/api/v1/products/1\"" not in body
+        # Cada lectura consulta la base al menos una vez (los 404 no se cachean)
+        assert delta("http_request_db_queries_sum", method="GET", route=route) >= 3
+        assert delta("db_queries_total", engine="sync") >= 3
+
+    def test_pool_and_cache_gauges(self, client, db_session):
+        """Prueba los gauges del pool y de las cachés del catálogo y de autenticación"""
+        client.get("/api/v1/products")
+        response = client.get("/metrics")
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert 'db_pool_connections{pool="sync",state="in_use"}' in body
+        assert _sample(body, "app_cache", cache="catalog", stat="misses") >= 1
+        assert 'app_cache{cache="auth",stat="hits"}' in body
+        assert "# TYPE db_pool_checkout_wait_seconds histogram" in body
+
+
+class TestTimedPool:
+    """Tests para la espera de checkout del pool"""
+
+    def test_checkout_wait_is_observed(self, tmp_path):
+        """Prueba que la espera por una conexión ocupada queda en el histograma"""
+        from sqlalchemy import create_engine
+
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}", poolclass=metrics.TimedQueuePool,
+            pool_size=1, max_overflow=0, pool_timeout=0.05,
+        )
+        before = _sample(metrics.render(), "db_pool_checkout_wait_seconds_count", pool="sync")
+        held = engine.connect()
+        started = time.perf_counter()
+        with pytest.raises(Exception):
+            engine.connect()
+        assert time.perf_counter() - started >= 0.05
+        held.close()
+        engine.dispose()
+        after = _sample(metrics.render(), "db_pool_checkout_wait_seconds_count", pool="sync")
+        assert after - before == 2
+
+
+class TestUpstreamLatency:
+    """Tests para la latencia de las llamadas al servicio de autenticación"""
+
+    @pytest.mark.asyncio
+    async def test_auth_calls_by_outcome(self, monkeypatch):
+        """Prueba que respuestas y errores de red se registran por resultado"""
+        clear_auth_cache()
+        responses = iter([httpx.Response(200), httpx.ConnectError("down")])
+
+        class FakeClient:
+            async def get(self, url, headers=None):
+                result = next(responses)
+                if isinstance(result, Exception):
+                    raise result
+                return result
+
+        monkeypatch.setattr("app.services.user_service.get_http_client", lambda: FakeClient())
+        before = metrics.render()
+        service = UserService("http://auth")
+        assert await service.validate_user_exists("u1", "t1") is True
+        assert await service.validate_user_exists("u2", "t2") is False
+        after = metrics.render()
+
+        for outcome in ("2xx", "error"):
+            name = "upstream_request_duration_seconds_count"
+            labels = {"service": "auth", "endpoint": "validate_user", "outcome": outcome}
+            assert _sample(after, name, **labels) - _sample(before, name, **labels) == 1
+        clear_auth_cache()
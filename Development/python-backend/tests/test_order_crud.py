@@ -1,6 +1,7 @@
 """
 Pruebas unitarias para el CRUD de órdenes
 """
+import os
 import pytest
 from unittest.mock import patch, AsyncMock
 from sqlalchemy.orm import Session
@@ -9,11 +10,18 @@ from app.crud.order_crud import (
     get_order,
     get_orders,
     get_orders_by_user,
+    get_orders_page,
     update_order,
-    delete_order
+    delete_order,
+    cancel_order_and_release_stock
 )
-from app.schemas.order_schema import OrderCreate, OrderUpdate
+from app.schemas.order_schema import OrderCreate, OrderItemCreate, OrderUpdate
 from app.models.order import Order
+from app.models.product import Product
+from datetime import datetime
+
+# Misma variable que tests/conftest.py usa para elegir la base en memoria
+IN_MEMORY_DATABASE = os.getenv("TEST_DATABASE") == "memory"
 
 
 class TestOrderCRUD:
@@ -142,6 +150,30 @@ class TestOrderCRUD:
         assert len(user1_orders) == 2
         assert all(o.user_id == user_id_1 for o in user1_orders)
 
+    def test_get_orders_page_newest_first(self, db_session: Session):
+        """Prueba la paginación por cursor de órdenes con fechas repetidas"""
+        # Arrange: misma fecha de creación para forzar el desempate por id
+        created_at = datetime(2024, 1, 1, 12, 0, 0)
+        for i in range(5):
+            db_session.add(Order(
+                user_id="550e8400-e29b-41d4-a716-446655440000",
+                total=100.0,
+                status="pending",
+                shipping_address="Test St",
+                created_at=created_at
+            ))
+        db_session.commit()
+
+        # Act
+        first, cursor = get_orders_page(db_session, limit=3)
+        second, last = get_orders_page(db_session, cursor=cursor, limit=3)
+
+        # Assert
+        ids = [o.id for o in first + second]
+        assert ids == sorted(ids, reverse=True)
+        assert len(set(ids)) == 5
+        assert last is None
+
     def test_update_order_status(self, db_session: Session):
         """Prueba actualizar el estado de una orden"""
         # Arrange
@@ -221,3 +253,297 @@ class TestOrderCRUD:
         assert order.total > 0
         assert isinstance(order.total, float)
         assert round(order.total, 2) == 299.97
+
+
+class TestOrderWithItems:
+    """Tests para la creación de órdenes con productos"""
+
+    USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+    def _products(self, db_session: Session):
+        products = [
+            Product(name="Balón", price=25.50, stock_quantity=10),
+            Product(name="Raqueta", price=120.00, stock_quantity=5),
+        ]
+        db_session.add_all(products)
+        db_session.commit()
+        return products
+
+    @pytest.mark.asyncio
+    @patch('app.crud.order_crud.validate_user_for_order')
+    async def test_create_order_with_items(self, mock_validate, db_session: Session):
+        """Prueba que los items se guardan y el total se calcula en el servidor"""
+        # Arrange
+        balon, raqueta = self._products(db_session)
+        order_data = OrderCreate(
+            user_id=self.USER_ID,
+            total=1.0,  # el total del cliente se ignora
+            items=[
+                OrderItemCreate(product_id=balon.id, quantity=2),
+                OrderItemCreate(product_id=raqueta.id, quantity=1),
+                OrderItemCreate(product_id=balon.id, quantity=1),
+            ]
+        )
+
+        # Act
+        order = await create_order(db_session, order_data, "token")
+
+        # Assert
+        assert order.total == 196.50
+        assert {(i.product_id, i.quantity, i.unit_price) for i in order.items} == {
+            (balon.id, 3, 25.50), (raqueta.id, 1, 120.00)
+        }
+
+    @pytest.mark.asyncio
+    @patch('app.crud.order_crud.validate_user_for_order')
+    async def test_items_use_constant_statements(self, mock_validate, db_session: Session, count_statements):
+        """Prueba que los precios se leen con un SELECT, el stock se reserva con un UPDATE y los items con un solo INSERT"""
+        products = [Product(name=f"P{i}", price=10.0 + i, stock_quantity=5) for i in range(20)]
+        db_session.add_all(products)
+        db_session.commit()
+        items = [OrderItemCreate(product_id=p.id, quantity=1) for p in products]
+        with count_statements(db_session) as statements:
+            await create_order(db_session, OrderCreate(user_id=self.USER_ID, items=items), "token")
+
+        assert len(statements.starting_with("INSERT INTO order_items")) == 1
+        assert len([s for s in statements.starting_with("SELECT") if "FROM products" in s]) == 1
+        assert len(statements.starting_with("UPDATE products")) == 1
+
+    @pytest.mark.asyncio
+    @patch('app.crud.order_crud.validate_user_for_order')
+    async def test_unknown_product_rolls_back(self, mock_validate, db_session: Session):
+        """Prueba que un producto inexistente rechaza la orden completa"""
+        from fastapi import HTTPException
+        balon, _ = self._products(db_session)
+
+        with pytest.raises(HTTPException) as exc:
+            await create_order(db_session, OrderCreate(
+                user_id=self.USER_ID,
+                items=[OrderItemCreate(product_id=balon.id), OrderItemCreate(product_id=9999)]
+            ), "token")
+
+        assert exc.value.status_code == 400
+        assert get_orders(db_session) == []
+
+    def test_total_required_without_items(self):
+        """Prueba que sin items el total es obligatorio"""
+        with pytest.raises(ValueError):
+            OrderCreate(user_id=self.USER_ID)
+
+
+class TestStockReservation:
+    """Tests para la reserva de stock al crear y cancelar órdenes"""
+
+    USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+    def _order(self, *items):
+        return OrderCreate(
+            user_id=self.USER_ID,
+            items=[OrderItemCreate(product_id=pid, quantity=qty) for pid, qty in items]
+        )
+
+    @pytest.mark.asyncio
+    @patch('app.crud.order_crud.validate_user_for_order')
+    async def test_order_decrements_stock(self, mock_validate, db_session: Session):
+        """Prueba que la orden descuenta stock y marca agotado al llegar a cero"""
+        balon = Product(name="Balón", price=25.0, stock_quantity=3)
+        raqueta = Product(name="Raqueta", price=80.0, stock_quantity=5)
+        db_session.add_all([balon, raqueta])
+        db_session.commit()
+
+        await create_order(db_session, self._order((balon.id, 3), (raqueta.id, 1)), "token")
+
+        db_session.refresh(balon)
+        db_session.refresh(raqueta)
+        assert (balon.stock_quantity, balon.in_stock) == (0, False)
+        assert (raqueta.stock_quantity, raqueta.in_stock) == (4, True)
+
+    @pytest.mark.asyncio
+    @patch('app.crud.order_crud.validate_user_for_order')
+    async def test_shortfall_returns_409_and_reserves_nothing(self, mock_validate, db_session: Session):
+        """Prueba que sin stock suficiente no se crea la orden ni se descuenta nada"""
+        from fastapi import HTTPException
+        balon = Product(name="Balón", price=25.0, stock_quantity=10)
+        raqueta = Product(name="Raqueta", price=80.0, stock_quantity=1)
+        db_session.add_all([balon, raqueta])
+        db_session.commit()
+
+        with pytest.raises(HTTPException) as exc:
+            await create_order(db_session, self._order((balon.id, 2), (raqueta.id, 2)), "token")
+
+        assert exc.value.status_code == 409
+        assert str(raqueta.id) in exc.value.detail
+        db_session.refresh(balon)
+        assert balon.stock_quantity == 10
+        assert get_orders(db_session) == []
+
+    @pytest.mark.asyncio
+    @patch('app.crud.order_crud.validate_user_for_order')
+    async def test_cancel_releases_stock_once(self, mock_validate, db_session: Session):
+        """Prueba que cancelar devuelve el stock una sola vez"""
+        balon = Product(name="Balón", price=25.0, stock_quantity=2)
+        db_session.add(balon)
+        db_session.commit()
+        order = await create_order(db_session, self._order((balon.id, 2)), "token")
+
+        cancel_order_and_release_stock(db_session, order.id)
+        cancelled = cancel_order_and_release_stock(db_session, order.id)
+
+        db_session.refresh(balon)
+        assert cancelled.status == "cancelled"
+        assert (balon.stock_quantity, balon.in_stock) == (2, True)
+        assert cancel_order_and_release_stock(db_session, 9999) is None
+
+    @pytest.mark.asyncio
+    @patch('app.crud.order_crud.validate_user_for_order')
+    async def test_update_to_cancelled_releases_stock(self, mock_validate, db_session: Session):
+        """Prueba que cancelar con PUT (status="cancelled") también devuelve el stock"""
+        balon = Product(name="Balón", price=25.0, stock_quantity=3)
+        db_session.add(balon)
+        db_session.commit()
+        order = await create_order(db_session, self._order((balon.id, 2)), "token")
+
+        updated = update_order(db_session, order.id, OrderUpdate(status="cancelled", shipping_address="Calle 1"))
+        update_order(db_session, order.id, OrderUpdate(status="cancelled"))
+
+        db_session.refresh(balon)
+        assert (updated.status, updated.shipping_address) == ("cancelled", "Calle 1")
+        assert balon.stock_quantity == 3
+        assert update_order(db_session, 9999, OrderUpdate(status="cancelled")) is None
+
+    @pytest.mark.asyncio
+    @patch('app.crud.order_crud.validate_user_for_order')
+    async def test_delete_releases_stock_unless_cancelled(self, mock_validate, db_session: Session):
+        """Prueba que eliminar una orden activa devuelve su stock y una cancelada no lo devuelve dos veces"""
+        balon = Product(name="Balón", price=25.0, stock_quantity=4)
+        db_session.add(balon)
+        db_session.commit()
+        active = await create_order(db_session, self._order((balon.id, 1)), "token")
+        cancelled = await create_order(db_session, self._order((balon.id, 3)), "token")
+        cancel_order_and_release_stock(db_session, cancelled.id)
+
+        assert delete_order(db_session, active.id)
+        assert delete_order(db_session, cancelled.id)
+
+        db_session.refresh(balon)
+        assert (balon.stock_quantity, balon.in_stock) == (4, True)
+
+    @pytest.mark.asyncio
+    @patch('app.crud.order_crud.validate_user_for_order')
+    async def test_cancelled_order_cannot_be_reopened(self, mock_validate, db_session: Session):
+        """Prueba cancelar, intentar reabrir y cancelar de nuevo: el stock se devuelve una sola vez"""
+        from fastapi import HTTPException
+        from app.crud.order_crud import update_order_status
+        balon = Product(name="Balón", price=25.0, stock_quantity=5)
+        db_session.add(balon)
+        db_session.commit()
+        order = await create_order(db_session, self._order((balon.id, 2)), "token")
+
+        update_order(db_session, order.id, OrderUpdate(status="cancelled"))
+        for reopen in (
+            lambda: update_order(db_session, order.id, OrderUpdate(status="pending")),
+            lambda: update_order_status(db_session, order.id, "paid"),
+        ):
+            with pytest.raises(HTTPException) as exc:
+                reopen()
+            assert exc.value.status_code == 409
+        update_order(db_session, order.id, OrderUpdate(status="cancelled"))
+
+        db_session.refresh(balon)
+        assert balon.stock_quantity == 5
+        assert get_order(db_session, order.id).status == "cancelled"
+        # Sin cambio de estado, una orden cancelada sí puede editarse
+        assert update_order(db_session, order.id, OrderUpdate(shipping_address="Calle 2")).shipping_address == "Calle 2"
+
+    @pytest.mark.asyncio
+    @patch('app.crud.order_crud.validate_user_for_order')
+    async def test_put_cancel_is_one_transaction(self, mock_validate, db_session: Session):
+        """Prueba que PUT con status="cancelled" y otros campos confirma una sola vez y devuelve la orden"""
+        from sqlalchemy import event
+        balon = Product(name="Balón", price=25.0, stock_quantity=5)
+        db_session.add(balon)
+        db_session.commit()
+        order = await create_order(db_session, self._order((balon.id, 2)), "token")
+        commits = []
+
+        def record(session):
+            commits.append(session)
+
+        event.listen(db_session, "after_commit", record)
+        try:
+            updated = update_order(db_session, order.id, OrderUpdate(status="cancelled", shipping_address="Calle 9"))
+        finally:
+            event.remove(db_session, "after_commit", record)
+
+        assert len(commits) == 1
+        assert (updated.id, updated.status, updated.shipping_address) == (order.id, "cancelled", "Calle 9")
+
+    def test_update_without_values_writes_nothing(self, db_session: Session, count_statements):
+        """Prueba que un PUT vacío de orden o pago solo lee la fila y no deja marcas de analítica pendientes"""
+        from app.crud.payment_crud import update_payment
+        from app.models.payment import Payment
+        from app.schemas.payment_schema import PaymentUpdate
+        order = Order(user_id=self.USER_ID, total=10.0)
+        db_session.add(order)
+        db_session.flush()
+        payment = Payment(order_id=order.id, amount=10.0, payment_method="pse")
+        db_session.add(payment)
+        db_session.commit()
+        with count_statements(db_session) as statements:
+            assert update_order(db_session, order.id, OrderUpdate()).id == order.id
+            assert update_payment(db_session, payment.id, PaymentUpdate()).id == payment.id
+        assert statements == statements.starting_with("SELECT")
+
+    def test_release_keeps_manual_out_of_stock_flag(self, db_session: Session):
+        """Prueba que devolver stock solo reactiva in_stock si se había agotado"""
+        from app.crud.stock_crud import release_stock
+        agotado = Product(name="Agotado", price=10.0, stock_quantity=0, in_stock=False)
+        retirado = Product(name="Retirado", price=10.0, stock_quantity=5, in_stock=False)
+        db_session.add_all([agotado, retirado])
+        db_session.commit()
+
+        assert release_stock(db_session, {agotado.id: 2, retirado.id: 1}) == [agotado.id]
+        db_session.commit()
+
+        db_session.refresh(agotado)
+        db_session.refresh(retirado)
+        assert (agotado.stock_quantity, agotado.in_stock) == (2, True)
+        assert (retirado.stock_quantity, retirado.in_stock) == (6, False)
+
+    @pytest.mark.committed_db
+    @pytest.mark.skipif(IN_MEMORY_DATABASE, reason="con cache=shared SQLite no espera los bloqueos de tabla")
+    def test_parallel_buyers_never_oversell(self, db_session: Session):
+        """Prueba de concurrencia: 200 compradores sobre dos productos con poco stock"""
+        from concurrent.futures import ThreadPoolExecutor
+        from fastapi import HTTPException
+        from sqlalchemy.orm import sessionmaker
+        from app.crud.order_crud import _insert_order
+
+        hot = [Product(name="Hot A", price=10.0, stock_quantity=40),
+               Product(name="Hot B", price=20.0, stock_quantity=25)]
+        db_session.add_all(hot)
+        db_session.commit()
+        ids = [p.id for p in hot]
+        # Con committed_db la sesión está ligada al engine: cada hilo abre la suya
+        new_session = sessionmaker(bind=db_session.get_bind(), autoflush=False)
+
+        def buy(i):
+            session = new_session()
+            try:
+                _insert_order(session, self._order((ids[i % 2], 1 + i % 3)))
+                return True
+            except HTTPException as exc:
+                assert exc.status_code == 409
+                return False
+            finally:
+                session.close()
+
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            results = list(pool.map(buy, range(200)))
+
+        db_session.expire_all()
+        sold = {pid: sum(i.quantity for o in get_orders(db_session, limit=500) for i in o.items
+                         if i.product_id == pid) for pid in ids}
+        assert any(results) and not all(results)
+        assert [p.stock_quantity for p in hot] == [40 - sold[ids[0]], 25 - sold[ids[1]]]
+        assert all(p.stock_quantity >= 0 for p in hot)
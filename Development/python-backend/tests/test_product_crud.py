@@ -8,7 +8,10 @@ from app.crud.product_crud import (
     get_product,
     get_products,
     update_product,
-    delete_product
+    delete_product,
+    search_products,
+    get_products_page,
+    search_products_page
 )
 from app.schemas.product_schema import ProductCreate, ProductUpdate
 from app.models.product import Product
@@ -176,6 +179,18 @@ class TestProductCRUD:
         # Assert
         assert result is False
 
+    def test_update_and_delete_are_single_statements(self, db_session: Session, count_statements):
+        """Prueba que actualizar usa una sola sentencia y eliminar una más para sus items (más el vaciado de facetas)"""
+        product_id = create_product(db_session, ProductCreate(name="Original", price=10.0)).id
+        with count_statements(db_session) as statements:
+            updated = update_product(db_session, product_id, ProductUpdate(price=12.5))
+            deleted = delete_product(db_session, product_id)
+
+        assert (updated.name, updated.price) == ("Original", 12.5)
+        assert deleted is True
+        assert [statement.split()[0] for statement in statements] == ["DELETE", "UPDATE", "DELETE", "DELETE", "DELETE"]
+        assert len(statements.starting_with("DELETE FROM product_facets")) == 2  # price es una faceta
+
     def test_product_price_validation(self, db_session: Session):
         """Prueba que el precio sea válido"""
         # Arrange
@@ -213,3 +228,178 @@ class TestProductCRUD:
         # Assert
         assert len(electronics) == 2
         assert all(p.category == "Electronics" for p in electronics)
+
+
+class TestProductSearch:
+    """Tests para la búsqueda full-text de productos"""
+
+    def _create_catalog(self, db_session: Session):
+        catalog = [
+            ("Zapatillas Nike Air Max", "Nike", "Zapatillas de running con cámara de aire"),
+            ("Balón de Fútbol Adidas", "Adidas", "Balón oficial tamaño 5"),
+            ("Camiseta Nike Dri-FIT", "Nike", "Camiseta técnica transpirable"),
+            ("Raqueta Wilson Pro", "Wilson", "Raqueta de tenis con fibra de carbono"),
+        ]
+        for name, brand, description in catalog:
+            create_product(db_session, ProductCreate(
+                name=name, brand=brand, description=description, price=50.0, category="Test"
+            ))
+
+    def test_search_matches_name_brand_and_description(self, db_session: Session):
+        """Prueba que la búsqueda cubre nombre, marca y descripción"""
+        self._create_catalog(db_session)
+
+        assert {p.name for p in search_products(db_session, search_query="nike")} == {
+            "Zapatillas Nike Air Max", "Camiseta Nike Dri-FIT"
+        }
+        assert [p.name for p in search_products(db_session, search_query="carbono")] == [
+            "Raqueta Wilson Pro"
+        ]
+
+    def test_search_prefix_and_accents(self, db_session: Session):
+        """Prueba búsqueda por prefijo (tecleo incremental) e insensible a acentos"""
+        self._create_catalog(db_session)
+
+        assert [p.name for p in search_products(db_session, search_query="zapat")] == [
+            "Zapatillas Nike Air Max"
+        ]
+        assert [p.name for p in search_products(db_session, search_query="futbol")] == [
+            "Balón de Fútbol Adidas"
+        ]
+
+    def test_postgresql_search_ignores_accents(self, db_session: Session):
+        """Prueba que en PostgreSQL el índice y la consulta usan la misma configuración con unaccent"""
+        from unittest.mock import MagicMock
+        from sqlalchemy.dialects import postgresql
+        from app.models.product import SEARCH_TS_CONFIG, _POSTGRES_SEARCH_DDL
+        from app.services.search_service import apply_text_search
+
+        pg_session = MagicMock()
+        pg_session.get_bind.return_value.dialect.name = "postgresql"
+        query = apply_text_search(pg_session, db_session.query(Product), "futbol bal", rank=False)
+        sql = str(query.statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+        assert sql.count(f"to_tsvector('{SEARCH_TS_CONFIG}'::regconfig") == 3
+        assert f"to_tsquery('{SEARCH_TS_CONFIG}'::regconfig, 'futbol & bal:*')" in sql
+        assert "'simple'::regconfig" not in sql
+        assert any("WITH unaccent, simple" in ddl for ddl in _POSTGRES_SEARCH_DDL)
+        assert f"to_tsvector('{SEARCH_TS_CONFIG}'::regconfig" in _POSTGRES_SEARCH_DDL[-1]
+
+    def test_search_requires_all_terms(self, db_session: Session):
+        """Prueba que todos los términos deben coincidir"""
+        self._create_catalog(db_session)
+
+        results = search_products(db_session, search_query="nike camiseta")
+
+        assert [p.name for p in results] == ["Camiseta Nike Dri-FIT"]
+
+    def test_search_ranks_by_relevance(self, db_session: Session):
+        """Prueba que los resultados se ordenan por relevancia"""
+        create_product(db_session, ProductCreate(
+            name="Mochila", brand="Puma", description="Mochila con bolsillo para running", price=30.0
+        ))
+        create_product(db_session, ProductCreate(
+            name="Running Shoes", brand="Running Co", description="Running running running", price=80.0
+        ))
+
+        results = search_products(db_session, search_query="running")
+
+        assert [p.name for p in results] == ["Running Shoes", "Mochila"]
+
+    def test_search_index_follows_updates_and_deletes(self, db_session: Session):
+        """Prueba que el índice se sincroniza al actualizar y eliminar"""
+        product = create_product(db_session, ProductCreate(name="Guantes de portero", price=20.0))
+
+        update_product(db_session, product.id, ProductUpdate(name="Guantes de boxeo"))
+        assert search_products(db_session, search_query="portero") == []
+        assert [p.id for p in search_products(db_session, search_query="boxeo")] == [product.id]
+
+        delete_product(db_session, product.id)
+        assert search_products(db_session, search_query="boxeo") == []
+
+    def test_search_combined_with_filters(self, db_session: Session):
+        """Prueba la búsqueda de texto junto con filtros"""
+        self._create_catalog(db_session)
+
+        results = search_products(db_session, search_query="nike", max_price=10.0)
+
+        assert results == []
+
+    def test_search_candidate_window_reaches_requested_page(self, db_session: Session, monkeypatch):
+        """Prueba que la ventana de candidatos no recorta la página solicitada"""
+        from app.config import settings
+        monkeypatch.setattr(settings, "SEARCH_CANDIDATE_LIMIT", 2)
+        for i in range(5):
+            create_product(db_session, ProductCreate(name=f"Balón {i}", price=10.0 + i))
+
+        page = search_products(db_session, search_query="balon", skip=3, limit=2)
+
+        assert len(page) == 2
+
+    def test_search_candidate_window_keeps_best_match(self, db_session: Session, monkeypatch):
+        """Prueba que el recorte de candidatos conserva la mejor coincidencia aunque tenga el id más alto"""
+        from app.config import settings
+        monkeypatch.setattr(settings, "SEARCH_CANDIDATE_LIMIT", 2)
+        for i in range(4):
+            create_product(db_session, ProductCreate(
+                name=f"Mochila {i}", description="Mochila con bolsillo para balon", price=20.0
+            ))
+        best = create_product(db_session, ProductCreate(name="Balón profesional", brand="Balon", price=50.0))
+
+        results = search_products(db_session, search_query="balon", limit=1)
+
+        assert [p.id for p in results] == [best.id]
+
+
+class TestProductKeysetPagination:
+    """Tests para la paginación por cursor de productos"""
+
+    def test_pages_cover_catalog_without_gaps(self, db_session: Session):
+        """Prueba que recorrer los cursores devuelve todos los productos una sola vez"""
+        for i in range(7):
+            create_product(db_session, ProductCreate(name=f"Producto {i}", price=10.0 + i))
+
+        seen, cursor = [], ""
+        while cursor is not None:
+            page, cursor = get_products_page(db_session, cursor=cursor, limit=3)
+            seen.extend(p.id for p in page)
+
+        assert seen == sorted(seen)
+        assert len(seen) == len(set(seen)) == 7
+
+    def test_page_is_stable_under_inserts(self, db_session: Session):
+        """Prueba que insertar filas no desplaza la página siguiente"""
+        for i in range(4):
+            create_product(db_session, ProductCreate(name=f"Producto {i}", price=10.0))
+
+        first, cursor = get_products_page(db_session, limit=2)
+        create_product(db_session, ProductCreate(name="Nuevo", price=10.0))
+        second, _ = get_products_page(db_session, cursor=cursor, limit=2)
+
+        assert [p.id for p in second] == [first[-1].id + 1, first[-1].id + 2]
+
+    def test_search_page_with_text(self, db_session: Session):
+        """Prueba la búsqueda paginada por cursor"""
+        for i in range(5):
+            create_product(db_session, ProductCreate(name=f"Balón {i}", price=10.0))
+        create_product(db_session, ProductCreate(name="Raqueta", price=10.0))
+
+        page, cursor = search_products_page(db_session, search_query="balon", limit=3)
+        rest, last = search_products_page(db_session, search_query="balon", cursor=cursor, limit=3)
+
+        assert len(page) == 3 and len(rest) == 2
+        assert last is None
+
+    def test_invalid_cursor(self, db_session: Session):
+        """Prueba que un cursor corrupto se rechaza"""
+        with pytest.raises(ValueError):
+            get_products_page(db_session, cursor="no-es-un-cursor")
+
+    def test_cursor_value_must_match_key_type(self, db_session: Session):
+        """Prueba que un cursor con un texto donde va un id entero se rechaza antes de consultar"""
+        from app.crud.pagination import encode_cursor
+        for forged in (["abc"], [True], [1.5]):
+            with pytest.raises(ValueError):
+                get_products_page(db_session, cursor=encode_cursor(forged))
+        with pytest.raises(ValueError):
+            get_products_page(db_session, cursor="", limit=0)
@@ -0,0 +1,141 @@
+"""
+Pruebas para la importación masiva de productos (POST /api/v1/products/bulk)
+"""
+import json
+import pytest
+from app.models.product import Product
+from app.services import product_import
+
+
+def _ndjson(rows):
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+
+def _chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def _product(db, sku):
+    db.expire_all()
+    return db.query(Product).filter(Product.sku == sku).one()
+
+
+class TestProductImport:
+    """Tests para app.services.product_import"""
+
+    def test_ndjson_inserts_then_updates_by_sku(self, db_session):
+        """Prueba que una segunda carga con el mismo SKU actualiza en lugar de duplicar"""
+        feed = [{"sku": "SKU-1", "name": "Balón", "price": 10}, {"sku": "SKU-2", "name": "Red", "price": 20}]
+        report = product_import.import_products(db_session, [_ndjson(feed)], "ndjson")
+        assert report == {"received": 2, "upserted": 2, "failed": 0, "errors": [], "errors_truncated": False}
+
+        product_import.import_products(
+            db_session, [_ndjson([{"sku": "SKU-1", "name": "Balón Pro", "price": 15, "stock_quantity": 7}])], "ndjson"
+        )
+        assert db_session.query(Product).count() == 2
+        product = _product(db_session, "SKU-1")
+        assert (product.name, product.price, product.stock_quantity) == ("Balón Pro", 15, 7)
+
+    def test_lines_split_across_chunks(self, db_session):
+        """Prueba que registros y caracteres UTF-8 partidos entre chunks se reconstruyen"""
+        feed = [{"sku": f"SKU-{i}", "name": f"Camiseta España {i}", "price": i + 1} for i in range(20)]
+        report = product_import.import_products(db_session, _chunked(_ndjson(feed), 7), "ndjson", batch_size=6)
+        assert report["upserted"] == 20
+        assert _product(db_session, "SKU-13").name == "Camiseta España 13"
+
+    def test_csv_with_quoted_newlines_and_empty_cells(self, db_session):
+        """Prueba CSV con descripción multilínea y celdas vacías (valor por defecto)"""
+        data = (
+            "sku,name,price,description,stock_quantity\r\n"
+            'C-1,Raqueta,120.5,"Carbono\nligera",3\r\n'
+            "C-2,Grip,5,,\r\n"
+        ).encode()
+        report = product_import.import_products(db_session, _chunked(data, 5), "csv")
+        assert report["upserted"] == 2
+        assert _product(db_session, "C-1").description == "Carbono\nligera"
+        grip = _product(db_session, "C-2")
+        assert (grip.description, grip.stock_quantity) == (None, 0)
+
+    def test_per_row_errors(self, db_session):
+        """Prueba que las filas inválidas se reportan con su número y no detienen la carga"""
+        data = (
+            _ndjson([{"sku": "OK-1", "name": "A", "price": 1}])
+            + b"{not json\n"
+            + _ndjson([{"name": "Sin SKU", "price": 1}, {"sku": "BAD", "name": "B", "price": "gratis"},
+                       {"sku": "OK-2", "name": "C", "price": 2}])
+        )
+        report = product_import.import_products(db_session, [data], "ndjson")
+
+        assert (report["received"], report["upserted"], report["failed"]) == (5, 2, 3)
+        assert [(error["row"], error["sku"]) for error in report["errors"]] == [(2, None), (3, None), (4, "BAD")]
+        assert report["errors"][1]["errors"] == ["sku: Field required"]
+
+    def test_repeated_sku_last_row_wins(self, db_session):
+        """Prueba que un SKU repetido en el feed queda con los valores de la última fila"""
+        feed = [{"sku": "D-1", "name": "v1", "price": 1}, {"sku": "D-1", "name": "v2", "price": 2}]
+        report = product_import.import_products(db_session, [_ndjson(feed)], "ndjson")
+        assert (report["upserted"], report["failed"]) == (2, 0)
+        assert _product(db_session, "D-1").name == "v2"
+
+    def test_one_statement_per_batch(self, db_session, count_statements):
+        """Prueba que se emite un INSERT ... ON CONFLICT por lote"""
+        feed = [{"sku": f"B-{i}", "name": "x", "price": 1} for i in range(25)]
+        with count_statements(db_session) as statements:
+            product_import.import_products(db_session, [_ndjson(feed)], "ndjson", batch_size=10)
+        inserts = statements.starting_with("INSERT INTO products ")
+        assert len(inserts) == 3
+        assert all("ON CONFLICT (sku) DO UPDATE" in statement for statement in inserts)
+
+    def test_error_report_is_capped(self, db_session):
+        """Prueba que el reporte de errores no crece más allá de max_errors"""
+        data = b"{bad\n" * 10
+        report = product_import.import_products(db_session, [data], "ndjson", max_errors=3)
+        assert report["failed"] == 10
+        assert len(report["errors"]) == 3
+        assert report["errors_truncated"] is True
+
+
+class TestProductImportRoute:
+    """Tests para el endpoint de importación"""
+
+    def test_bulk_ndjson(self, client, db_session):
+        """Prueba la carga NDJSON por el endpoint"""
+        response = client.post(
+            "/api/v1/products/bulk",
+            content=_ndjson([{"sku": "R-1", "name": "Balón", "price": 10}, {"sku": "R-2", "price": 1}]),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["upserted"], body["failed"]) == (1, 1)
+        assert body["errors"][0]["errors"] == ["name: Field required"]
+
+    def test_bulk_csv_with_format_parameter(self, client, db_session):
+        """Prueba la carga CSV indicando ?format=csv"""
+        response = client.post(
+            "/api/v1/products/bulk?format=csv",
+            content=b"sku,name,price\nR-3,Red,30\n",
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        assert response.status_code == 200
+        assert response.json()["upserted"] == 1
+        assert _product(db_session, "R-3").name == "Red"
+
+    def test_unsupported_content_type(self, client):
+        """Prueba que un formato no soportado responde 415"""
+        response = client.post("/api/v1/products/bulk", json=[{"sku": "X"}])
+        assert response.status_code == 415
+
+    def test_database_without_upsert(self, client, db_session, monkeypatch):
+        """Prueba que sin INSERT ... ON CONFLICT responde 501 antes de importar y el servicio da ValueError"""
+        monkeypatch.setattr(product_import, "_UPSERT_INSERTS", {})
+        response = client.post(
+            "/api/v1/products/bulk",
+            content=_ndjson([{"sku": "R-9", "name": "Balón", "price": 10}]),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 501
+        assert "not supported" in response.json()["detail"]
+        with pytest.raises(ValueError):
+            product_import.import_products(db_session, [b""], "ndjson")
+        assert db_session.query(Product).filter(Product.sku == "R-9").count() == 0
@@ -70,6 +70,44 @@ class TestProductRoutes:
         get_response = client.get(f"/api/v1/products/{product_id}")
         assert get_response.status_code == 404
 
+    def test_delete_product_removes_its_order_items(self, client: TestClient, db_session):
+        """Prueba que al eliminar un producto no quedan items de órdenes apuntándole"""
+        from app.models import Order, OrderItem, Product
+        kept, removed = Product(name="Se queda", price=5.0), Product(name="Se va", price=10.0)
+        db_session.add_all([kept, removed])
+        db_session.flush()
+        db_session.add(Order(user_id="u1", total=15.0, items=[
+            OrderItem(product_id=kept.id, quantity=1, unit_price=5.0),
+            OrderItem(product_id=removed.id, quantity=1, unit_price=10.0),
+        ]))
+        db_session.commit()
+
+        assert client.delete(f"/api/v1/products/{removed.id}").status_code == 200
+        assert [item.product_id for item in db_session.query(OrderItem).all()] == [kept.id]
+
+    def test_get_products_cursor_envelope(self, client: TestClient, sample_product_data):
+        """Prueba la paginación por cursor del listado de productos"""
+        for _ in range(3):
+            client.post("/api/v1/products", json=sample_product_data)
+
+        first = client.get("/api/v1/products?cursor=&limit=2").json()
+        second = client.get(f"/api/v1/products?cursor={first['next_cursor']}&limit=2").json()
+
+        assert len(first["items"]) == 2
+        assert len(second["items"]) == 1
+        assert second["next_cursor"] is None
+
+    def test_get_products_invalid_cursor(self, client: TestClient):
+        """Prueba que un cursor inválido devuelve 400"""
+        response = client.get("/api/v1/products?cursor=xyz")
+        assert response.status_code == 400
+
+    def test_cursor_routes_reject_limit_below_one(self, client: TestClient):
+        """Prueba que limit=0 o negativo se rechaza con 422 en vez de fallar en la paginación"""
+        for path in ("/api/v1/products", "/api/v1/products/search", "/api/v1/orders", "/api/v2/products"):
+            for limit in (0, -1):
+                assert client.get(f"{path}?cursor=&limit={limit}").status_code == 422
+
     def test_create_product_invalid_data(self, client: TestClient):
         """Prueba crear producto con datos inválidos"""
         invalid_data = {
@@ -98,6 +136,80 @@ class TestOrderRoutes:
         assert response.status_code == 200
         assert isinstance(response.json(), list)
 
+    def test_get_orders_cursor_envelope(self, client: TestClient):
+        """Prueba el modo cursor del listado de órdenes"""
+        response = client.get("/api/v1/orders?cursor=")
+        assert response.status_code == 200
+        assert response.json() == {"items": [], "next_cursor": None}
+
+    def test_delete_order_removes_its_items(self, client: TestClient, db_session):
+        """Prueba que DELETE /orders/{id} elimina también los items de la orden"""
+        from app.models import Order, OrderItem, Product
+        product = Product(name="P", price=10.0)
+        db_session.add(product)
+        db_session.flush()
+        orders = [Order(user_id="u1", total=10.0, status="cancelled",
+                        items=[OrderItem(product_id=product.id, quantity=1, unit_price=10.0)])
+                  for _ in range(2)]
+        db_session.add_all(orders)
+        db_session.commit()
+
+        assert client.delete(f"/api/v1/orders/{orders[0].id}").status_code == 200
+        assert [item.order_id for item in db_session.query(OrderItem).all()] == [orders[1].id]
+
+    def _orders_with_relations(self, db_session, count):
+        from app.models import Order, OrderItem, Payment, Product, Shipment
+        products = [Product(name=f"P{i}", price=10.0) for i in range(3)]
+        db_session.add_all(products)
+        db_session.flush()
+        for n in range(count):
+            order = Order(user_id="u1", total=20.0, items=[
+                OrderItem(product_id=products[n % 3].id, quantity=1, unit_price=10.0),
+                OrderItem(product_id=products[(n + 1) % 3].id, quantity=1, unit_price=10.0),
+            ])
+            db_session.add(order)
+            db_session.flush()
+            db_session.add_all([
+                Shipment(order_id=order.id, carrier="DHL"),
+                Payment(order_id=order.id, amount=20.0, payment_method="card"),
+            ])
+        db_session.commit()
+
+    def _count_queries(self, count_statements, db_session, client, url):
+        db_session.expire_all()
+        with count_statements(db_session) as statements:
+            response = client.get(url)
+        assert response.status_code == 200
+        return response.json(), len(statements)
+
+    def test_include_uses_fixed_number_of_queries(self, client: TestClient, db_session, count_statements):
+        """Prueba que ?include= carga 100 órdenes con un número fijo de consultas"""
+        self._orders_with_relations(db_session, 100)
+        url = "/api/v1/orders?limit=100&include=items,product,shipment,payments"
+
+        orders, queries = self._count_queries(count_statements, db_session, client, url)
+        _, queries_small_page = self._count_queries(count_statements, db_session, client, url.replace("limit=100", "limit=5"))
+
+        assert len(orders) == 100
+        assert queries == queries_small_page == 5  # orders + items + products + shipments + payments
+        first = orders[0]
+        assert len(first["items"]) == 2 and first["items"][0]["product"]["name"].startswith("P")
+        assert first["shipment"]["carrier"] == "DHL"
+        assert first["payments"][0]["amount"] == 20.0
+
+    def test_include_is_opt_in(self, client: TestClient, db_session, count_statements):
+        """Prueba que sin include no se devuelven ni cargan relaciones"""
+        self._orders_with_relations(db_session, 3)
+
+        orders, queries = self._count_queries(count_statements, db_session, client, "/api/v1/orders")
+        detail = client.get(f"/api/v1/orders/{orders[0]['id']}?include=items").json()
+
+        assert queries == 1
+        assert "items" not in orders[0] and "shipment" not in orders[0]
+        assert len(detail["items"]) == 2 and "product" not in detail["items"][0]
+        assert "payments" not in detail
+        assert client.get("/api/v1/orders?include=customer").status_code == 400
+
 
 class TestPaymentRoutes:
     """Tests para las rutas de pagos"""
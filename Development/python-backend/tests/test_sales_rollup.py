@@ -0,0 +1,179 @@
+"""
+Pruebas para las tablas de resumen de ventas (app/services/sales_rollup.py)
+"""
+from datetime import date, datetime
+from sqlalchemy import update
+from app.crud import order_crud, payment_crud, product_crud
+from app.models import Order, OrderItem, Product, SalesRollupDirty, Shipment
+from app.schemas.order_schema import OrderCreate, OrderItemCreate, OrderUpdate
+from app.schemas.payment_schema import PaymentCreate
+from app.schemas.product_schema import ProductUpdate
+from app.services import sales_rollup, shipment_lifecycle
+
+TODAY = datetime.utcnow().date()
+
+
+def _products(db):
+    db.add_all([
+        Product(name="Zapatillas Nike Air", price=100, category="Calzado", brand="Nike", stock_quantity=50),
+        Product(name="Balón Adidas", price=30, category="Balones", brand="Adidas", stock_quantity=50),
+    ])
+    db.commit()
+
+
+def _order(db, *items):
+    return order_crud._insert_order(db, OrderCreate(
+        user_id="u1", items=[OrderItemCreate(product_id=product_id, quantity=quantity) for product_id, quantity in items]
+    ))
+
+
+class TestIncrementalRollups:
+    """Tests para el mantenimiento incremental desde los CRUD"""
+
+    def test_orders_payments_and_cancellation(self, db_session):
+        """Prueba que órdenes, pagos y cancelaciones se reflejan en los resúmenes"""
+        _products(db_session)
+        first = _order(db_session, (1, 2), (2, 1))     # 230
+        second = _order(db_session, (2, 3))            # 90
+        payment_crud.create_payment(db_session, PaymentCreate(
+            order_id=first.id, amount=230, method="card", status="completed"))
+        assert db_session.query(SalesRollupDirty).count() == 1  # una marca por día
+        assert sales_rollup.refresh(db_session) == 1
+
+        assert sales_rollup.sales(db_session) == [
+            {"key": str(TODAY), "orders": 2, "units": None, "revenue": 320.0, "paid": 230.0}
+        ]
+        assert {row["key"]: row["units"] for row in sales_rollup.sales(db_session, "brand")} == {"Nike": 2, "Adidas": 4}
+
+        order_crud.cancel_order_and_release_stock(db_session, second.id)
+        sales_rollup.refresh(db_session)
+        assert sales_rollup.sales(db_session)[0]["revenue"] == 230.0
+        assert {row["key"]: row["orders"] for row in sales_rollup.sales(db_session, "status")} == {
+            "pending": 1, "cancelled": 1
+        }
+        assert [(row["name"], row["units"]) for row in sales_rollup.top_products(db_session)] == [
+            ("Zapatillas Nike Air", 2), ("Balón Adidas", 1)
+        ]
+        assert sales_rollup.check(db_session)["consistent"]
+
+    def test_status_changes_from_orders_and_shipments(self, db_session):
+        """Prueba cambios de estado por update_order y por el ciclo de vida del envío"""
+        _products(db_session)
+        order = _order(db_session, (1, 1))
+        order_crud.update_order(db_session, order.id, OrderUpdate(status="confirmed"))
+        sales_rollup.refresh(db_session)
+        assert [row["key"] for row in sales_rollup.sales(db_session, "status")] == ["confirmed"]
+
+        db_session.add(Shipment(order_id=order.id, tracking_number="TRK1"))
+        db_session.commit()
+        shipment_lifecycle.bulk_update_status(db_session, "delivered", shipment_ids=[1], current_status="pending")
+        sales_rollup.refresh(db_session)
+        assert [row["key"] for row in sales_rollup.sales(db_session, "status")] == ["completed"]
+
+        order_crud.delete_order(db_session, order.id)
+        sales_rollup.refresh(db_session)
+        assert sales_rollup.sales(db_session, "status") == []
+        assert sales_rollup.check(db_session)["consistent"]
+
+    def test_reads_only_touch_rollups(self, db_session, count_statements):
+        """Prueba que el dashboard solo lee las tablas de resumen, aun con días marcados"""
+        _products(db_session)
+        _order(db_session, (1, 1))
+        sales_rollup.refresh(db_session)
+        _order(db_session, (2, 1))
+
+        with count_statements(db_session) as statements:
+            sales_rollup.sales(db_session), sales_rollup.top_products(db_session), sales_rollup.check(db_session)
+        assert all(statement.startswith("SELECT") for statement in statements)
+        assert not any("FROM orders" in statement for statement in statements[:2])
+        assert db_session.query(SalesRollupDirty).count() == 1
+        assert sales_rollup.check(db_session)["pending_days"] == [str(TODAY)]
+
+    def test_refresh_recomputes_only_marked_days(self, db_session):
+        """Prueba que un cambio recalcula solo el día de esa orden"""
+        _products(db_session)
+        for day in (1, 2, 3):
+            db_session.add(Order(user_id="u1", total=10.0 * day, created_at=datetime(2024, 3, day, 12), items=[
+                OrderItem(product_id=1, quantity=day, unit_price=10.0)
+            ]))
+        db_session.commit()
+        assert sales_rollup.rebuild(db_session) == 3
+
+        order_crud.update_order(db_session, 2, OrderUpdate(total=99.0))
+        assert sales_rollup.refresh(db_session) == 1
+        rows = sales_rollup.sales(db_session, date_from=date(2024, 3, 1), date_to=date(2024, 3, 3))
+        assert [(row["key"], row["revenue"]) for row in rows] == [
+            ("2024-03-01", 10.0), ("2024-03-02", 99.0), ("2024-03-03", 30.0)
+        ]
+
+
+class TestConsistencyCheck:
+    """Tests para la verificación contra un recálculo completo"""
+
+    def test_detects_and_repairs_drift(self, db_session):
+        """Prueba que un cambio que no pasa por los CRUD se detecta y rebuild lo corrige"""
+        _products(db_session)
+        order = _order(db_session, (1, 1))
+        sales_rollup.refresh(db_session)
+
+        db_session.execute(update(Order).where(Order.id == order.id).values(total=1.0))
+        db_session.commit()
+        result = sales_rollup.check(db_session)
+        assert not result["consistent"]
+        assert result["mismatches"][0]["table"] == "sales_daily"
+        assert result["mismatches"][0]["recomputed"] == [1, 1.0, 0.0]
+
+        sales_rollup.rebuild(db_session)
+        assert sales_rollup.check(db_session)["consistent"]
+
+    def test_product_brand_change_is_reported(self, db_session):
+        """Prueba que cambiar la marca de un producto deja segmentos viejos que check detecta"""
+        _products(db_session)
+        _order(db_session, (1, 1))
+        sales_rollup.refresh(db_session)
+        product_crud.update_product(db_session, 1, ProductUpdate(brand="Puma"))
+
+        keys = {mismatch["key"] for mismatch in sales_rollup.check(db_session)["mismatches"]}
+        assert keys == {"brand:Nike", "brand:Puma"}
+        sales_rollup.rebuild(db_session)
+        assert [row["key"] for row in sales_rollup.sales(db_session, "brand")] == ["Puma"]
+
+
+class TestAnalyticsRoutes:
+    """Tests para /api/v1/analytics"""
+
+    def test_sales_and_top_products(self, client, db_session):
+        """Prueba las respuestas de /analytics/sales y /analytics/top-products"""
+        _products(db_session)
+        _order(db_session, (1, 1), (2, 2))
+        assert client.post("/api/v1/analytics/refresh").json() == {"days": 1}
+
+        body = client.get("/api/v1/analytics/sales", params={"group_by": "category"}).json()
+        assert body["date_to"] == str(TODAY)
+        assert body["rows"] == [
+            {"key": "Calzado", "orders": None, "units": 1, "revenue": 100.0, "paid": None},
+            {"key": "Balones", "orders": None, "units": 2, "revenue": 60.0, "paid": None},
+        ]
+        top = client.get("/api/v1/analytics/top-products", params={"by": "units", "limit": 1}).json()
+        assert [(product["product_id"], product["units"]) for product in top] == [(2, 2)]
+        assert client.get("/api/v1/analytics/consistency").json()["consistent"] is True
+
+    def test_consistency_is_read_only_and_rebuild_repairs(self, client, db_session):
+        """Prueba que GET /analytics/consistency no modifica nada y POST /analytics/rebuild corrige"""
+        _products(db_session)
+        order = _order(db_session, (1, 1))
+        sales_rollup.refresh(db_session)
+        db_session.execute(update(Order).where(Order.id == order.id).values(total=1.0))
+        db_session.commit()
+
+        assert client.get("/api/v1/analytics/consistency", params={"repair": "true"}).json()["consistent"] is False
+        assert client.get("/api/v1/analytics/consistency").json()["consistent"] is False
+
+        assert client.post("/api/v1/analytics/rebuild").json() == {"days": 1}
+        assert client.get("/api/v1/analytics/consistency").json()["consistent"] is True
+
+    def test_invalid_parameters(self, client, db_session):
+        """Prueba group_by desconocido y un rango invertido"""
+        assert client.get("/api/v1/analytics/sales?group_by=user").status_code == 422
+        response = client.get("/api/v1/analytics/sales?date_from=2024-02-01&date_to=2024-01-01")
+        assert response.status_code == 400
@@ -0,0 +1,163 @@
+"""
+Pruebas para app.services.shipment_lifecycle: el estado del envío y el de su
+pedido cambian en la misma transacción.
+"""
+import pytest
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from app.crud.shipment_crud import status_timestamps
+from app.models import Order, Shipment
+from app.services import shipment_lifecycle
+
+
+def _seed(db, n=3, carrier="Servientrega", status="pending"):
+    shipments = []
+    for i in range(n):
+        order = Order(user_id="u1", total=10.0, status="processing")
+        db.add(order)
+        db.flush()
+        shipments.append(Shipment(order_id=order.id, tracking_number=f"TRK{order.id}", carrier=carrier, status=status))
+    db.add_all(shipments)
+    db.commit()
+    return [(s.id, s.order_id) for s in shipments]
+
+
+def _order_status(db, order_id):
+    db.expire_all()
+    return db.get(Order, order_id).status
+
+
+class TestShipmentLifecycle:
+    """Tests para la propagación de estado envío -> pedido"""
+
+    def test_delivered_completes_order(self, db_session):
+        """Prueba que entregar un envío completa su pedido"""
+        [(shipment_id, order_id)] = _seed(db_session, n=1)
+
+        row = shipment_lifecycle.update_shipment_status(db_session, shipment_id, "delivered", "ABC-123")
+
+        assert row.status == "delivered"
+        assert row.vehicle_info == "ABC-123"
+        assert row.delivered_at is not None
+        assert _order_status(db_session, order_id) == "completed"
+
+    def test_status_without_order_mapping_keeps_order(self, db_session):
+        """Prueba que un estado sin equivalente (cancelled) no cambia el pedido"""
+        [(shipment_id, order_id)] = _seed(db_session, n=1)
+        shipment_lifecycle.update_shipment_status(db_session, shipment_id, "cancelled")
+        assert _order_status(db_session, order_id) == "processing"
+
+    def test_cancelled_order_keeps_its_status(self, db_session):
+        """Prueba que el envío no reabre un pedido cancelado (su stock ya se devolvió)"""
+        [(shipment_id, order_id)] = _seed(db_session, n=1)
+        db_session.get(Order, order_id).status = "cancelled"
+        db_session.commit()
+
+        row = shipment_lifecycle.update_shipment_status(db_session, shipment_id, "delivered")
+
+        assert row.status == "delivered"
+        assert _order_status(db_session, order_id) == "cancelled"
+
+    def test_put_with_status_moves_order(self, client, db_session):
+        """Prueba que PUT /shipments/{id} con status también completa el pedido y marca la analítica"""
+        from app.models.sales_rollup import SalesRollupDirty
+        [(shipment_id, order_id)] = _seed(db_session, n=1)
+        db_session.query(SalesRollupDirty).delete()
+        db_session.commit()
+
+        response = client.put(f"/api/v1/shipments/{shipment_id}", json={"status": "delivered", "carrier": "DHL"})
+
+        assert response.status_code == 200
+        assert (response.json()["status"], response.json()["carrier"]) == ("delivered", "DHL")
+        assert response.json()["delivered_at"] is not None
+        assert _order_status(db_session, order_id) == "completed"
+        assert db_session.query(SalesRollupDirty).count() == 1
+        assert client.put("/api/v1/shipments/999", json={"carrier": "DHL"}).status_code == 404
+
+    def test_missing_shipment_returns_none(self, db_session):
+        """Prueba que un envío inexistente devuelve None"""
+        assert shipment_lifecycle.update_shipment_status(db_session, 999, "shipped") is None
+
+    def test_two_statements_without_cte(self, db_session, count_statements):
+        """Prueba que en SQLite se emiten solo la marca de analítica y los UPDATE del pedido y del envío"""
+        [(shipment_id, _)] = _seed(db_session, n=1)
+        with count_statements(db_session) as statements:
+            shipment_lifecycle.update_shipment_status(db_session, shipment_id, "shipped")
+        assert [statement.split()[0].upper() for statement in statements] == ["INSERT", "UPDATE", "UPDATE"]
+
+    def test_failure_rolls_back_order_change(self, db_session):
+        """Prueba que si falla el UPDATE del envío el pedido no queda cambiado"""
+        [(shipment_id, order_id)] = _seed(db_session, n=1)
+
+        def fail(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("UPDATE shipments"):
+                raise RuntimeError("boom")
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", fail)
+        try:
+            with pytest.raises(RuntimeError):
+                shipment_lifecycle.update_shipment_status(db_session, shipment_id, "delivered")
+        finally:
+            event.remove(engine, "before_cursor_execute", fail)
+        assert _order_status(db_session, order_id) == "processing"
+        assert db_session.get(Shipment, shipment_id).status == "pending"
+
+    def test_bulk_by_carrier_and_current_status(self, db_session):
+        """Prueba mover el manifiesto de un transportador solo desde el estado indicado"""
+        moved = _seed(db_session, n=3, carrier="Servientrega", status="shipped")
+        [(other_id, other_order)] = _seed(db_session, n=1, carrier="Servientrega", status="pending")
+
+        updated = shipment_lifecycle.bulk_update_status(
+            db_session, "in_transit", carrier="Servientrega", current_status="shipped"
+        )
+
+        assert updated == 3
+        assert {_order_status(db_session, order_id) for _, order_id in moved} == {"in_transit"}
+        assert _order_status(db_session, other_order) == "processing"
+        assert db_session.get(Shipment, other_id).status == "pending"
+
+    def test_bulk_requires_selector(self, db_session):
+        """Prueba que el movimiento masivo exige ids o transportador"""
+        with pytest.raises(ValueError):
+            shipment_lifecycle.bulk_update_status(db_session, "shipped")
+
+    def test_postgresql_single_statement(self):
+        """Prueba que en PostgreSQL ambos UPDATE viajan en una sola sentencia con CTE"""
+        now = datetime.utcnow()
+        shipments = shipment_lifecycle._shipments
+        sql = str(shipment_lifecycle._statement(
+            [shipments.c.id == 1], status_timestamps({"status": "delivered"}, now),
+            {"status": "completed", "updated_at": now}, [shipments.c.id, shipments.c.order_id],
+        ).compile(dialect=postgresql.dialect()))
+        assert sql.startswith("WITH updated_shipments AS")
+        assert "updated_orders AS" in sql
+        assert "marked_days AS" in sql and "INSERT INTO sales_rollup_dirty" in sql
+        assert "RETURNING" in sql
+
+
+class TestShipmentBulkRoute:
+    """Tests para POST /api/v1/shipments/bulk-status"""
+
+    def test_bulk_status_by_ids(self, client, db_session):
+        """Prueba el endpoint masivo por ids"""
+        seeded = _seed(db_session, n=2)
+        response = client.post("/api/v1/shipments/bulk-status", json={
+            "status": "shipped", "shipment_ids": [shipment_id for shipment_id, _ in seeded]
+        })
+        assert response.status_code == 200
+        assert response.json() == {"status": "shipped", "updated": 2}
+
+    def test_bulk_status_requires_selector(self, client):
+        """Prueba que sin ids ni transportador responde 422"""
+        response = client.post("/api/v1/shipments/bulk-status", json={"status": "shipped"})
+        assert response.status_code == 422
+
+    def test_status_route_updates_order(self, client, db_session):
+        """Prueba que PUT /shipments/{id}/status actualiza el pedido"""
+        [(shipment_id, order_id)] = _seed(db_session, n=1)
+        response = client.put(f"/api/v1/shipments/{shipment_id}/status", json={"status": "delivered"})
+        assert response.status_code == 200
+        assert response.json()["status"] == "delivered"
+        assert _order_status(db_session, order_id) == "completed"
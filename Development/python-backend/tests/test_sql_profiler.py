@@ -0,0 +1,100 @@
+"""
+Pruebas para el perfil SQL y el log de consultas lentas (app/services/sql_profiler.py)
+"""
+import logging
+from sqlalchemy import select, update
+from app.config import settings
+from app.models import Product
+from app.services import sql_profiler
+from app.services.sql_profiler import fingerprint
+
+
+def _seed(db):
+    db.add_all([
+        Product(name="Zapatillas Nike Air", price=120, brand="Nike", stock_quantity=5),
+        Product(name="Balón Adidas", price=30, brand="Adidas", stock_quantity=2),
+    ])
+    db.commit()
+
+
+class TestFingerprint:
+    """Tests para la normalización de sentencias"""
+
+    def test_literals_and_parameters(self):
+        """Prueba que literales y parámetros de cualquier estilo quedan como ?"""
+        assert fingerprint("SELECT * FROM products WHERE id = 3 AND name = 'it''s'") == \
+            "SELECT * FROM products WHERE id = ? AND name = ?"
+        for statement in (
+            "SELECT a FROM t WHERE b = %(b_1)s LIMIT %(param_1)s",
+            "SELECT a FROM t WHERE b = $1 LIMIT $2",
+            "SELECT a FROM t WHERE b = ?\n  LIMIT ?",
+        ):
+            assert fingerprint(statement) == "SELECT a FROM t WHERE b = ? LIMIT ?"
+
+    def test_in_lists_and_identifiers(self):
+        """Prueba que las listas IN se colapsan y los nombres con dígitos no cambian"""
+        assert fingerprint("SELECT anon_1.id FROM anon_1 WHERE id IN (?, ?, ?)") == \
+            "SELECT anon_1.id FROM anon_1 WHERE id IN (?...)"
+        assert fingerprint("SELECT x::text FROM t") == "SELECT x::text FROM t"
+
+
+class TestProfiler:
+    """Tests para el agregado por huella y el detalle por petición"""
+
+    def test_request_header_and_admin_report(self, client, db_session, monkeypatch):
+        """Prueba Server-Timing y que el reporte agrega por huella con su ruta"""
+        _seed(db_session)
+        db_session.connection()  # abre ya el SAVEPOINT de la prueba: no cuenta en la petición
+        sql_profiler.reset()
+        monkeypatch.setattr(settings, "SQL_PROFILER_HEADER", True)
+
+        response = client.get("/api/v1/products/1")
+        client.get("/api/v1/products/2")
+        assert response.headers["server-timing"].startswith("db;dur=")
+        assert response.headers["server-timing"].endswith('desc="1 queries"')
+
+        report = client.get("/api/v1/admin/sql-profile", params={"order_by": "calls"}).json()
+        first = report["fingerprints"][0]
+        assert first["calls"] == 2
+        assert first["fingerprint"].startswith("SELECT products.id")
+        assert first["routes"] == ["/api/v1/products/{product_id}"]
+
+        assert client.delete("/api/v1/admin/sql-profile").status_code == 204
+        assert client.get("/api/v1/admin/sql-profile").json()["fingerprints"] == []
+
+    def test_header_is_off_by_default(self, client, db_session):
+        """Prueba que sin SQL_PROFILER_HEADER no se envía Server-Timing"""
+        assert "server-timing" not in client.get("/api/v1/products").headers
+
+    def test_row_counts(self, db_session):
+        """Prueba que se suman las filas que reporta el driver"""
+        _seed(db_session)
+        sql_profiler.reset()
+        db_session.execute(update(Product).values(stock_quantity=1))
+        db_session.commit()
+        [row] = [row for row in sql_profiler.top() if row["fingerprint"].startswith("UPDATE products")]
+        assert row["rows"] == 2
+
+    def test_invalid_order(self, client, db_session):
+        """Prueba que un order_by desconocido responde 422"""
+        assert client.get("/api/v1/admin/sql-profile?order_by=name").status_code == 422
+
+
+class TestSlowQueryLog:
+    """Tests para el log de consultas lentas"""
+
+    def test_slow_query_logged_with_plan_once(self, db_session, monkeypatch, caplog):
+        """Prueba que una consulta lenta se registra con su plan, explicado una vez por intervalo"""
+        _seed(db_session)
+        sql_profiler.reset()
+        monkeypatch.setattr(settings, "SQL_SLOW_QUERY_MS", 0)
+        statement = select(Product).where(Product.brand == "Nike")
+
+        with caplog.at_level(logging.WARNING, logger="app.services.sql_profiler"):
+            db_session.execute(statement).all()
+            db_session.execute(statement).all()
+        messages = [record.getMessage() for record in caplog.records if "FROM products" in record.getMessage()]
+        assert len(messages) == 2
+        assert "Plan:" in messages[0] and "products" in messages[0].split("Plan:")[1]
+        assert "Plan:" not in messages[1]
+        assert [row["slow"] for row in sql_profiler.top() if "FROM products" in row["fingerprint"]] == [2]
@@ -0,0 +1,112 @@
+"""
+Pruebas para el autocompletado del buscador (app/services/suggest_service.py)
+"""
+from sqlalchemy import event
+from app.models import Product
+from app.services.suggest_service import normalize, suggest_index
+
+
+def _seed(db):
+    db.add_all([
+        Product(name="Zapatillas Nike Air", price=120, brand="Nike", category="Calzado"),
+        Product(name="Camiseta Nike Dry", price=40, brand="Nike", category="Ropa"),
+        Product(name="Balón Adidas Pro", price=45, brand="Adidas", category="Balones"),
+    ])
+    db.commit()
+
+
+def _texts(db, q, limit=8):
+    return [suggestion["text"] for suggestion in suggest_index.suggest(db, q, limit)]
+
+
+class TestSuggestIndex:
+    """Tests para el índice de prefijos"""
+
+    def test_normalize(self):
+        """Prueba la normalización de claves (minúsculas, sin tildes, espacios simples)"""
+        assert normalize("  Balón   PRO ") == "balon pro"
+
+    def test_prefix_without_accents(self, db_session):
+        """Prueba que la consulta sin tildes completa nombres con tildes"""
+        _seed(db_session)
+        assert _texts(db_session, "bal")[:2] == ["Balones", "Balón Adidas Pro"]
+
+    def test_word_inside_name(self, db_session):
+        """Prueba que una palabra del medio del nombre también completa"""
+        _seed(db_session)
+        assert "Zapatillas Nike Air" in _texts(db_session, "air")
+
+    def test_ranked_by_weight(self, db_session):
+        """Prueba que la marca de dos productos va antes que los nombres de uno"""
+        _seed(db_session)
+        suggestions = suggest_index.suggest(db_session, "nik")
+        assert suggestions[0] == {"text": "Nike", "type": "brand"}
+        assert _texts(db_session, "nik", limit=1) == ["Nike"]
+
+    def test_typo_tolerance(self, db_session):
+        """Prueba la expansión a distancia de edición 1"""
+        _seed(db_session)
+        assert "Adidas" in _texts(db_session, "addi")
+        assert "Camiseta Nike Dry" in _texts(db_session, "camsieta")
+
+    def test_incremental_updates(self, client, db_session, count_statements):
+        """Prueba que crear, editar y borrar productos actualiza el índice sin reconstruirlo"""
+        _seed(db_session)
+        assert _texts(db_session, "puma") == []
+
+        created = client.post("/api/v1/products", json={"name": "Gorra Puma", "price": 15, "brand": "Puma"}).json()
+        client.put(f"/api/v1/products/{created['id']}", json={"name": "Gorra Puma Sport"})
+        with count_statements(db_session) as statements:
+            assert _texts(db_session, "puma") == ["Puma", "Gorra Puma Sport"]
+        assert statements.starting_with("SELECT") == []
+
+        client.delete(f"/api/v1/products/{created['id']}")
+        assert _texts(db_session, "puma") == []
+        assert _texts(db_session, "gorra") == []
+
+    def test_rebuild_queries_outside_the_lock(self, db_session):
+        """Prueba que la consulta del rebuild no bloquea el índice y que una escritura concurrente fuerza otro rebuild"""
+        import threading
+        _seed(db_session)
+        suggest_index.mark_stale()
+        lock_free = []
+
+        def during_query(*args):
+            if args[2].startswith("SELECT"):
+                probe = threading.Thread(target=lambda: lock_free.append(
+                    suggest_index._lock.acquire(blocking=False) and suggest_index._lock.release() is None
+                ))
+                probe.start()
+                probe.join()
+                suggest_index.remove(9999)  # escritura mientras se leen las filas
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", during_query)
+        try:
+            assert "Nike" in _texts(db_session, "nik")
+        finally:
+            event.remove(engine, "before_cursor_execute", during_query)
+        assert lock_free == [True]
+        assert suggest_index._built_at is None
+
+        assert "Nike" in _texts(db_session, "nik")
+        assert suggest_index._built_at is not None
+
+
+class TestSuggestRoute:
+    """Tests para GET /products/suggest"""
+
+    def test_payload(self, client, db_session):
+        """Prueba la respuesta compacta y el límite"""
+        _seed(db_session)
+        response = client.get("/api/v1/products/suggest", params={"q": "nike", "limit": 2})
+        assert response.status_code == 200
+        assert response.json() == {"q": "nike", "suggestions": [
+            {"text": "Nike", "type": "brand"},
+            {"text": "Camiseta Nike Dry", "type": "name"},
+        ]}
+
+    def test_empty_query_and_limit_bounds(self, client, db_session):
+        """Prueba q vacío y un límite fuera de rango"""
+        assert client.get("/api/v1/products/suggest").json() == {"q": "", "suggestions": []}
+        assert client.get("/api/v1/products/suggest?q=a&limit=50").status_code == 422
@@ -0,0 +1,211 @@
+"""
+Pruebas unitarias para el cliente del servicio de autenticación
+"""
+import asyncio
+import base64
+import time
+import httpx
+import jwt
+import pytest
+from fastapi import HTTPException
+from app.config import settings
+from app.crud.order_crud import validate_user_for_order
+from app.services import user_service
+from app.services.ttl_cache import TTLCache
+from app.services.user_service import UserService, TokenCheck, auth_cache_stats, clear_auth_cache
+
+
+@pytest.fixture(autouse=True)
+def reset_auth_cache():
+    clear_auth_cache()
+    yield
+    clear_auth_cache()
+
+
+@pytest.fixture
+def auth_backend(monkeypatch):
+    """Backend de autenticación simulado: cuenta peticiones y responde según user_id"""
+    calls = []
+
+    async def handler(request: httpx.Request):
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        user_id = request.url.path.rsplit("/", 1)[-1]
+        if user_id == "missing":
+            return httpx.Response(404)
+        if user_id == "broken":
+            return httpx.Response(503)
+        return httpx.Response(200, json={"id": user_id})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(user_service, "get_http_client", lambda: client)
+    return calls
+
+
+class TestTTLCache:
+    """Tests para la caché TTL + LRU"""
+
+    def test_evicts_least_recently_used(self):
+        """Prueba que se expulsa la entrada menos usada al llenarse"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+
+    def test_entries_expire(self, monkeypatch):
+        """Prueba que las entradas caducan tras su TTL"""
+        now = [1000.0]
+        monkeypatch.setattr("app.services.ttl_cache.time.monotonic", lambda: now[0])
+        cache = TTLCache(maxsize=10, ttl=5)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=1)
+
+        now[0] += 2
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+class TestUserServiceValidation:
+    """Tests para la validación de usuarios con caché"""
+
+    @pytest.mark.asyncio
+    async def test_positive_validation_is_cached(self, auth_backend):
+        """Prueba que una validación correcta no vuelve a llamar al backend"""
+        service = UserService()
+
+        assert await service.validate_user_exists("u1", "token") is True
+        assert await service.validate_user_exists("u1", "token") is True
+
+        assert len(auth_backend) == 1
+        assert auth_cache_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_key_includes_token(self, auth_backend):
+        """Prueba que otro token para el mismo usuario se valida de nuevo"""
+        service = UserService()
+
+        await service.validate_user_exists("u1", "token-a")
+        await service.validate_user_exists("u1", "token-b")
+
+        assert len(auth_backend) == 2
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_negatively_cached(self, auth_backend):
+        """Prueba la caché negativa de usuarios inexistentes (404)"""
+        service = UserService()
+
+        assert await service.validate_user_exists("missing", "token") is False
+        assert await service.validate_user_exists("missing", "token") is False
+
+        assert len(auth_backend) == 1
+
+    @pytest.mark.asyncio
+    async def test_server_errors_are_not_cached(self, auth_backend):
+        """Prueba que los errores del backend no se cachean"""
+        service = UserService()
+
+        assert await service.validate_user_exists("broken", "token") is False
+        assert await service.validate_user_exists("broken", "token") is False
+
+        assert len(auth_backend) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_are_coalesced(self, auth_backend):
+        """Prueba que validaciones simultáneas idénticas hacen una sola llamada"""
+        service = UserService()
+
+        results = await asyncio.gather(*[
+            service.validate_user_exists("u1", "token") for _ in range(10)
+        ])
+
+        assert results == [True] * 10
+        assert len(auth_backend) == 1
+        assert auth_cache_stats()["coalesced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_shared_client_is_reused(self):
+        """Prueba que el cliente HTTP se comparte entre llamadas"""
+        try:
+            assert user_service.get_http_client() is user_service.get_http_client()
+        finally:
+            await user_service.close_http_client()
+
+
+SECRET = "testSecretKeyForJWTThatIsVeryLongAndSecureForHS256AlgorithmTesting"
+USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+def make_token(secret=SECRET, expires_in=3600, **claims):
+    """Token firmado como JwtUtil: el secreto se decodifica como Base64 (jjwt)"""
+    key = base64.b64decode(secret + "=" * (-len(secret) % 4))
+    payload = {"sub": "test@example.com", "iat": int(time.time()), "exp": int(time.time()) + expires_in}
+    payload.update(claims)
+    return jwt.encode(payload, key, algorithm="HS256")
+
+
+@pytest.fixture
+def local_jwt(monkeypatch):
+    monkeypatch.setattr(settings, "JWT_SECRET", SECRET)
+    monkeypatch.setattr(settings, "JWT_SECRET_IS_BASE64", True)
+    monkeypatch.setattr(settings, "AUTH_VALIDATION_MODE", "local")
+    monkeypatch.setattr(settings, "AUTH_REMOTE_FALLBACK", False)
+    return settings
+
+
+class TestLocalTokenVerification:
+    """Tests para la verificación local de JWT"""
+
+    def test_valid_token_for_user(self, local_jwt):
+        """Prueba que un token firmado con userId del usuario es válido"""
+        token = make_token(userId=USER_ID)
+        assert UserService().verify_token_for_user(USER_ID, token) == TokenCheck.VALID
+
+    def test_bad_signature_and_expired_are_invalid(self, local_jwt):
+        """Prueba que firma incorrecta o token expirado se rechazan"""
+        service = UserService()
+        forged = make_token(secret="otroSecretoDistintoParaFirmarTokensFalsos123", userId=USER_ID)
+        expired = make_token(expires_in=-3600, userId=USER_ID)
+
+        assert service.verify_token_for_user(USER_ID, forged) == TokenCheck.INVALID
+        assert service.verify_token_for_user(USER_ID, expired) == TokenCheck.INVALID
+
+    def test_token_of_other_user_is_mismatch(self, local_jwt):
+        """Prueba que el token de otro usuario no sirve para esta orden"""
+        token = make_token(userId="660e8400-e29b-41d4-a716-446655440000")
+        assert UserService().verify_token_for_user(USER_ID, token) == TokenCheck.MISMATCH
+
+    def test_email_only_token_is_unverifiable(self, local_jwt):
+        """Prueba que un token sin claim de id (solo email) no se puede verificar localmente"""
+        assert UserService().verify_token_for_user(USER_ID, make_token()) == TokenCheck.UNVERIFIABLE
+        assert UserService().verify_token_for_user(USER_ID, "not-a-jwt") == TokenCheck.UNVERIFIABLE
+
+    @pytest.mark.asyncio
+    async def test_local_mode_skips_remote_lookup(self, local_jwt, auth_backend):
+        """Prueba que el modo local no llama al servicio de autenticación"""
+        assert await validate_user_for_order(USER_ID, make_token(userId=USER_ID)) is True
+        assert auth_backend == []
+
+    @pytest.mark.asyncio
+    async def test_local_mode_rejects_invalid_token(self, local_jwt, auth_backend):
+        """Prueba que un token expirado devuelve 401 sin consultar al servicio"""
+        with pytest.raises(HTTPException) as exc:
+            await validate_user_for_order(USER_ID, make_token(expires_in=-3600, userId=USER_ID))
+        assert exc.value.status_code == 401
+        assert auth_backend == []
+
+    @pytest.mark.asyncio
+    async def test_fallback_only_for_unverifiable_tokens(self, local_jwt, auth_backend):
+        """Prueba que el fallback remoto solo se usa con tokens no verificables"""
+        local_jwt.AUTH_REMOTE_FALLBACK = True
+
+        assert await validate_user_for_order(USER_ID, make_token()) is True
+        assert len(auth_backend) == 1
+
+        with pytest.raises(HTTPException):
+            await validate_user_for_order(USER_ID, make_token(userId="otro-usuario"))
+        assert len(auth_backend) == 1